@@ -26,6 +26,9 @@ CREATE TABLE sites (
 CREATE INDEX idx_sites_status ON sites(status);
 CREATE INDEX idx_sites_platform ON sites(platform);
 CREATE INDEX idx_sites_created ON sites(created_at DESC);
+-- Keyset pagination (newest first, id breaks ties)
+CREATE INDEX idx_sites_keyset ON sites(created_at DESC, site_id DESC);
+CREATE INDEX idx_sites_status_keyset ON sites(status, created_at DESC, site_id DESC);
 CREATE INDEX idx_sites_score ON sites(business_value_score DESC);
 CREATE INDEX idx_sites_domain ON sites(domain);
 
@@ -34,29 +37,42 @@ CREATE TABLE jobs (
     job_id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     site_id UUID NOT NULL REFERENCES sites(site_id) ON DELETE CASCADE,
     job_type VARCHAR(50) NOT NULL CHECK (job_type IN ('fingerprint', 'discovery', 'extraction', 'blueprint_update', 'validation')),
-    method VARCHAR(50) CHECK (method IN ('static', 'browser', 'api', 'auto')),
+    method VARCHAR(50) CHECK (method IN ('static', 'browser', 'api', 'llm', 'auto', 'manual')),
     status VARCHAR(50) NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'running', 'success', 'failed', 'timeout', 'cancelled')),
-    priority INT DEFAULT 0,
-    attempt_count INT DEFAULT 0,
-    max_retries INT DEFAULT 3,
+    priority INT NOT NULL DEFAULT 0,
+    attempt_count INT NOT NULL DEFAULT 0,
+    max_retries INT NOT NULL DEFAULT 3,
+    progress INT DEFAULT 0,
     started_at TIMESTAMP,
     ended_at TIMESTAMP,
+    completed_at TIMESTAMP,
     error_code VARCHAR(50),
     error_message TEXT,
     worker_id VARCHAR(100),
     created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
     payload JSONB,
     result JSONB,
+    cost_usd FLOAT NOT NULL DEFAULT 0,
     duration_seconds INT,
-    heartbeat_at TIMESTAMP
+    heartbeat_at TIMESTAMP,
+    lease_expires_at TIMESTAMP
 );
 
 CREATE INDEX idx_jobs_status ON jobs(status);
 CREATE INDEX idx_jobs_site_id ON jobs(site_id);
 CREATE INDEX idx_jobs_created ON jobs(created_at DESC);
+-- Keyset pagination (newest first, id breaks ties)
+CREATE INDEX idx_jobs_keyset ON jobs(created_at DESC, job_id DESC);
+CREATE INDEX idx_jobs_status_keyset ON jobs(status, created_at DESC, job_id DESC);
+-- Dashboard window aggregates (index-only scans)
+CREATE INDEX idx_jobs_created_status ON jobs(created_at) INCLUDE (status, started_at, completed_at);
 CREATE INDEX idx_jobs_priority ON jobs(priority DESC, created_at ASC);
 CREATE INDEX idx_jobs_type ON jobs(job_type);
 CREATE INDEX idx_jobs_worker ON jobs(worker_id);
+CREATE INDEX idx_jobs_lease_expires ON jobs(lease_expires_at) WHERE status = 'running';
+-- One active job per site and type; duplicate triggers attach to it
+CREATE UNIQUE INDEX uq_jobs_active_site_type ON jobs(site_id, job_type) WHERE status IN ('queued', 'running');
 
 -- Blueprints Table: Versioned site intelligence objects
 CREATE TABLE blueprints (
@@ -68,6 +84,7 @@ CREATE TABLE blueprints (
     endpoints_data JSONB NOT NULL DEFAULT '[]'::jsonb,
     render_hints_data JSONB NOT NULL DEFAULT '{}'::jsonb,
     selectors_data JSONB NOT NULL DEFAULT '[]'::jsonb,
+    phases_data JSONB,  -- completed / incomplete discovery phases; NULL = complete
     created_at TIMESTAMP NOT NULL DEFAULT NOW(),
     created_by VARCHAR(100),
     notes TEXT,
@@ -104,17 +121,29 @@ CREATE TABLE analytics_metrics (
     metric_id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     site_id UUID REFERENCES sites(site_id) ON DELETE CASCADE,
     date DATE NOT NULL,
-    discovery_time_seconds INT,
+    method VARCHAR(50),
+    job_type VARCHAR(100),
+    -- Daily rollup counters, incremented as jobs finish
+    job_count INT NOT NULL DEFAULT 0,
+    success_count INT NOT NULL DEFAULT 0,
+    failure_count INT NOT NULL DEFAULT 0,
+    duration_sum_seconds FLOAT NOT NULL DEFAULT 0,  -- successful jobs
+    duration_count INT NOT NULL DEFAULT 0,
     num_categories_found INT,
     num_endpoints_found INT,
+    items_extracted INT,
+    selectors_tested INT NOT NULL DEFAULT 0,
+    selectors_failed INT NOT NULL DEFAULT 0,
     selector_failure_rate FLOAT,
     fetch_cost_usd FLOAT,
-    items_extracted INT,
-    method VARCHAR(50),
+    discovery_time_seconds INT,
     job_id UUID REFERENCES jobs(job_id),
-    created_at TIMESTAMP NOT NULL DEFAULT NOW()
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMP
 );
 
+-- One rollup row per day, site, method and job type (upsert target)
+CREATE UNIQUE INDEX uq_metrics_rollup ON analytics_metrics(date, site_id, method, job_type);
 CREATE INDEX idx_metrics_site_date ON analytics_metrics(site_id, date DESC);
 CREATE INDEX idx_metrics_date ON analytics_metrics(date DESC);
 
@@ -289,6 +318,20 @@ CREATE TABLE cache (
 
 CREATE INDEX idx_cache_expires ON cache(expires_at);
 
+-- Page Validators: ETag/Last-Modified per URL for conditional re-discovery
+CREATE TABLE page_validators (
+    url TEXT PRIMARY KEY,
+    host VARCHAR(255) NOT NULL,
+    etag VARCHAR(500),
+    last_modified VARCHAR(100),
+    content_hash VARCHAR(64),
+    content_type VARCHAR(255),
+    body BYTEA,
+    fetched_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX idx_page_validators_host ON page_validators(host);
+
 -- ============================================================================
 -- 6. MATERIALIZED VIEWS (for analytics)
 -- ============================================================================
@@ -413,6 +456,21 @@ AFTER INSERT ON blueprints
 FOR EACH ROW
 EXECUTE FUNCTION log_blueprint_change();
 
+-- Function: Wake idle runners (LISTEN jobs_queued) when a job is queued
+CREATE OR REPLACE FUNCTION notify_job_queued()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('jobs_queued', NEW.job_type);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER jobs_notify_queued
+AFTER INSERT OR UPDATE OF status ON jobs
+FOR EACH ROW
+WHEN (NEW.status = 'queued')
+EXECUTE FUNCTION notify_job_queued();
+
 -- Function: Clean up expired cache entries
 CREATE OR REPLACE FUNCTION cleanup_expired_cache()
 RETURNS void AS $$
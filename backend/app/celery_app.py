@@ -9,7 +9,8 @@ celery_app = Celery(
     include=[
         "app.workers.fingerprinter",
         "app.workers.discoverer",
-        "app.workers.selector_generator"
+        "app.workers.selector_generator",
+        "app.workers.reaper"
     ]
 )
 
@@ -20,10 +21,20 @@ celery_app.conf.update(
     timezone="UTC",
     enable_utc=True,
     task_track_started=True,
-    task_time_limit=300,  # 5 minutes max
-    task_soft_time_limit=240,  # 4 minutes soft limit
     worker_prefetch_multiplier=1,
-    worker_max_tasks_per_child=50,
+    # Task threads hand their coroutine to the process event loop
+    # (app.workers.runtime), which runs many I/O-bound jobs concurrently.
+    # The thread pool ignores task_time_limit and worker_max_tasks_per_child:
+    # the runtime applies WORKER_JOB_TIMEOUT(S) to each job instead
+    worker_pool="threads",
+    worker_concurrency=settings.WORKER_MAX_CONCURRENT_JOBS,
+    beat_schedule={
+        # Requeue or fail jobs whose worker stopped heartbeating
+        "reap-expired-jobs": {
+            "task": "workers.reap_expired_jobs",
+            "schedule": settings.JOB_REAPER_INTERVAL,
+        },
+    },
 )
 
 if __name__ == "__main__":
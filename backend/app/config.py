@@ -46,6 +46,8 @@ class Settings(BaseSettings):
     LLM_MODEL: str = "anthropic/claude-3-sonnet-20240229"
     LLM_TEMPERATURE: float = 0.7
     LLM_MAX_TOKENS: int = 4096
+    LLM_INPUT_COST_PER_MTOK: float = float(os.getenv("LLM_INPUT_COST_PER_MTOK", "3.0"))  # USD per million input tokens
+    LLM_OUTPUT_COST_PER_MTOK: float = float(os.getenv("LLM_OUTPUT_COST_PER_MTOK", "15.0"))  # USD per million output tokens
     ANTHROPIC_API_KEY: str = os.getenv("ANTHROPIC_API_KEY", "")
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     OPENROUTER_API_KEY: str = os.getenv("OPENROUTER_API_KEY", "")
@@ -85,6 +87,66 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: str = os.getenv("SMTP_PASSWORD", "")
     FROM_EMAIL: str = os.getenv("FROM_EMAIL", "noreply@webintel.com")
     
+    # Browser pool (Playwright, one per worker process)
+    BROWSER_POOL_SIZE: int = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+    BROWSER_MAX_PAGES: int = int(os.getenv("BROWSER_MAX_PAGES", "4"))  # concurrent contexts per browser
+    BROWSER_RECYCLE_AFTER: int = int(os.getenv("BROWSER_RECYCLE_AFTER", "100"))  # contexts before relaunch
+    BROWSER_HEALTH_CHECK_INTERVAL: float = float(os.getenv("BROWSER_HEALTH_CHECK_INTERVAL", "30"))
+    
+    # Worker database pool (one per worker process)
+    # Jobs hold a session while they run; heartbeats and progress writes need more
+    WORKER_DB_POOL_SIZE: int = int(os.getenv("WORKER_DB_POOL_SIZE", "0"))  # 0 = WORKER_MAX_CONCURRENT_JOBS + headroom
+    WORKER_DB_MAX_OVERFLOW: int = int(os.getenv("WORKER_DB_MAX_OVERFLOW", "10"))
+    WORKER_DB_POOL_TIMEOUT: float = float(os.getenv("WORKER_DB_POOL_TIMEOUT", "30"))
+    WORKER_DB_POOL_RECYCLE: int = int(os.getenv("WORKER_DB_POOL_RECYCLE", "1800"))  # seconds
+    
+    # Async worker runtime (one event loop per worker process)
+    WORKER_MAX_CONCURRENT_JOBS: int = int(os.getenv("WORKER_MAX_CONCURRENT_JOBS", "16"))
+    WORKER_JOB_CONCURRENCY: str = os.getenv(
+        "WORKER_JOB_CONCURRENCY",
+        '{"discover": 8, "fingerprint": 16, "selector_generation": 4}'
+    )  # JSON: per-job-type limits
+    WORKER_JOB_TIMEOUT: float = float(os.getenv("WORKER_JOB_TIMEOUT", "300"))  # seconds; hung jobs are cancelled and failed
+    WORKER_JOB_TIMEOUTS: str = os.getenv("WORKER_JOB_TIMEOUTS", "{}")  # JSON: per-job-type overrides
+    WORKER_SHUTDOWN_GRACE: float = float(os.getenv("WORKER_SHUTDOWN_GRACE", "60"))  # seconds
+    WORKER_RUNNER_TIME_BUDGET: float = float(os.getenv("WORKER_RUNNER_TIME_BUDGET", "180"))  # seconds of claiming per github_runner run
+    
+    # Job leases (running jobs renew them; expired ones are reaped)
+    JOB_LEASE_SECONDS: float = float(os.getenv("JOB_LEASE_SECONDS", "120"))
+    JOB_HEARTBEAT_INTERVAL: float = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "30"))  # keep well under the lease
+    JOB_REAPER_INTERVAL: float = float(os.getenv("JOB_REAPER_INTERVAL", "60"))  # seconds between beat runs
+    
+    # Job dispatch (LISTEN/NOTIFY with a polling fallback)
+    JOB_NOTIFY_DATABASE_URL: str = os.getenv("JOB_NOTIFY_DATABASE_URL", "")  # session-mode URL for LISTEN; defaults to DATABASE_URL
+    JOB_POLL_INTERVAL: float = float(os.getenv("JOB_POLL_INTERVAL", "30"))  # seconds; covers missed notifications
+    
+    # Job progress events (SSE)
+    PROGRESS_REDIS_URL: str = os.getenv("PROGRESS_REDIS_URL", "")  # empty = in-process bus only
+    PROGRESS_SSE_KEEPALIVE: float = float(os.getenv("PROGRESS_SSE_KEEPALIVE", "15"))  # seconds; quiet streams re-check the DB
+    PROGRESS_SSE_MAX_SECONDS: float = float(os.getenv("PROGRESS_SSE_MAX_SECONDS", "600"))  # clients reconnect after this
+    
+    # Page snapshot store (local, shared by fingerprint/discovery/selector stages)
+    SNAPSHOT_DIR: str = os.getenv("SNAPSHOT_DIR", "data/snapshots")  # empty disables the store
+    SNAPSHOT_MAX_AGE: float = float(os.getenv("SNAPSHOT_MAX_AGE", "900"))  # seconds a snapshot replaces a fetch; -1 = any age (offline)
+    SNAPSHOT_RETENTION: float = float(os.getenv("SNAPSHOT_RETENTION", "604800"))  # seconds before pruning (7 days)
+    SNAPSHOT_COMPRESSION: str = os.getenv("SNAPSHOT_COMPRESSION", "zstd")  # zstd (falls back to gzip) or gzip
+    
+    # Response cache (hot read endpoints; committed writes invalidate entries)
+    RESPONSE_CACHE_TTL: float = float(os.getenv("RESPONSE_CACHE_TTL", "60"))  # seconds; bounds staleness from writers that cannot reach Redis
+    RESPONSE_CACHE_MAX_ENTRIES: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2000"))  # per process
+    RESPONSE_CACHE_REDIS_URL: str = os.getenv("RESPONSE_CACHE_REDIS_URL", "")  # empty = per-process cache only; set for API and workers alike
+    
+    # Bulk site ingestion
+    SITE_INGEST_BATCH_SIZE: int = int(os.getenv("SITE_INGEST_BATCH_SIZE", "1000"))  # rows per INSERT (bind params cap it near 2900)
+    
+    # Discovery
+    DISCOVERY_TIME_BUDGET: float = float(os.getenv("DISCOVERY_TIME_BUDGET", "200"))  # seconds split across phases; under the discover job timeout
+    ROBOTS_CACHE_TTL: float = float(os.getenv("ROBOTS_CACHE_TTL", "3600"))
+    ROBOTS_CACHE_NEGATIVE_TTL: float = float(os.getenv("ROBOTS_CACHE_NEGATIVE_TTL", "300"))  # unreachable robots.txt
+    ROBOTS_CACHE_MAX_ENTRIES: int = int(os.getenv("ROBOTS_CACHE_MAX_ENTRIES", "5000"))
+    ROBOTS_CACHE_REDIS_URL: str = os.getenv("ROBOTS_CACHE_REDIS_URL", "")  # empty = per-process cache only
+    SELECTOR_CANDIDATES: str = os.getenv("SELECTOR_CANDIDATES", "")  # JSON: {"price": [".my-price"], ...}
+    
     # Features
     ENABLE_WORKERS: bool = True
     ENABLE_NOTIFICATIONS: bool = bool(os.getenv("SMTP_USER"))
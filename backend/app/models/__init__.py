@@ -7,6 +7,7 @@ from app.models.blueprint import Blueprint
 from app.models.selector import Selector
 from app.models.user import User
 from app.models.analytics import AnalyticsMetric
+from app.models.page_validator import PageValidator
 
 # Import PlatformTemplate from the legacy models.py file
 # This is a workaround since PlatformTemplate is still in app/models.py
@@ -68,5 +69,5 @@ else:
         created_at = Column(DateTime, default=datetime.utcnow)
         updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-__all__ = ["Base", "Site", "Job", "Blueprint", "Selector", "User", "AnalyticsMetric", "PlatformTemplate"]
+__all__ = ["Base", "Site", "Job", "Blueprint", "Selector", "User", "AnalyticsMetric", "PageValidator", "PlatformTemplate"]
 
@@ -1,5 +1,5 @@
 """Analytics metric model"""
-from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey
+from sqlalchemy import Column, String, Integer, Float, Date, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
 import uuid
@@ -8,18 +8,39 @@ from app.database import Base
 
 
 class AnalyticsMetric(Base):
+    """Daily rollup of finished jobs per site, method and job type"""
+
     __tablename__ = "analytics_metrics"
 
     metric_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     site_id = Column(UUID(as_uuid=True), ForeignKey("sites.site_id"), nullable=True)
-    date = Column(DateTime, default=datetime.utcnow)
-    discovery_time_seconds = Column(Integer)
+    date = Column(Date, nullable=False)  # UTC day the jobs finished
+    method = Column(String(50))
+    job_type = Column(String(100))
+
+    # Counters, incremented as jobs finish
+    job_count = Column(Integer, default=0, nullable=False)
+    success_count = Column(Integer, default=0, nullable=False)
+    failure_count = Column(Integer, default=0, nullable=False)
+    duration_sum_seconds = Column(Float, default=0, nullable=False)  # successful jobs
+    duration_count = Column(Integer, default=0, nullable=False)
     num_categories_found = Column(Integer)
     num_endpoints_found = Column(Integer)
-    selector_failure_rate = Column(Float)
-    fetch_cost_usd = Column(Float)
     items_extracted = Column(Integer)
-    method = Column(String(50))
+    selectors_tested = Column(Integer, default=0, nullable=False)
+    selectors_failed = Column(Integer, default=0, nullable=False)
+    selector_failure_rate = Column(Float)  # selectors_failed / selectors_tested
+    fetch_cost_usd = Column(Float)
+
+    # Per-job metrics from before rollups
+    discovery_time_seconds = Column(Integer)
     job_id = Column(UUID(as_uuid=True))
+
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        # Upsert target; leading date serves dashboard day ranges
+        Index("uq_metrics_rollup", date, site_id, method, job_type, unique=True),
+        Index("idx_metrics_site_date", site_id, date.desc()),
+    )
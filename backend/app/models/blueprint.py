@@ -30,6 +30,7 @@ class Blueprint(Base):
     endpoints_data = Column(JSON, nullable=False, default=[])  # Array of API endpoints
     render_hints_data = Column(JSON, nullable=False, default={})  # Rendering requirements
     selectors_data = Column(JSON, nullable=False, default=[])  # Array of selectors
+    phases_data = Column(JSON, nullable=True)  # {"completed": [...], "incomplete": {phase: status}}
 
     # Metadata
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
@@ -1,6 +1,6 @@
 """Job model for tracking discovery and processing tasks"""
 
-from sqlalchemy import Column, String, DateTime, Integer, Text, JSON, ForeignKey
+from sqlalchemy import Column, String, DateTime, Integer, Float, Text, JSON, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
 import uuid
@@ -21,15 +21,25 @@ class Job(Base):
 
     # Job Configuration
     job_type = Column(String(100), nullable=False)  # fingerprint, discovery, extraction, blueprint_update
-    method = Column(String(50), nullable=True)  # static, browser, api, auto
+    method = Column(String(50), nullable=True)  # static, browser, api, llm, auto (workers record the one used)
     status = Column(String(50), default="pending", nullable=False, index=True)  # pending, running, success, failed
+    priority = Column(Integer, default=0, nullable=False)  # higher runs first
+
+    # Claiming and leases
+    worker_id = Column(String(100), nullable=True)  # runner that claimed the job
+    attempt_count = Column(Integer, default=0, nullable=False)
+    max_retries = Column(Integer, default=3, nullable=False)
+    heartbeat_at = Column(DateTime, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)  # running jobs past this are reaped
 
     # Progress
     progress = Column(Integer, default=0)
 
     # Data
+    payload = Column(JSON, nullable=True)  # Job inputs (e.g. blueprint_id, fields)
     result = Column(JSON, nullable=True)  # Output results
     error_message = Column(Text, nullable=True)
+    cost_usd = Column(Float, default=0.0, nullable=False)  # LLM spend
 
     # Timing
     started_at = Column(DateTime, nullable=True)
@@ -37,6 +47,34 @@ class Job(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
+    __table_args__ = (
+        # Claim order for runners: highest priority first, then oldest
+        Index("idx_jobs_priority", priority.desc(), created_at.asc()),
+        # Keyset pagination: newest first, job_id breaks ties
+        Index("idx_jobs_keyset", created_at.desc(), job_id.desc()),
+        Index("idx_jobs_status_keyset", status, created_at.desc(), job_id.desc()),
+        # Dashboard window scans: index-only over recent jobs
+        Index(
+            "idx_jobs_created_status",
+            created_at,
+            postgresql_include=["status", "started_at", "completed_at"]
+        ),
+        # One active job per site and type; duplicate triggers attach to it
+        Index(
+            "uq_jobs_active_site_type",
+            site_id,
+            job_type,
+            unique=True,
+            postgresql_where=status.in_(["queued", "running"])
+        ),
+        # Reaper scan for expired leases
+        Index(
+            "idx_jobs_lease_expires",
+            lease_expires_at,
+            postgresql_where=(status == "running")
+        ),
+    )
+
     def __repr__(self):
         return f"<Job(job_id={self.job_id}, type={self.job_type}, status={self.status})>"
 
@@ -0,0 +1,28 @@
+"""Page validator model for conditional re-fetching"""
+from sqlalchemy import Column, String, Text, DateTime, LargeBinary
+from datetime import datetime
+
+from app.database import Base
+
+
+class PageValidator(Base):
+    """HTTP validators and last known body for a fetched page"""
+
+    __tablename__ = "page_validators"
+
+    url = Column(Text, primary_key=True)
+    host = Column(String(255), nullable=False, index=True)
+
+    # Validators
+    etag = Column(String(500), nullable=True)
+    last_modified = Column(String(100), nullable=True)
+    content_hash = Column(String(64), nullable=True)
+
+    # Last 200 body (gzip), replayed on 304 Not Modified
+    content_type = Column(String(255), nullable=True)
+    body = Column(LargeBinary, nullable=True)
+
+    fetched_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<PageValidator(url={self.url})>"
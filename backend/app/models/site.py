@@ -1,6 +1,6 @@
 """Site model"""
 
-from sqlalchemy import Column, String, Float, DateTime, Integer, Text, JSON
+from sqlalchemy import Column, String, Float, DateTime, Integer, Text, JSON, Index
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
 import uuid
@@ -40,6 +40,12 @@ class Site(Base):
     notes = Column(Text, nullable=True)
     created_by = Column(UUID(as_uuid=True), nullable=True)  # FK to users
 
+    __table_args__ = (
+        # Keyset pagination: newest first, site_id breaks ties
+        Index("idx_sites_keyset", created_at.desc(), site_id.desc()),
+        Index("idx_sites_status_keyset", status, created_at.desc(), site_id.desc()),
+    )
+
     def __repr__(self):
         return f"<Site(site_id={self.site_id}, domain={self.domain}, status={self.status})>"
 
@@ -1,13 +1,15 @@
 """Analytics API endpoints"""
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import select, func
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
-from datetime import datetime, timedelta
+from datetime import date
 
 from app.database import get_db
-from app.models import Site, Job, AnalyticsMetric
+from app.models import Site
 from app.schemas import DashboardMetricsResponse, SiteMetricsResponse, MethodPerformanceResponse
+from app.services.analytics_service import analytics_service
+from app.services.response_cache import response_cache
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
@@ -27,51 +29,20 @@ async def get_dashboard_metrics(
     else:
         days = 7
     
-    start_date = datetime.utcnow() - timedelta(days=days)
-    
-    # Get site counts
-    sites_stmt = select(Site)
-    result = await db.execute(sites_stmt)
-    all_sites = result.scalars().all()
-    total_sites = len(all_sites)
-    
-    new_sites = len([s for s in all_sites if s.created_at > start_date])
-    ready_sites = len([s for s in all_sites if s.status == "ready"])
-    review_sites = len([s for s in all_sites if s.status == "review"])
-    failed_sites = len([s for s in all_sites if s.status == "failed"])
-    
-    # Get job stats
-    jobs_stmt = select(Job).where(Job.created_at > start_date)
-    result = await db.execute(jobs_stmt)
-    jobs = result.scalars().all()
-    
-    successful_jobs = len([j for j in jobs if j.status == "success"])
-    total_jobs = len(jobs)
-    success_rate = successful_jobs / total_jobs if total_jobs > 0 else 0
-    
-    # Calculate average duration safely
-    avg_duration = 0
-    if successful_jobs > 0:
-        durations = []
-        for j in jobs:
-            if j.status == "success" and j.started_at and j.completed_at:
-                duration = (j.completed_at - j.started_at).total_seconds()
-                durations.append(duration)
-        if durations:
-            avg_duration = sum(durations) / len(durations)
-    
-    # Count active jobs (running status)
-    active_jobs = len([j for j in jobs if j.status in ["running", "queued"]])
-    
-    # Count total blueprints (sites with blueprints)
-    total_blueprints = len([s for s in all_sites if s.blueprint_version and s.blueprint_version > 0])
+    # Live counts plus the daily rollups for the range; site, job and
+    # rollup writes invalidate the cached copy
+    metrics = await response_cache.get_or_load(
+        f"dashboard:{days}",
+        lambda: analytics_service.dashboard_metrics(db, days=days),
+        tags=("dashboard",)
+    )
     
     return DashboardMetricsResponse(
-        total_sites=total_sites,
-        active_jobs=active_jobs,
-        total_blueprints=total_blueprints,
-        avg_discovery_time=avg_duration if avg_duration > 0 else None,
-        success_rate=success_rate if total_jobs > 0 else None
+        total_sites=metrics["total_sites"],
+        active_jobs=metrics["active_jobs"],
+        total_blueprints=metrics["total_blueprints"],
+        avg_discovery_time=metrics["avg_duration"],
+        success_rate=metrics["success_rate"]
     )
 
 @router.get("/sites/{site_id}/metrics", response_model=SiteMetricsResponse)
@@ -90,90 +61,31 @@ async def get_site_metrics(
     if not site:
         return {"error": "Site not found"}
     
-    # Get metrics
-    metrics_stmt = select(AnalyticsMetric).where(
-        AnalyticsMetric.site_id == site_id
-    ).order_by(AnalyticsMetric.date.desc()).limit(30)
-    
-    result = await db.execute(metrics_stmt)
-    metrics = result.scalars().all()
-    
-    # Get jobs for this site
-    jobs_stmt = select(Job).where(Job.site_id == site_id)
-    result = await db.execute(jobs_stmt)
-    jobs = result.scalars().all()
-    
-    successful = len([j for j in jobs if j.status == "success"])
-    total = len(jobs)
-    
-    # Calculate average time safely
-    avg_time = 0
-    if successful > 0:
-        durations = []
-        for j in jobs:
-            if j.status == "success" and j.started_at and j.completed_at:
-                duration = (j.completed_at - j.started_at).total_seconds()
-                durations.append(duration)
-        if durations:
-            avg_time = sum(durations) / len(durations)
-    
-    failed = len([j for j in jobs if j.status == "failed"])
+    # Sum the site's daily rollups (idx_metrics_site_date)
+    try:
+        since = date.fromisoformat(start_date[:10]) if start_date else None
+        until = date.fromisoformat(end_date[:10]) if end_date else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be ISO formatted (YYYY-MM-DD)")
+    metrics = await analytics_service.site_metrics(db, site_id, since, until)
     
     return SiteMetricsResponse(
         site_id=site_id,
         domain=site.domain,
-        total_jobs=total,
-        successful_jobs=successful,
-        failed_jobs=failed,
-        avg_discovery_time=avg_time if avg_time > 0 else None,
-        total_categories=None,  # Could calculate from metrics if needed
-        total_endpoints=None,   # Could calculate from metrics if needed
+        total_jobs=metrics["total_jobs"],
+        successful_jobs=metrics["successful_jobs"],
+        failed_jobs=metrics["failed_jobs"],
+        avg_discovery_time=metrics["avg_duration"],
+        total_categories=metrics["total_categories"],
+        total_endpoints=metrics["total_endpoints"],
         last_run=site.last_discovered_at.isoformat() if site.last_discovered_at else None
     )
 
-@router.get("/methods/performance")
+@router.get("/methods/performance", response_model=MethodPerformanceResponse)
 async def get_method_performance(
+    days: int = Query(30, ge=1, le=365),
     db: AsyncSession = Depends(get_db)
 ):
-    """Compare discovery method effectiveness"""
-    # Get all jobs
-    jobs_stmt = select(Job)
-    result = await db.execute(jobs_stmt)
-    all_jobs = result.scalars().all()
-    
-    if not all_jobs:
-        # Return empty result if no jobs
-        return {
-            "method": "none",
-            "total_runs": 0,
-            "success_rate": 0.0,
-            "avg_discovery_time": 0.0,
-            "avg_categories_found": 0.0,
-            "avg_cost_usd": 0.0
-        }
-    
-    # Use the first method found, or aggregate all methods
-    # For now, let's aggregate all methods together
-    successful = len([j for j in all_jobs if j.status == "success"])
-    total = len(all_jobs)
-    
-    # Calculate average time safely
-    avg_time = 0.0
-    if successful > 0:
-        durations = []
-        for j in all_jobs:
-            if j.status == "success" and j.started_at and j.completed_at:
-                duration = (j.completed_at - j.started_at).total_seconds()
-                durations.append(duration)
-        if durations:
-            avg_time = sum(durations) / len(durations)
-    
-    return MethodPerformanceResponse(
-        method="all",
-        total_runs=total,
-        success_rate=round(successful / total if total > 0 else 0, 3),
-        avg_discovery_time=round(avg_time, 1),
-        avg_categories_found=0.0,  # Placeholder
-        avg_cost_usd=0.25  # Placeholder
-    )
-
+    """Compare discovery methods per job type over the last `days` days"""
+    # One grouped query: counts, percentile_cont durations and LLM cost
+    return await analytics_service.method_performance(db, days=days)
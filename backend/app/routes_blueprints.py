@@ -8,6 +8,7 @@ import uuid as uuid_lib
 from app.database import get_db
 from app.models import Blueprint, Site
 from app.schemas import BlueprintResponse, BlueprintListResponse
+from app.services.response_cache import response_cache
 # Temporarily disabled for easier testing
 # from app.security import get_current_user, require_roles
 
@@ -19,24 +20,30 @@ async def get_latest_blueprint(
     db: AsyncSession = Depends(get_db)
 ):
     """Get the most recent blueprint for a site"""
-    # Verify site exists
-    site_stmt = select(Site).where(Site.site_id == site_id)
-    result = await db.execute(site_stmt)
-    if not result.scalar_one_or_none():
-        raise HTTPException(status_code=404, detail="Site not found")
-    
-    # Get latest blueprint
-    stmt = select(Blueprint).where(
-        Blueprint.site_id == site_id
-    ).order_by(Blueprint.version.desc()).limit(1)
-    
-    result = await db.execute(stmt)
-    blueprint = result.scalar_one_or_none()
-    
-    if not blueprint:
-        raise HTTPException(status_code=404, detail="Blueprint not found")
-    
-    return blueprint
+    async def load():
+        # Verify site exists
+        site_stmt = select(Site).where(Site.site_id == site_id)
+        result = await db.execute(site_stmt)
+        if not result.scalar_one_or_none():
+            raise HTTPException(status_code=404, detail="Site not found")
+        
+        # Get latest blueprint
+        stmt = select(Blueprint).where(
+            Blueprint.site_id == site_id
+        ).order_by(Blueprint.version.desc()).limit(1)
+        
+        result = await db.execute(stmt)
+        blueprint = result.scalar_one_or_none()
+        
+        if not blueprint:
+            raise HTTPException(status_code=404, detail="Blueprint not found")
+        
+        return BlueprintResponse.model_validate(blueprint).model_dump(mode="json")
+    
+    # Writes to the site or its blueprints invalidate it; 404s are not cached
+    return await response_cache.get_or_load(
+        f"blueprint-latest:{site_id}", load, tags=("blueprints", f"site:{site_id}")
+    )
 
 @router.get("/{blueprint_id}", response_model=BlueprintResponse)
 async def get_blueprint(
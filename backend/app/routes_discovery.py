@@ -1,13 +1,15 @@
 """Discovery API endpoints - Feature G"""
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from uuid import UUID, uuid4
-from datetime import datetime
+from uuid import UUID
 
-from app.database import get_db
+from app.database import async_session_maker, get_db
 from app.models import Site, Job
 from app.schemas.job import JobResponse
+from app.services.job_queue import job_queue
+from app.services.progress_bus import site_channel, sse_stream
 from app.workers.discoverer import discover_site
 
 router = APIRouter(prefix="/discovery", tags=["discovery"])
@@ -26,6 +28,9 @@ async def trigger_discovery(
     - Run all 6 phases of discovery
     - Create a versioned blueprint
     - Update site status to 'discovered'
+    
+    If discovery is already queued or running for the site, that job is
+    returned and no new work is started.
     """
     # Get site
     stmt = select(Site).where(Site.site_id == site_id)
@@ -35,43 +40,19 @@ async def trigger_discovery(
     if not site:
         raise HTTPException(status_code=404, detail="Site not found")
     
-    # Check if already discovering
-    active_job_stmt = select(Job).where(
-        Job.site_id == site_id,
-        Job.job_type == "discover",
-        Job.status.in_(["queued", "running"])
-    )
-    result = await db.execute(active_job_stmt)
-    active_job = result.scalar_one_or_none()
-    
-    if active_job:
-        raise HTTPException(
-            status_code=409,
-            detail=f"Discovery already in progress (job {active_job.job_id})"
-        )
-    
-    # Create discovery job
-    job = Job(
-        job_id=uuid4(),
-        site_id=site_id,
-        job_type="discover",
-        method="manual",
-        status="queued",
-        created_at=datetime.utcnow()
-    )
-    
-    db.add(job)
-    await db.commit()
-    await db.refresh(job)
+    # Queue discovery, or attach to the one already queued/running
+    job, created = await job_queue.enqueue(db, site_id=site_id, job_type="discover", method="manual")
+    if not created:
+        return job
     
-    # Trigger discovery worker
+    # Also wake a Celery worker. The queued row was already announced to
+    # LISTEN/NOTIFY runners; whichever claims it first runs it, and the
+    # other skips it (claims only succeed while the job is queued)
     try:
         discover_site.delay(str(site_id), str(job.job_id))
-    except Exception as e:
-        # If Celery not available, mark job as failed
-        job.status = "failed"
-        job.error_message = f"Failed to queue job: {str(e)}"
-        await db.commit()
+    except Exception:
+        # If Celery not available, job stays queued for LISTEN/NOTIFY runners
+        pass
     
     return job
 
@@ -113,3 +94,44 @@ async def get_discovery_status(
         } if latest_job else None
     }
 
+
+async def _load_site_state(site_id: UUID):
+    """Site status plus its latest job, read in a short session"""
+    async with async_session_maker() as db:
+        site = (await db.execute(select(Site).where(Site.site_id == site_id))).scalar_one_or_none()
+        if not site:
+            return None
+        job = (await db.execute(
+            select(Job).where(Job.site_id == site_id).order_by(Job.created_at.desc()).limit(1)
+        )).scalar_one_or_none()
+        return {
+            "site_id": str(site_id),
+            "site_status": site.status,
+            "blueprint_version": site.blueprint_version,
+            "latest_job": {
+                "job_id": str(job.job_id),
+                "job_type": job.job_type,
+                "status": job.status,
+                "progress": job.progress or 0
+            } if job else None
+        }
+
+
+@router.get("/sites/{site_id}/events")
+async def stream_site_events(site_id: UUID, request: Request):
+    """Stream progress events for every job of a site (server-sent events)"""
+    initial = await _load_site_state(site_id)
+    if initial is None:
+        raise HTTPException(status_code=404, detail="Site not found")
+    
+    return StreamingResponse(
+        sse_stream(
+            site_channel(str(site_id)),
+            initial,
+            refresh=lambda: _load_site_state(site_id),
+            is_disconnected=request.is_disconnected,
+            stop_on_terminal=False
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,12 +1,15 @@
 """Jobs API endpoints"""
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select, func
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
-import uuid as uuid_lib
 
-from app.database import get_db
+from app.database import async_session_maker, get_db
 from app.models import Job, Site
+from app.services.job_queue import job_queue
+from app.services.pagination import InvalidCursor, count_rows, keyset, page
+from app.services.progress_bus import job_channel, sse_stream
 from app.schemas import JobCreate, JobResponse, JobListResponse
 # Temporarily disabled for easier testing
 # from app.security import get_current_user, require_roles
@@ -16,9 +19,10 @@ router = APIRouter(prefix="/jobs", tags=["jobs"])
 @router.post("", response_model=JobResponse, status_code=201)
 async def create_job(
     job_data: JobCreate,
+    response: Response,
     db: AsyncSession = Depends(get_db)
 ):
-    """Create a new discovery job"""
+    """Create a new discovery job (201), or return the active duplicate (200)"""
     # Verify site exists
     site_stmt = select(Site).where(Site.site_id == job_data.site_id)
     result = await db.execute(site_stmt)
@@ -26,27 +30,16 @@ async def create_job(
     if not site:
         raise HTTPException(status_code=404, detail="Site not found")
     
-    # Check if job already running for this site
-    running_stmt = select(Job).where(
-        (Job.site_id == job_data.site_id) & 
-        (Job.status == "running")
-    )
-    result = await db.execute(running_stmt)
-    if result.scalar_one_or_none():
-        raise HTTPException(status_code=409, detail="Job already running for this site")
-    
-    # Create job
-    db_job = Job(
-        job_id=uuid_lib.uuid4(),
+    # Queue it, or return the job already queued/running for this site and type
+    db_job, created = await job_queue.enqueue(
+        db,
         site_id=job_data.site_id,
         job_type=job_data.job_type,
         method=job_data.method or "auto",
-        status="queued",
         priority=1 if job_data.priority == "high" else 0
     )
-    db.add(db_job)
-    await db.commit()
-    await db.refresh(db_job)
+    if not created:
+        response.status_code = 200
     
     return db_job
 
@@ -55,11 +48,13 @@ async def list_jobs(
     site_id: UUID = Query(None),
     status: str = Query(None),
     job_type: str = Query(None),
-    limit: int = Query(50, le=100),
-    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+    cursor: str = Query(None, description="next_cursor from the previous page"),
+    offset: int = Query(0, ge=0, description="rows to skip; prefer cursor for deep pages"),
+    count: str = Query("none", regex="^(none|estimate|exact)$"),
     db: AsyncSession = Depends(get_db)
 ):
-    """List jobs with filtering"""
+    """List jobs with filtering, newest first, one cursor page at a time"""
     query = select(Job)
     
     if site_id:
@@ -69,24 +64,24 @@ async def list_jobs(
     if job_type:
         query = query.where(Job.job_type == job_type)
     
-    # Get total
-    count_stmt = select(func.count()).select_from(Job)
-    if site_id:
-        count_stmt = count_stmt.where(Job.site_id == site_id)
-    if status:
-        count_stmt = count_stmt.where(Job.status == status)
-    if job_type:
-        count_stmt = count_stmt.where(Job.job_type == job_type)
-    
-    result = await db.execute(count_stmt)
-    total = result.scalar() or 0
-    
-    # Get paginated
-    query = query.order_by(Job.created_at.desc()).limit(limit).offset(offset)
-    result = await db.execute(query)
-    jobs = result.scalars().all()
-    
-    return JobListResponse(total=total, limit=limit, offset=offset, jobs=jobs)
+    # Totals are opt-in: exact counts scan every matching row
+    total, estimated = await count_rows(db, query, count, f"jobs:{site_id}:{status}:{job_type}", ("jobs",))
+    
+    keys = (Job.created_at, Job.job_id)
+    try:
+        result = await db.execute(keyset(query, keys, cursor, limit, offset=offset))
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    jobs, next_cursor = page(result.scalars().all(), keys, limit)
+    
+    return JobListResponse(
+        total=total,
+        total_estimated=estimated,
+        limit=limit,
+        offset=offset,
+        next_cursor=next_cursor,
+        jobs=jobs
+    )
 
 @router.get("/{job_id}", response_model=JobResponse)
 async def get_job(
@@ -103,6 +98,40 @@ async def get_job(
     
     return job
 
+def _job_state(job: Job) -> dict:
+    return {
+        "job_id": str(job.job_id),
+        "site_id": str(job.site_id),
+        "job_type": job.job_type,
+        "status": job.status,
+        "progress": job.progress or 0,
+        "error_message": job.error_message
+    }
+
+async def _load_job_state(job_id: UUID):
+    # Short session per read: an open stream must not hold a pool connection
+    async with async_session_maker() as db:
+        job = (await db.execute(select(Job).where(Job.job_id == job_id))).scalar_one_or_none()
+        return _job_state(job) if job else None
+
+@router.get("/{job_id}/events")
+async def stream_job_events(job_id: UUID, request: Request):
+    """Stream a job's phase and progress events (server-sent events)"""
+    initial = await _load_job_state(job_id)
+    if initial is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return StreamingResponse(
+        sse_stream(
+            job_channel(str(job_id)),
+            initial,
+            refresh=lambda: _load_job_state(job_id),
+            is_disconnected=request.is_disconnected
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/{job_id}/cancel", response_model=JobResponse)
 async def cancel_job(
     job_id: UUID,
@@ -128,6 +157,7 @@ async def cancel_job(
 @router.post("/{job_id}/retry", response_model=JobResponse, status_code=201)
 async def retry_job(
     job_id: UUID,
+    response: Response,
     db: AsyncSession = Depends(get_db)
 ):
     """Retry a failed job"""
@@ -144,18 +174,17 @@ async def retry_job(
     if old_job.attempt_count >= old_job.max_retries:
         raise HTTPException(status_code=409, detail="Max retries exceeded")
     
-    # Create new job
-    new_job = Job(
-        job_id=uuid_lib.uuid4(),
+    # Retry with higher priority, unless another attempt is already active
+    new_job, created = await job_queue.enqueue(
+        db,
         site_id=old_job.site_id,
         job_type=old_job.job_type,
         method=old_job.method,
-        status="queued",
-        priority=old_job.priority + 1  # Increase priority for retry
+        priority=old_job.priority + 1,
+        payload=old_job.payload
     )
-    db.add(new_job)
-    await db.commit()
-    await db.refresh(new_job)
+    if not created:
+        response.status_code = 200
     
     return new_job
 
@@ -1,5 +1,5 @@
 """Public API endpoints (no auth required)"""
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
@@ -8,11 +8,15 @@ import uuid as uuid_lib
 from app.database import get_db
 from app.models import Site, Job, Blueprint
 from app.schemas import (
-    SiteCreate, SiteResponse, SiteListResponse,
+    SiteCreate, SiteResponse, SiteListResponse, SiteBulkIngestResponse,
     JobResponse, JobListResponse,
     BlueprintResponse, BlueprintListResponse,
     DashboardMetricsResponse
 )
+from app.services.analytics_service import analytics_service
+from app.services.pagination import InvalidCursor, count_rows, keyset, page
+from app.services.response_cache import response_cache
+from app.services.site_ingest import iter_lines, parse_csv, parse_ndjson, site_ingestor
 from app.workers.fingerprinter import fingerprint_site
 
 router = APIRouter(prefix="/public", tags=["public"])
@@ -56,7 +60,7 @@ async def create_site_public(
     db.add(fingerprint_job)
     await db.commit()
     
-    # Trigger async fingerprinting worker
+    # Trigger async fingerprinting worker (a no-op if a queue runner claims it first)
     try:
         fingerprint_site.delay(str(site_uuid), str(fingerprint_job.job_id))
     except Exception:
@@ -64,43 +68,70 @@ async def create_site_public(
     
     return db_site
 
+@router.post("/sites/bulk", response_model=SiteBulkIngestResponse)
+async def bulk_create_sites_public(
+    request: Request,
+    format: str = Query(None, regex="^(ndjson|csv)$"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Onboard many sites from a streamed NDJSON or CSV body (public endpoint).
+
+    NDJSON lines are {"domain": ..., "business_value_score": ..., "notes": ...}
+    objects or bare domain strings; CSV needs a header with a domain column
+    or lists one domain per line. The format defaults from Content-Type.
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if "csv" in content_type else "ndjson"
+
+    lines = iter_lines(request.stream())
+    rows = parse_csv(lines) if format == "csv" else parse_ndjson(lines)
+    summary = await site_ingestor.ingest(db, rows)
+    return summary.to_dict()
+
 @router.get("/sites", response_model=SiteListResponse)
 async def list_sites_public(
     status: str = Query(None),
     platform: str = Query(None),
-    limit: int = Query(50, le=100),
-    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+    cursor: str = Query(None, description="next_cursor from the previous page"),
+    offset: int = Query(0, ge=0, description="rows to skip; prefer cursor for deep pages"),
+    count: str = Query("none", regex="^(none|estimate|exact)$"),
     db: AsyncSession = Depends(get_db)
 ):
-    """List sites (public endpoint)"""
-    query = select(Site)
-    
-    if status:
-        query = query.where(Site.status == status)
-    if platform:
-        query = query.where(Site.platform == platform)
-    
-    # Get total count
-    count_query = select(func.count()).select_from(Site)
-    if status:
-        count_query = count_query.where(Site.status == status)
-    if platform:
-        count_query = count_query.where(Site.platform == platform)
-    
-    result = await db.execute(count_query)
-    total = result.scalar() or 0
-    
-    # Get paginated results
-    query = query.order_by(Site.created_at.desc()).limit(limit).offset(offset)
-    result = await db.execute(query)
-    sites = result.scalars().all()
-    
-    return SiteListResponse(
-        total=total,
-        limit=limit,
-        offset=offset,
-        sites=sites
-    )
+    """List sites (public endpoint), newest first, one cursor page at a time"""
+    async def load():
+        query = select(Site)
+        
+        if status:
+            query = query.where(Site.status == status)
+        if platform:
+            query = query.where(Site.platform == platform)
+        
+        # Totals are opt-in: exact counts scan every matching row
+        total, estimated = await count_rows(db, query, count, f"sites:{status}:{platform}", ("sites",))
+        
+        keys = (Site.created_at, Site.site_id)
+        result = await db.execute(keyset(query, keys, cursor, limit, offset=offset))
+        sites, next_cursor = page(result.scalars().all(), keys, limit)
+        
+        return SiteListResponse(
+            total=total,
+            total_estimated=estimated,
+            limit=limit,
+            offset=offset,
+            next_cursor=next_cursor,
+            sites=sites
+        ).model_dump(mode="json")
+    
+    # Any site write invalidates the cached pages
+    try:
+        return await response_cache.get_or_load(
+            f"public-sites:{status}:{platform}:{limit}:{offset}:{cursor}:{count}", load, tags=("sites",)
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/sites/{site_id}", response_model=SiteResponse)
 async def get_site_public(
@@ -206,32 +237,16 @@ async def list_blueprints_public(
 
 @router.get("/analytics/dashboard", response_model=DashboardMetricsResponse)
 async def dashboard_metrics_public(db: AsyncSession = Depends(get_db)):
-    """Get dashboard metrics (public endpoint)"""
-    # Total sites
-    total_sites_query = select(func.count()).select_from(Site)
-    result = await db.execute(total_sites_query)
-    total_sites = result.scalar() or 0
-    
-    # Total jobs
-    total_jobs_query = select(func.count()).select_from(Job)
-    result = await db.execute(total_jobs_query)
-    total_jobs = result.scalar() or 0
-    
-    # Completed jobs
-    completed_jobs_query = select(func.count()).select_from(Job).where(Job.status == "completed")
-    result = await db.execute(completed_jobs_query)
-    completed_jobs = result.scalar() or 0
-    
-    # Success rate
-    success_rate = (completed_jobs / total_jobs * 100) if total_jobs > 0 else 0
+    """Get dashboard metrics over all jobs (public endpoint)"""
+    metrics = await response_cache.get_or_load(
+        "dashboard:all", lambda: analytics_service.dashboard_metrics(db), tags=("dashboard",)
+    )
     
     return DashboardMetricsResponse(
-        total_sites=total_sites,
-        total_jobs=total_jobs,
-        completed_jobs=completed_jobs,
-        failed_jobs=0,  # Simplified
-        success_rate=success_rate,
-        avg_completion_time=0,  # Simplified
-        total_cost=0  # Simplified
+        total_sites=metrics["total_sites"],
+        active_jobs=metrics["active_jobs"],
+        total_blueprints=metrics["total_blueprints"],
+        avg_discovery_time=metrics["avg_duration"],
+        success_rate=metrics["success_rate"]
     )
 
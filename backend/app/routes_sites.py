@@ -1,12 +1,13 @@
 """Sites API endpoints"""
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select, func
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 import uuid as uuid_lib
 
 from app.database import get_db
 from app.models import Site, Job
+from app.services.pagination import InvalidCursor, count_rows, keyset, page
 from app.schemas import SiteCreate, SiteUpdate, SiteResponse, SiteDetailResponse, SiteListResponse
 # Temporarily disabled for easier testing
 # from app.security import get_current_user, require_roles
@@ -57,7 +58,7 @@ async def create_site(
     db.add(fingerprint_job)
     await db.commit()
     
-    # Trigger async fingerprinting worker
+    # Trigger async fingerprinting worker (a no-op if a queue runner claims it first)
     try:
         fingerprint_site.delay(str(site_uuid), str(fingerprint_job.job_id))
     except Exception as e:
@@ -70,11 +71,13 @@ async def create_site(
 async def list_sites(
     status: str = Query(None),
     platform: str = Query(None),
-    limit: int = Query(50, le=100),
-    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+    cursor: str = Query(None, description="next_cursor from the previous page"),
+    offset: int = Query(0, ge=0, description="rows to skip; prefer cursor for deep pages"),
+    count: str = Query("none", regex="^(none|estimate|exact)$"),
     db: AsyncSession = Depends(get_db)
 ):
-    """List sites with filtering and pagination"""
+    """List sites with filtering and cursor pagination, newest first"""
     query = select(Site)
     
     if status:
@@ -82,25 +85,22 @@ async def list_sites(
     if platform:
         query = query.where(Site.platform == platform)
     
-    # Get total count
-    count_query = select(func.count()).select_from(Site)
-    if status:
-        count_query = count_query.where(Site.status == status)
-    if platform:
-        count_query = count_query.where(Site.platform == platform)
+    # Totals are opt-in: exact counts scan every matching row
+    total, estimated = await count_rows(db, query, count, f"sites:{status}:{platform}", ("sites",))
     
-    result = await db.execute(count_query)
-    total = result.scalar() or 0
-    
-    # Get paginated results
-    query = query.order_by(Site.created_at.desc()).limit(limit).offset(offset)
-    result = await db.execute(query)
-    sites = result.scalars().all()
+    keys = (Site.created_at, Site.site_id)
+    try:
+        result = await db.execute(keyset(query, keys, cursor, limit, offset=offset))
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    sites, next_cursor = page(result.scalars().all(), keys, limit)
     
     return SiteListResponse(
         total=total,
+        total_estimated=estimated,
         limit=limit,
         offset=offset,
+        next_cursor=next_cursor,
         sites=sites
     )
 
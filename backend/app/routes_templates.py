@@ -9,6 +9,7 @@ from typing import Optional
 from app.database import get_db
 from app.models import PlatformTemplate  # Exported from app.models/__init__.py
 from app.schemas.template import TemplateCreate, TemplateUpdate, TemplateResponse, TemplateListResponse
+from app.services.response_cache import response_cache
 
 router = APIRouter(prefix="/templates", tags=["templates"])
 
@@ -47,29 +48,35 @@ async def list_templates(
     db: AsyncSession = Depends(get_db)
 ):
     """List all templates with optional filtering"""
-    stmt = select(PlatformTemplate)
-    
-    if platform_name:
-        stmt = stmt.where(PlatformTemplate.platform_name == platform_name)
-    
-    if active is not None:
-        stmt = stmt.where(PlatformTemplate.active == active)
-    
-    # Get total count
-    count_stmt = select(func.count()).select_from(stmt.subquery())
-    total_result = await db.execute(count_stmt)
-    total = total_result.scalar() or 0
-    
-    # Get paginated results
-    stmt = stmt.order_by(PlatformTemplate.platform_name, PlatformTemplate.created_at.desc())
-    stmt = stmt.limit(limit).offset(offset)
-    
-    result = await db.execute(stmt)
-    templates = result.scalars().all()
-    
-    return TemplateListResponse(
-        templates=[TemplateResponse.model_validate(t) for t in templates],
-        total=total
+    async def load():
+        stmt = select(PlatformTemplate)
+        
+        if platform_name:
+            stmt = stmt.where(PlatformTemplate.platform_name == platform_name)
+        
+        if active is not None:
+            stmt = stmt.where(PlatformTemplate.active == active)
+        
+        # Get total count
+        count_stmt = select(func.count()).select_from(stmt.subquery())
+        total_result = await db.execute(count_stmt)
+        total = total_result.scalar() or 0
+        
+        # Get paginated results
+        stmt = stmt.order_by(PlatformTemplate.platform_name, PlatformTemplate.created_at.desc())
+        stmt = stmt.limit(limit).offset(offset)
+        
+        result = await db.execute(stmt)
+        templates = result.scalars().all()
+        
+        return TemplateListResponse(
+            templates=[TemplateResponse.model_validate(t) for t in templates],
+            total=total
+        ).model_dump(mode="json")
+    
+    # Template writes invalidate every cached listing
+    return await response_cache.get_or_load(
+        f"templates:{platform_name}:{active}:{limit}:{offset}", load, tags=("templates",)
     )
 
 
@@ -1,6 +1,8 @@
 """Request/Response schemas"""
 
-from app.schemas.site import SiteCreate, SiteUpdate, SiteResponse, SiteDetailResponse, SiteListResponse
+from app.schemas.site import (
+    SiteCreate, SiteUpdate, SiteResponse, SiteDetailResponse, SiteListResponse, SiteBulkIngestResponse
+)
 from app.schemas.job import JobCreate, JobResponse, JobListResponse
 from app.schemas.blueprint import BlueprintResponse, BlueprintListResponse
 from app.schemas.auth import TokenResponse
@@ -14,6 +16,7 @@ from app.schemas.template import TemplateCreate, TemplateUpdate, TemplateRespons
 
 __all__ = [
     "SiteCreate", "SiteUpdate", "SiteResponse", "SiteDetailResponse", "SiteListResponse",
+    "SiteBulkIngestResponse",
     "JobCreate", "JobResponse", "JobListResponse",
     "BlueprintResponse", "BlueprintListResponse",
     "TokenResponse",
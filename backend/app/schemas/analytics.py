@@ -42,12 +42,27 @@ class SiteMetricsResponse(BaseModel):
     last_run: Optional[str]
 
 
-class MethodPerformanceResponse(BaseModel):
-    """Method performance comparison"""
+class MethodPerformance(BaseModel):
+    """Finished jobs of one method and job type"""
     method: str
-    total_runs: int
+    job_type: str
+    total_jobs: int
+    success_count: int
+    failure_count: int
     success_rate: float
-    avg_discovery_time: float
-    avg_categories_found: float
+    avg_time_seconds: Optional[float]
+    p50_seconds: Optional[float]
+    p90_seconds: Optional[float]
+    p99_seconds: Optional[float]
+    avg_categories_found: Optional[float]
+    total_cost_usd: float
     avg_cost_usd: float
+    cost_per_success_usd: Optional[float]
+
+
+class MethodPerformanceResponse(BaseModel):
+    """Method performance comparison"""
+    window_days: int
+    method_performance: List[MethodPerformance]
+    recommendations: List[str]
 
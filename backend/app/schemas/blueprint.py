@@ -54,6 +54,7 @@ class BlueprintResponse(BaseModel):
     endpoints_data: List[Endpoint]
     render_hints_data: RenderHints
     selectors_data: List[Selector]
+    phases_data: Optional[dict] = None
     created_at: datetime
     created_by: Optional[str]
     notes: Optional[str]
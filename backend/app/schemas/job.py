@@ -47,8 +47,10 @@ class JobDetailResponse(JobResponse):
 
 class JobListResponse(BaseModel):
     """Paginated list of jobs"""
-    total: int
+    total: Optional[int] = None  # only when a count was requested
+    total_estimated: bool = False  # total is the planner's estimate
     limit: int
-    offset: int
+    offset: int = 0  # rows skipped (offset paging, without a cursor)
+    next_cursor: Optional[str] = None  # pass as ?cursor= for the next page
     jobs: List[JobResponse]
 
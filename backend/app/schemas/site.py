@@ -47,8 +47,28 @@ class SiteDetailResponse(SiteResponse):
 
 class SiteListResponse(BaseModel):
     """Paginated list of sites"""
-    total: int
+    total: Optional[int] = None  # only when a count was requested
+    total_estimated: bool = False  # total is the planner's estimate
     limit: int
-    offset: int
+    offset: int = 0  # rows skipped (offset paging, without a cursor)
+    next_cursor: Optional[str] = None  # pass as ?cursor= for the next page
     sites: List[SiteResponse]
 
+
+
+class SiteIngestError(BaseModel):
+    """A rejected row of a bulk upload"""
+    line: int
+    error: str
+
+
+class SiteBulkIngestResponse(BaseModel):
+    """Summary of a bulk site upload"""
+    received: int
+    created: int
+    duplicates: int
+    invalid: int
+    jobs_queued: int
+    jobs_dispatched: int
+    batches: int
+    errors: List[SiteIngestError]
@@ -0,0 +1,331 @@
+"""Analytics aggregates computed in the database"""
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import Float, case, cast, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import AnalyticsMetric, Job, Site
+from app.services.job_queue import ACTIVE_STATUSES
+from app.services.response_cache import table_tags, tag_session
+
+# Counters added together when a rollup row already exists
+_ADDITIVE = (
+    "job_count", "success_count", "failure_count",
+    "duration_sum_seconds", "duration_count",
+    "num_categories_found", "num_endpoints_found", "items_extracted",
+    "selectors_tested", "selectors_failed", "fetch_cost_usd"
+)
+
+# Recompute rollups from job history (jobs finished on or after :since)
+_BACKFILL_SQL = """
+    INSERT INTO analytics_metrics (
+        metric_id, site_id, date, method, job_type,
+        job_count, success_count, failure_count, duration_sum_seconds, duration_count,
+        num_categories_found, num_endpoints_found, items_extracted,
+        selectors_tested, selectors_failed, selector_failure_rate, fetch_cost_usd,
+        created_at, updated_at
+    )
+    SELECT gen_random_uuid(), site_id, day, method, job_type,
+           jobs, successes, failures, duration_sum, duration_count,
+           categories, endpoints, items,
+           tested, failed_selectors,
+           failed_selectors::float / NULLIF(tested, 0), cost,
+           NOW(), NOW()
+    FROM (
+        SELECT site_id,
+               COALESCE(completed_at, updated_at)::date AS day,
+               COALESCE(method, 'auto') AS method,
+               job_type,
+               COUNT(*) AS jobs,
+               COUNT(*) FILTER (WHERE status = 'success') AS successes,
+               COUNT(*) FILTER (WHERE status = 'failed') AS failures,
+               COALESCE(SUM(EXTRACT(EPOCH FROM completed_at - started_at))
+                   FILTER (WHERE status = 'success'), 0) AS duration_sum,
+               COUNT(completed_at - started_at) FILTER (WHERE status = 'success') AS duration_count,
+               SUM(COALESCE((result->>'categories_found')::int, 0)) AS categories,
+               SUM(COALESCE((result->>'endpoints_found')::int, 0)) AS endpoints,
+               SUM(COALESCE((result->>'products_found')::int, 0)) AS items,
+               SUM(COALESCE((result->>'fields_requested')::int, 0)) AS tested,
+               SUM(COALESCE((result->>'fields_requested')::int, 0)
+                   - COALESCE((result->>'selectors_generated')::int,
+                              COALESCE((result->>'fields_requested')::int, 0))) AS failed_selectors,
+               SUM(cost_usd) AS cost
+        FROM jobs
+        WHERE status IN ('success', 'failed') AND site_id IS NOT NULL
+          AND COALESCE(completed_at, updated_at) >= :since
+        GROUP BY 1, 2, 3, 4
+    ) finished
+    ON CONFLICT (date, site_id, method, job_type) DO UPDATE SET
+        job_count = EXCLUDED.job_count,
+        success_count = EXCLUDED.success_count,
+        failure_count = EXCLUDED.failure_count,
+        duration_sum_seconds = EXCLUDED.duration_sum_seconds,
+        duration_count = EXCLUDED.duration_count,
+        num_categories_found = EXCLUDED.num_categories_found,
+        num_endpoints_found = EXCLUDED.num_endpoints_found,
+        items_extracted = EXCLUDED.items_extracted,
+        selectors_tested = EXCLUDED.selectors_tested,
+        selectors_failed = EXCLUDED.selectors_failed,
+        selector_failure_rate = EXCLUDED.selector_failure_rate,
+        fetch_cost_usd = EXCLUDED.fetch_cost_usd,
+        updated_at = NOW()
+"""
+
+
+def _int(value) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class AnalyticsService:
+    """
+    Dashboard and site metrics from daily rollups.
+
+    Workers call record() as a job finishes, in the transaction that sets
+    its final status, which upserts the job into its analytics_metrics row
+    for (day, site, method, job type). Reads then sum rollup rows for the
+    days shown, so their cost follows the date range rather than the size
+    of the jobs table. Live state (site counts, active jobs) comes from one
+    aggregate query with COUNT(*) FILTER (WHERE ...).
+    """
+
+    @staticmethod
+    def rollup_values(job: Job, now: Optional[datetime] = None) -> Optional[Dict]:
+        """A finished job's contribution to its rollup row (None: not rolled up)"""
+        if job.site_id is None or job.status not in ("success", "failed"):
+            return None
+        finished = job.completed_at or now or datetime.utcnow()
+        succeeded = job.status == "success"
+        result = job.result if isinstance(job.result, dict) else {}
+
+        timed = succeeded and job.started_at is not None and job.completed_at is not None
+        tested = _int(result.get("fields_requested"))
+        generated = _int(result.get("selectors_generated")) if "selectors_generated" in result else tested
+
+        return {
+            "site_id": job.site_id,
+            "date": finished.date(),
+            "method": job.method or "auto",
+            "job_type": job.job_type,
+            "job_count": 1,
+            "success_count": 1 if succeeded else 0,
+            "failure_count": 0 if succeeded else 1,
+            "duration_sum_seconds": (job.completed_at - job.started_at).total_seconds() if timed else 0.0,
+            "duration_count": 1 if timed else 0,
+            "num_categories_found": _int(result.get("categories_found")),
+            "num_endpoints_found": _int(result.get("endpoints_found")),
+            "items_extracted": _int(result.get("products_found")),
+            "selectors_tested": tested,
+            "selectors_failed": max(tested - generated, 0),
+            "fetch_cost_usd": job.cost_usd or 0.0
+        }
+
+    def rollup_upsert(self, values: Dict, now: datetime):
+        table = AnalyticsMetric.__table__
+        stmt = insert(AnalyticsMetric).values(
+            metric_id=uuid.uuid4(),
+            selector_failure_rate=(
+                values["selectors_failed"] / values["selectors_tested"]
+                if values["selectors_tested"] else None
+            ),
+            created_at=now,
+            updated_at=now,
+            **values
+        )
+        summed = {
+            name: func.coalesce(table.c[name], 0) + stmt.excluded[name] for name in _ADDITIVE
+        }
+        tested = summed["selectors_tested"]
+        return stmt.on_conflict_do_update(
+            index_elements=[table.c.date, table.c.site_id, table.c.method, table.c.job_type],
+            set_={
+                **summed,
+                "selector_failure_rate": case(
+                    (tested > 0, cast(summed["selectors_failed"], Float) / tested),
+                    else_=None
+                ),
+                "updated_at": stmt.excluded.updated_at
+            }
+        )
+
+    async def record(self, db: AsyncSession, job: Job) -> None:
+        """Add a finished job to its daily rollup; caller commits"""
+        now = datetime.utcnow()
+        values = self.rollup_values(job, now)
+        if values is not None:
+            await db.execute(self.rollup_upsert(values, now))
+
+    async def backfill(self, db: AsyncSession, since: Optional[date] = None) -> None:
+        """Rebuild rollups for days since `since` (all history if None); caller commits"""
+        since = since or date(1970, 1, 1)
+        await db.execute(text(_BACKFILL_SQL), {"since": datetime.combine(since, datetime.min.time())})
+        # Raw SQL skips the cache's ORM hooks: drop cached dashboards on commit
+        tag_session(db, table_tags("analytics_metrics"))
+
+    @staticmethod
+    def state_counts(since: Optional[datetime] = None):
+        new_sites = func.count().filter(Site.created_at > since) if since else func.count()
+        active_jobs = (
+            select(func.count()).select_from(Job)
+            .where(Job.status.in_(ACTIVE_STATUSES))
+            .scalar_subquery()
+        )
+        return select(
+            func.count().label("total_sites"),
+            new_sites.label("new_sites"),
+            func.count().filter(Site.status == "ready").label("ready_sites"),
+            func.count().filter(Site.status == "review").label("review_sites"),
+            func.count().filter(Site.status == "failed").label("failed_sites"),
+            func.count().filter(Site.blueprint_version > 0).label("total_blueprints"),
+            active_jobs.label("active_jobs")
+        ).select_from(Site)
+
+    @staticmethod
+    def rollup_totals(since: Optional[date] = None, until: Optional[date] = None, site_id=None):
+        stmt = select(
+            func.coalesce(func.sum(AnalyticsMetric.job_count), 0).label("total_jobs"),
+            func.coalesce(func.sum(AnalyticsMetric.success_count), 0).label("successful_jobs"),
+            func.coalesce(func.sum(AnalyticsMetric.failure_count), 0).label("failed_jobs"),
+            (
+                func.sum(AnalyticsMetric.duration_sum_seconds)
+                / func.nullif(func.sum(AnalyticsMetric.duration_count), 0)
+            ).label("avg_duration"),
+            func.sum(AnalyticsMetric.num_categories_found).label("total_categories"),
+            func.sum(AnalyticsMetric.num_endpoints_found).label("total_endpoints"),
+            func.sum(AnalyticsMetric.fetch_cost_usd).label("total_cost_usd")
+        ).where(AnalyticsMetric.job_count > 0)
+        if since is not None:
+            stmt = stmt.where(AnalyticsMetric.date >= since)
+        if until is not None:
+            stmt = stmt.where(AnalyticsMetric.date <= until)
+        if site_id is not None:
+            stmt = stmt.where(AnalyticsMetric.site_id == site_id)
+        return stmt
+
+    async def dashboard_metrics(self, db: AsyncSession, days: Optional[int] = None) -> Dict:
+        """Live counts plus job totals for the last `days` days (all history if None)"""
+        since = datetime.utcnow().date() - timedelta(days=days - 1) if days else None
+        state = (await db.execute(
+            self.state_counts(datetime.combine(since, datetime.min.time()) if since else None)
+        )).one()
+        totals = (await db.execute(self.rollup_totals(since))).one()
+        return {**state._asdict(), **self._totals(totals)}
+
+    async def site_metrics(
+        self,
+        db: AsyncSession,
+        site_id,
+        since: Optional[date] = None,
+        until: Optional[date] = None
+    ) -> Dict:
+        """Job totals for one site between two days (inclusive)"""
+        totals = (await db.execute(self.rollup_totals(since, until, site_id=site_id))).one()
+        return self._totals(totals)
+
+    @staticmethod
+    def method_breakdown(since: datetime):
+        """Finished jobs per (method, job type): counts, duration percentiles, cost"""
+        # NULL for failed jobs, which percentile_cont and avg skip
+        duration = case(
+            (Job.status == "success", cast(func.extract("epoch", Job.completed_at - Job.started_at), Float))
+        )
+        return select(
+            Job.method,
+            Job.job_type,
+            func.count().label("total_jobs"),
+            func.count().filter(Job.status == "success").label("success_count"),
+            func.avg(duration).label("avg_time_seconds"),
+            func.percentile_cont(0.5).within_group(duration).label("p50_seconds"),
+            func.percentile_cont(0.9).within_group(duration).label("p90_seconds"),
+            func.percentile_cont(0.99).within_group(duration).label("p99_seconds"),
+            func.avg(Job.result["categories_found"].as_integer()).label("avg_categories_found"),
+            func.coalesce(func.sum(Job.cost_usd), 0).label("total_cost_usd")
+        ).where(
+            Job.created_at > since,
+            Job.status.in_(("success", "failed"))
+        ).group_by(Job.method, Job.job_type).order_by(Job.job_type, Job.method)
+
+    async def method_performance(self, db: AsyncSession, days: int = 30) -> Dict:
+        """Method comparison over the last `days` days, with recommendations"""
+        since = datetime.utcnow() - timedelta(days=days)
+        rows = (await db.execute(self.method_breakdown(since))).all()
+
+        methods = []
+        for row in rows:
+            stats = row._asdict()
+            total, successes = int(stats["total_jobs"]), int(stats["success_count"])
+            cost = float(stats["total_cost_usd"] or 0)
+            methods.append({
+                **{
+                    name: float(value) if value is not None else None
+                    for name, value in stats.items()
+                    if name not in ("method", "job_type", "total_jobs", "success_count")
+                },
+                "method": stats["method"] or "auto",
+                "job_type": stats["job_type"],
+                "total_jobs": total,
+                "success_count": successes,
+                "failure_count": total - successes,
+                "success_rate": successes / total if total else 0.0,
+                "total_cost_usd": cost,
+                "avg_cost_usd": cost / total if total else 0.0,
+                "cost_per_success_usd": cost / successes if successes else None
+            })
+
+        return {
+            "window_days": days,
+            "method_performance": methods,
+            "recommendations": self._recommendations(methods, days)
+        }
+
+    @staticmethod
+    def _recommendations(methods: List[Dict], days: int) -> List[str]:
+        if not methods:
+            return [f"No finished jobs in the last {days} days"]
+
+        recommendations = []
+        by_type: Dict[str, List[Dict]] = {}
+        for stats in methods:
+            if stats["success_count"]:
+                by_type.setdefault(stats["job_type"], []).append(stats)
+        for job_type, candidates in sorted(by_type.items()):
+            if len(candidates) < 2:
+                continue
+            # Cheapest successful run, then the more reliable and faster method
+            best = min(candidates, key=lambda m: (
+                m["cost_per_success_usd"], -m["success_rate"], m["p50_seconds"] or 0
+            ))
+            recommendations.append(
+                f"{job_type}: {best['method']} has the lowest cost per successful job "
+                f"(${best['cost_per_success_usd']:.4f}, {best['success_rate']:.0%} success, "
+                f"p50 {best['p50_seconds'] or 0:.1f}s)"
+            )
+        for stats in methods:
+            if stats["total_jobs"] >= 10 and stats["success_rate"] < 0.7:
+                recommendations.append(
+                    f"{stats['job_type']} via {stats['method']} succeeds only "
+                    f"{stats['success_rate']:.0%} of the time"
+                )
+        return recommendations
+
+    @staticmethod
+    def _totals(row) -> Dict:
+        totals = row._asdict()
+        total_jobs = int(totals["total_jobs"])
+        return {
+            **totals,
+            "total_jobs": total_jobs,
+            "successful_jobs": int(totals["successful_jobs"]),
+            "failed_jobs": int(totals["failed_jobs"]),
+            "avg_duration": float(totals["avg_duration"]) if totals["avg_duration"] else None,
+            "success_rate": int(totals["successful_jobs"]) / total_jobs if total_jobs else None
+        }
+
+
+# Global instance
+analytics_service = AnalyticsService()
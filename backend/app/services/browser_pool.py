@@ -0,0 +1,254 @@
+"""Long-lived Playwright browser pool with per-discovery context leases"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+
+# Lazy import Playwright to avoid startup failures
+try:
+    from playwright.async_api import async_playwright, Browser, BrowserContext
+    PLAYWRIGHT_AVAILABLE = True
+except ImportError:
+    async_playwright = None
+    Browser = None
+    BrowserContext = None
+    PLAYWRIGHT_AVAILABLE = False
+
+from app.config import settings
+
+
+class _PooledBrowser:
+    """One Chromium process plus its lease bookkeeping"""
+
+    def __init__(self, browser: "Browser"):
+        self.browser = browser
+        self.active = 0
+        self.contexts_served = 0
+        self.retiring = False
+
+    @property
+    def healthy(self) -> bool:
+        return self.browser.is_connected()
+
+
+class BrowserPool:
+    """
+    Pool of Chromium processes shared by every discovery in a worker process.
+
+    Each discovery leases a fresh BrowserContext (isolated cookies/storage)
+    instead of launching a new browser. Browsers are recycled after
+    BROWSER_RECYCLE_AFTER contexts to bound memory growth, and a background
+    health check relaunches browsers that crashed.
+    """
+
+    LAUNCH_ARGS = [
+        '--no-sandbox',
+        '--disable-setuid-sandbox'
+    ]
+
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        max_pages: Optional[int] = None,
+        recycle_after: Optional[int] = None,
+        health_check_interval: Optional[float] = None
+    ):
+        self.size = size or settings.BROWSER_POOL_SIZE
+        self.max_pages = max_pages or settings.BROWSER_MAX_PAGES
+        self.recycle_after = recycle_after or settings.BROWSER_RECYCLE_AFTER
+        self.health_check_interval = health_check_interval or settings.BROWSER_HEALTH_CHECK_INTERVAL
+
+        self._playwright = None
+        self._browsers: List[_PooledBrowser] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._health_task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ready: Optional[asyncio.Future] = None
+
+        self.launches = 0
+        self.restarts = 0
+
+    @property
+    def started(self) -> bool:
+        # A failed start resets _ready, so a finished future means success
+        return self._ready is not None and self._ready.done()
+
+    async def start(self) -> None:
+        """Launch the browsers; safe to call more than once or concurrently"""
+        if not PLAYWRIGHT_AVAILABLE:
+            raise RuntimeError("Playwright not available")
+
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            await asyncio.shield(self._ready)
+            return
+        if self._loop is not None:
+            # Playwright handles are bound to the loop that created them; the
+            # old loop is gone, so its driver and browsers exit with it
+            print("⚠️  Browser pool event loop changed, relaunching browsers")
+            self._reset()
+
+        self._loop = loop
+        self._ready = loop.create_future()
+        try:
+            self._lock = asyncio.Lock()
+            self._slots = asyncio.Semaphore(self.size * self.max_pages)
+            self._playwright = await async_playwright().start()
+
+            for _ in range(self.size):
+                self._browsers.append(await self._launch())
+        except BaseException as e:
+            if isinstance(e, Exception):
+                self._ready.set_exception(e)
+                self._ready.exception()
+            else:
+                self._ready.cancel()
+            self._reset()
+            raise
+
+        self._health_task = asyncio.create_task(self._health_loop())
+        self._ready.set_result(None)
+
+    def _reset(self) -> None:
+        self._playwright = None
+        self._browsers = []
+        self._slots = None
+        self._lock = None
+        self._health_task = None
+        self._loop = None
+        self._ready = None
+
+    async def _launch(self) -> _PooledBrowser:
+        browser = await self._playwright.chromium.launch(
+            headless=True,
+            args=self.LAUNCH_ARGS
+        )
+        self.launches += 1
+        return _PooledBrowser(browser)
+
+    async def _replace(self, pooled: _PooledBrowser) -> None:
+        """Close a browser and put a fresh one in its slot"""
+        try:
+            await pooled.browser.close()
+        except Exception:
+            pass
+
+        replacement = await self._launch()
+        index = self._browsers.index(pooled)
+        self._browsers[index] = replacement
+
+    async def _pick(self) -> _PooledBrowser:
+        async with self._lock:
+            for pooled in list(self._browsers):
+                if not pooled.healthy and pooled.active == 0:
+                    self.restarts += 1
+                    await self._replace(pooled)
+
+            candidates = [
+                b for b in self._browsers
+                if b.healthy and not b.retiring and b.active < self.max_pages
+            ]
+            if not candidates:
+                # Every browser is retiring or unhealthy; launch an extra
+                # one rather than blocking the lease
+                extra = await self._launch()
+                self._browsers.append(extra)
+                candidates = [extra]
+
+            pooled = min(candidates, key=lambda b: b.active)
+            pooled.active += 1
+            return pooled
+
+    async def _release(self, pooled: _PooledBrowser) -> None:
+        async with self._lock:
+            pooled.active -= 1
+            pooled.contexts_served += 1
+
+            if pooled.contexts_served >= self.recycle_after:
+                pooled.retiring = True
+
+            if pooled.retiring and pooled.active == 0 and pooled in self._browsers:
+                if len(self._browsers) > self.size:
+                    self._browsers.remove(pooled)
+                    try:
+                        await pooled.browser.close()
+                    except Exception:
+                        pass
+                else:
+                    await self._replace(pooled)
+
+    @asynccontextmanager
+    async def context(self, **context_options) -> AsyncIterator["BrowserContext"]:
+        """Lease a fresh BrowserContext for the duration of one discovery"""
+        await self.start()
+
+        async with self._slots:
+            pooled = await self._pick()
+            context = None
+            try:
+                context = await pooled.browser.new_context(**context_options)
+                yield context
+            finally:
+                if context is not None:
+                    try:
+                        await context.close()
+                    except Exception:
+                        pass
+                await self._release(pooled)
+
+    async def health_check(self) -> int:
+        """Relaunch crashed idle browsers; returns how many were restarted"""
+        if not self.started:
+            return 0
+
+        restarted = 0
+        async with self._lock:
+            for pooled in list(self._browsers):
+                if not pooled.healthy and pooled.active == 0:
+                    await self._replace(pooled)
+                    restarted += 1
+        self.restarts += restarted
+        return restarted
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            try:
+                restarted = await self.health_check()
+                if restarted:
+                    print(f"⚠️  Browser pool restarted {restarted} crashed browser(s)")
+            except Exception as e:
+                print(f"Browser pool health check error: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "browsers": len(self._browsers),
+            "active_contexts": sum(b.active for b in self._browsers),
+            "launches": self.launches,
+            "restarts": self.restarts
+        }
+
+    async def close(self) -> None:
+        """Shut down every browser; call on worker process shutdown"""
+        if not self.started or self._loop is not asyncio.get_running_loop():
+            self._reset()
+            return
+
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+
+        for pooled in self._browsers:
+            try:
+                await pooled.browser.close()
+            except Exception:
+                pass
+
+        if self._playwright is not None:
+            await self._playwright.stop()
+
+        self._reset()
+
+
+# Global instance (one pool per worker process)
+browser_pool = BrowserPool()
@@ -1,10 +1,10 @@
 """Compliance and ethics checker for web discovery operations"""
-import asyncio
 from typing import Optional, Dict, List
-from urllib.parse import urlparse, urljoin
-from urllib.robotparser import RobotFileParser
-import httpx
-from datetime import datetime, timedelta
+from urllib.parse import urlparse
+from datetime import datetime
+
+from app.services.politeness import PolitenessScheduler
+from app.services.robots_cache import RobotsCache, RobotsRules
 
 
 class ComplianceChecker:
@@ -16,12 +16,10 @@ class ComplianceChecker:
     # User agent for all requests (transparent identity)
     USER_AGENT = "WebIntelligencePlatform/1.0 (Research; +https://github.com/FraudShield1/web-intelligence-platform)"
     
-    # Cache for robots.txt parsers
-    _robots_cache: Dict[str, tuple[RobotFileParser, datetime]] = {}
-    _cache_ttl = timedelta(hours=1)
-    
     def __init__(self):
-        self.last_request_time: Dict[str, datetime] = {}
+        # Shared across every discovery in this process
+        self.robots = RobotsCache(user_agent=self.USER_AGENT)
+        self.politeness = PolitenessScheduler(self.MIN_REQUEST_DELAY, robots=self.robots)
     
     async def check_robots_txt(self, url: str) -> tuple[bool, Optional[str]]:
         """
@@ -30,59 +28,23 @@ class ComplianceChecker:
         Returns:
             (is_allowed, reason_if_blocked)
         """
-        parsed = urlparse(url)
-        base_url = f"{parsed.scheme}://{parsed.netloc}"
-        robots_url = urljoin(base_url, "/robots.txt")
-        
-        # Check cache
-        if base_url in self._robots_cache:
-            parser, cached_at = self._robots_cache[base_url]
-            if datetime.utcnow() - cached_at < self._cache_ttl:
-                if parser.can_fetch(self.USER_AGENT, url):
-                    return True, None
-                else:
-                    return False, f"Disallowed by robots.txt for {self.USER_AGENT}"
-        
-        # Fetch robots.txt
-        try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(
-                    robots_url,
-                    headers={"User-Agent": self.USER_AGENT},
-                    follow_redirects=True
-                )
-                
-                parser = RobotFileParser()
-                parser.parse(response.text.splitlines())
-                
-                # Cache the parser
-                self._robots_cache[base_url] = (parser, datetime.utcnow())
-                
-                if parser.can_fetch(self.USER_AGENT, url):
-                    return True, None
-                else:
-                    return False, f"Disallowed by robots.txt for {self.USER_AGENT}"
-                    
-        except Exception as e:
-            # If robots.txt is unreachable, assume allowed (standard practice)
-            # but log the error
+        rules = await self.robots.get(url)
+        if rules.can_fetch(self.USER_AGENT, url):
             return True, None
+        return False, f"Disallowed by robots.txt for {self.USER_AGENT}"
     
-    async def enforce_rate_limit(self, domain: str) -> None:
-        """
-        Enforce minimum delay between requests to same domain
-        Implements polite crawling
+    async def get_robots_rules(self, url: str) -> RobotsRules:
+        """Cached robots.txt rules (Crawl-delay, Sitemaps) for url's host"""
+        return await self.robots.get(url)
+    
+    async def enforce_rate_limit(self, url: str) -> None:
         """
-        parsed = urlparse(domain)
-        base_domain = f"{parsed.scheme}://{parsed.netloc}"
-        
-        if base_domain in self.last_request_time:
-            elapsed = (datetime.utcnow() - self.last_request_time[base_domain]).total_seconds()
-            if elapsed < self.MIN_REQUEST_DELAY:
-                wait_time = self.MIN_REQUEST_DELAY - elapsed
-                await asyncio.sleep(wait_time)
+        Wait for the host's next polite request slot
         
-        self.last_request_time[base_domain] = datetime.utcnow()
+        Slots are at least MIN_REQUEST_DELAY (or the robots.txt
+        Crawl-delay, if larger) apart per host.
+        """
+        await self.politeness.acquire(url)
     
     def get_headers(self) -> Dict[str, str]:
         """Get standard headers with transparent identification"""
@@ -182,11 +144,15 @@ class ComplianceChecker:
         self,
         url: str,
         base_domain: str,
-        html: Optional[str] = None
+        html: Optional[str] = None,
+        enforce_rate_limit: bool = True
     ) -> tuple[bool, Optional[str]]:
         """
         Complete validation check for a request
         
+        Pass enforce_rate_limit=False when the request goes through a
+        FetchSession, which applies the rate limit itself on cache misses.
+        
         Returns:
             (is_valid, reason_if_invalid)
         """
@@ -207,7 +173,8 @@ class ComplianceChecker:
                 return False, f"Privacy: {public_reason}"
         
         # Enforce rate limit
-        await self.enforce_rate_limit(url)
+        if enforce_rate_limit:
+            await self.enforce_rate_limit(url)
         
         return True, None
     
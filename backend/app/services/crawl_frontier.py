@@ -0,0 +1,188 @@
+"""Bounded-concurrency BFS crawl frontier used by discovery phase 1"""
+import asyncio
+import itertools
+import time
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urldefrag, urlparse
+
+from app.services.fetch_session import FetchSession
+
+
+# extract_links(url, html) -> [{"url": ..., "text": ..., "nav": bool}]
+LinkExtractor = Callable[[str, str], List[Dict]]
+# allow_fetch(url, html=None) -> bool
+FetchGate = Callable[..., Awaitable[bool]]
+
+
+class CrawlFrontier:
+    """
+    Async breadth-first crawler with a priority queue.
+
+    Pages are ordered by depth, then navigation links before body links.
+    Fetching runs in parallel with a per-host concurrency cap and stops as
+    soon as any budget (pages, bytes or seconds) is exhausted.
+    """
+
+    def __init__(
+        self,
+        session: FetchSession,
+        extract_links: LinkExtractor,
+        allow_fetch: Optional[FetchGate] = None,
+        max_depth: int = 3,
+        max_pages: int = 50,
+        max_bytes: int = 20_000_000,
+        max_seconds: float = 90.0,
+        concurrency: int = 8,
+        per_host_concurrency: int = 2
+    ):
+        self.session = session
+        self.extract_links = extract_links
+        self.allow_fetch = allow_fetch
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.concurrency = concurrency
+        self.per_host_concurrency = per_host_concurrency
+
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._seq = itertools.count()
+        self._host_slots: Dict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(self.per_host_concurrency)
+        )
+        self._seen: set = set()
+        self._deadline = 0.0
+
+        self.links: Dict[str, Dict] = {}
+        self.pages: List[Dict] = []
+        self.pages_fetched = 0
+        self.bytes_fetched = 0
+        self.stop_reason: Optional[str] = None
+
+    @staticmethod
+    def normalize(url: str) -> str:
+        """Drop fragments so #anchors don't count as separate pages"""
+        return urldefrag(url)[0]
+
+    def add_links(self, links: List[Dict], depth: int) -> None:
+        """Record links found at the given depth and queue the crawlable ones"""
+        for link in links:
+            url = self.normalize(link["url"])
+            if url in self._seen:
+                continue
+            self._seen.add(url)
+
+            self.links[url] = {
+                "url": url,
+                "text": link.get("text", ""),
+                "depth": depth
+            }
+
+            # Pages at max depth are recorded but not expanded
+            if depth < self.max_depth:
+                priority = 0 if link.get("nav") else 1
+                self._queue.put_nowait((depth, priority, next(self._seq), url))
+
+    async def crawl(self, root_url: str, root_links: List[Dict]) -> Dict:
+        """
+        Crawl outward from links already extracted from the root page
+
+        The root page itself counts as depth 0 and is assumed fetched.
+        """
+        started = time.monotonic()
+        self._deadline = started + self.max_seconds
+        self._seen.add(self.normalize(root_url))
+        self.pages_fetched = 1
+        self.add_links(root_links, depth=1)
+
+        workers = [
+            asyncio.create_task(self._worker())
+            for _ in range(self.concurrency)
+        ]
+
+        try:
+            await asyncio.wait_for(
+                self._queue.join(),
+                timeout=max(self._deadline - time.monotonic(), 0)
+            )
+            if self.stop_reason is None:
+                self.stop_reason = "exhausted"
+        except asyncio.TimeoutError:
+            self.stop_reason = self.stop_reason or "max_seconds"
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        return {
+            "links": sorted(self.links.values(), key=lambda l: l["depth"]),
+            "pages": self.pages,
+            "pages_crawled": self.pages_fetched,
+            "bytes_fetched": self.bytes_fetched,
+            "stop_reason": self.stop_reason,
+            "elapsed_seconds": round(time.monotonic() - started, 2)
+        }
+
+    def _over_budget(self) -> bool:
+        if self.stop_reason is not None:
+            return True
+        if self.pages_fetched >= self.max_pages:
+            self.stop_reason = "max_pages"
+        elif self.bytes_fetched >= self.max_bytes:
+            self.stop_reason = "max_bytes"
+        elif time.monotonic() >= self._deadline:
+            self.stop_reason = "max_seconds"
+        return self.stop_reason is not None
+
+    async def _worker(self) -> None:
+        while True:
+            depth, _, _, url = await self._queue.get()
+            try:
+                if not self._over_budget():
+                    # Reserve the page slot before awaiting so parallel
+                    # workers cannot overshoot the page budget; skipped and
+                    # failed fetches give it back
+                    self.pages_fetched += 1
+                    visited = False
+                    try:
+                        visited = await self._visit(url, depth)
+                    finally:
+                        if not visited:
+                            self.pages_fetched -= 1
+            except Exception as e:
+                print(f"Crawl error on {url}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _visit(self, url: str, depth: int) -> bool:
+        """Fetch one page and queue its links; returns False if skipped"""
+        if self.allow_fetch is not None and not await self.allow_fetch(url):
+            return False
+
+        host = urlparse(url).netloc
+        async with self._host_slots[host]:
+            if time.monotonic() >= self._deadline:
+                return False
+            response = await self.session.get(url)
+
+        size = len(response.content)
+        self.bytes_fetched += size
+        self.pages.append({
+            "url": url,
+            "depth": depth,
+            "status": response.status_code,
+            "bytes": size
+        })
+
+        content_type = response.headers.get("content-type", "")
+        if response.status_code >= 400 or (content_type and "html" not in content_type):
+            return True
+
+        html = response.text
+        if self.allow_fetch is not None and not await self.allow_fetch(url, html=html):
+            return True
+
+        # Parsing is CPU-bound; keep it off the loop other jobs share
+        self.add_links(await asyncio.to_thread(self.extract_links, url, html), depth + 1)
+        return True
@@ -1,25 +1,31 @@
 """Advanced site discovery service - Feature G implementation"""
 import asyncio
+import time
 from typing import Dict, List, Optional, Set, Tuple
 from urllib.parse import urlparse, urljoin
 from datetime import datetime
 import re
 from collections import defaultdict, Counter
 
-import httpx
-from bs4 import BeautifulSoup
+from app.services.browser_pool import browser_pool, PLAYWRIGHT_AVAILABLE
+from app.services.compliance_checker import compliance_checker
+from app.services.crawl_frontier import CrawlFrontier
+from app.services.fetch_session import FetchSession
+from app.services.parsed_document import ParsedDocument, document_cache
+from app.services.phase_scheduler import PhaseDoneHook, PhaseGraph, phase_deadline
+from app.services.revalidation import RevalidationCache
+from app.services.snapshot_store import snapshot_store
+from app.services.selector_engine import (
+    DEFAULT_CANDIDATES, SelectorEngine, load_config_candidates
+)
 
-# Lazy import Playwright to avoid startup failures
-try:
-    from playwright.async_api import async_playwright, Browser, Page
-    PLAYWRIGHT_AVAILABLE = True
-except ImportError:
-    async_playwright = None
-    Browser = None
-    Page = None
-    PLAYWRIGHT_AVAILABLE = False
 
-from app.services.compliance_checker import compliance_checker
+class DiscoveryBlocked(Exception):
+    """Raised when compliance checks forbid discovering a site"""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
 
 
 class DiscoveryService:
@@ -31,6 +37,12 @@ class DiscoveryService:
     # Discovery limits (prevent infinite crawling)
     MAX_PAGES_PER_SITE = 50
     MAX_DEPTH = 3
+    MAX_LINKS_PER_SITE = 500
+    MAX_CRAWL_BYTES = 20_000_000
+    MAX_CRAWL_SECONDS = 90.0
+    CRAWL_CONCURRENCY = 8
+    PER_HOST_CONCURRENCY = 2
+    MAX_SELECTOR_SAMPLES = 5
     PAGE_TIMEOUT = 30000  # milliseconds
 
     def __init__(self):
@@ -42,8 +54,19 @@ class DiscoveryService:
         self.compliance = compliance_checker
         self.discovered_urls: Set[str] = set()
         self.url_patterns: Dict[str, List[str]] = defaultdict(list)
+        # Compiled once; per-site template candidates extend it per discovery
+        self.selector_engine = SelectorEngine(DEFAULT_CANDIDATES).extended(
+            load_config_candidates()
+        )
     
-    async def discover_site(self, url: str) -> Dict:
+    async def discover_site(
+        self,
+        url: str,
+        selector_candidates: Optional[Dict[str, List[str]]] = None,
+        revalidation: Optional[RevalidationCache] = None,
+        on_phase_done: Optional[PhaseDoneHook] = None,
+        deadline: Optional[float] = None
+    ) -> Dict:
         """
         Main entry point for site discovery
         
@@ -54,94 +77,171 @@ class DiscoveryService:
         - API endpoints
         - Selectors
         - Pagination logic
+        
+        selector_candidates adds per-site selector candidates (e.g. from a
+        platform template) to the ones phase 4 always evaluates.
+        revalidation holds validators from earlier runs; pages are then
+        fetched conditionally and 304s reuse the stored body.
+        on_phase_done is awaited as each phase finishes (progress reporting).
+        deadline (time.monotonic()) is split across the phases; phases that
+        overrun are cancelled and the report is marked partial.
         """
         start_time = datetime.utcnow()
         
         try:
-            # Phase 1: Structure Exploration
-            print(f"🔍 Phase 1: Exploring {url}...")
-            structure = await self._phase1_structure_exploration(url)
+            async with FetchSession(
+                headers=self.compliance.get_headers(),
+                before_request=self.compliance.enforce_rate_limit,
+                revalidation=revalidation,
+                snapshots=snapshot_store
+            ) as session:
+                return await self._run_phases(
+                    url, session, start_time, selector_candidates, on_phase_done, deadline
+                )
             
+        except DiscoveryBlocked as e:
+            return {
+                "success": False,
+                "error": e.reason,
+                "url": url
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "url": url,
+                "duration_seconds": (datetime.utcnow() - start_time).total_seconds()
+            }
+    
+    async def _run_phases(
+        self,
+        url: str,
+        session: FetchSession,
+        start_time: datetime,
+        selector_candidates: Optional[Dict[str, List[str]]] = None,
+        on_phase_done: Optional[PhaseDoneHook] = None,
+        deadline: Optional[float] = None
+    ) -> Dict:
+        """Run the discovery phase graph against a single fetch session"""
+        async def structure_phase() -> Dict:
+            print(f"🔍 Phase 1: Exploring {url}...")
+            structure = await self._phase1_structure_exploration(url, session)
             if not structure.get("allowed"):
-                return {
-                    "success": False,
-                    "error": structure.get("reason", "Not allowed to crawl"),
-                    "url": url
-                }
-            
-            # Phase 2: Category Hierarchy Detection
+                raise DiscoveryBlocked(structure.get("reason", "Not allowed to crawl"))
+            return structure
+
+        async def categories_phase(structure: Dict) -> Dict:
             print(f"📁 Phase 2: Detecting categories...")
-            categories = await self._phase2_category_detection(
+            return await self._phase2_category_detection(
                 url,
                 structure.get("links", [])
             )
-            
-            # Phase 3: Product Pattern Recognition
+
+        async def products_phase(structure: Dict, categories: Dict) -> Dict:
             print(f"🛍️ Phase 3: Recognizing product patterns...")
-            products = await self._phase3_product_recognition(
+            return await self._phase3_product_recognition(
                 url,
                 structure.get("links", []),
                 categories
             )
-            
-            # Phase 4: Selector Extraction
+
+        async def selectors_phase(products: Dict) -> Dict:
             print(f"🎯 Phase 4: Extracting selectors...")
-            selectors = await self._phase4_selector_extraction(
+            return await self._phase4_selector_extraction(
                 url,
-                products.get("sample_pages", [])
+                products.get("sample_pages", []),
+                session,
+                selector_candidates
             )
-            
-            # Phase 5: API Endpoint Discovery
+
+        async def endpoints_phase(structure: Dict) -> Dict:
+            # Only needs the homepage, which the session already holds
             print(f"🔌 Phase 5: Discovering API endpoints...")
-            endpoints = await self._phase5_endpoint_discovery(url)
-            
-            # Phase 6: Pagination & Render Logic
+            return await self._phase5_endpoint_discovery(url, session)
+
+        async def pagination_phase(products: Dict) -> Dict:
             print(f"📄 Phase 6: Detecting pagination...")
-            pagination = await self._phase6_pagination_detection(
+            return await self._phase6_pagination_detection(
                 url,
-                products.get("listing_pages", [])
+                products.get("listing_pages", []),
+                session
             )
-            
-            # Calculate confidence score
-            confidence = self._calculate_confidence(
-                structure, categories, products, selectors, endpoints, pagination
-            )
-            
-            duration = (datetime.utcnow() - start_time).total_seconds()
-            
-            return {
-                "success": True,
-                "url": url,
-                "discovered_at": start_time.isoformat(),
-                "duration_seconds": duration,
-                "confidence_score": confidence,
-                "structure": structure,
-                "categories": categories,
-                "products": products,
-                "selectors": selectors,
-                "endpoints": endpoints,
-                "pagination": pagination,
-                "render_hints": {
-                    "requires_js": structure.get("requires_js", False),
-                    "wait_for_selector": selectors.get("wait_for"),
-                    "timeout_seconds": 30
-                }
-            }
-            
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e),
-                "url": url,
-                "duration_seconds": (datetime.utcnow() - start_time).total_seconds()
+
+        # Phases 4, 5 and 6 are independent of each other and overlap.
+        # Weights set each phase's share of a deadline (the crawl dominates)
+        graph = (
+            PhaseGraph()
+            .add("structure", structure_phase, weight=3.0)
+            .add("categories", categories_phase, depends_on=["structure"], weight=0.5)
+            .add("products", products_phase, depends_on=["structure", "categories"], weight=2.0)
+            .add("selectors", selectors_phase, depends_on=["products"], weight=2.0)
+            .add("endpoints", endpoints_phase, depends_on=["structure"])
+            .add("pagination", pagination_phase, depends_on=["products"])
+        )
+        results, phase_timings = await graph.run(on_phase_done, deadline)
+
+        if "structure" not in results:
+            raise Exception("Deadline reached before the site structure was explored")
+
+        incomplete = {name: status for name, status in graph.status.items() if status != "done"}
+        structure = results["structure"]
+        categories = results.get("categories", {})
+        products = results.get("products", {})
+        selectors = results.get("selectors", {})
+        endpoints = results.get("endpoints", {})
+        pagination = results.get("pagination", {})
+
+        # Calculate confidence score
+        confidence = self._calculate_confidence(
+            structure, categories, products, selectors, endpoints, pagination
+        )
+
+        duration = (datetime.utcnow() - start_time).total_seconds()
+
+        return {
+            "success": True,
+            "url": url,
+            "discovered_at": start_time.isoformat(),
+            "duration_seconds": duration,
+            "confidence_score": confidence,
+            "structure": structure,
+            "categories": categories,
+            "products": products,
+            "selectors": selectors,
+            "endpoints": endpoints,
+            "pagination": pagination,
+            "render_hints": {
+                "requires_js": structure.get("requires_js", False),
+                "wait_for_selector": selectors.get("wait_for"),
+                "timeout_seconds": 30
+            },
+            "fetch_stats": session.stats(),
+            "phase_timings": phase_timings,
+            "partial": bool(incomplete),
+            "phases": {
+                "completed": [name for name in graph.order() if name in results],
+                "incomplete": incomplete
             }
+        }
+    
+    def _crawl_seconds(self) -> float:
+        """Crawl time limit, shortened to stop on its own within the phase budget"""
+        deadline = phase_deadline()
+        if deadline is None:
+            return self.MAX_CRAWL_SECONDS
+        # Leave a fifth of the budget for link analysis and the JS fallback
+        return max(min(self.MAX_CRAWL_SECONDS, (deadline - time.monotonic()) * 0.8), 0.0)
     
-    async def _phase1_structure_exploration(self, url: str) -> Dict:
+    async def _phase1_structure_exploration(
+        self,
+        url: str,
+        session: FetchSession
+    ) -> Dict:
         """
         Phase 1: Ethical structure exploration
         
         - Check robots.txt compliance
-        - Crawl homepage + linked pages (max depth 3)
+        - Crawl homepage + linked pages (BFS up to MAX_DEPTH)
         - Extract all internal links
         - Detect navigation patterns
         - Build site graph
@@ -153,61 +253,32 @@ class DiscoveryService:
             return {"allowed": False, "reason": reason}
         
         self.compliance.log_compliance_decision(url, True)
+        robots = await self.compliance.get_robots_rules(url)
         
         # Fetch homepage
-        links = []
-        nav_links = []
         requires_js = False
         
         try:
-            async with httpx.AsyncClient(
-                timeout=30.0,
-                headers=self.compliance.get_headers(),
-                follow_redirects=True
-            ) as client:
-                # Enforce rate limit
-                await self.compliance.enforce_rate_limit(url)
-                
-                response = await client.get(url)
-                html = response.text
-                
-                # Check if public content
-                is_public, public_reason = self.compliance.is_public_content(url, html)
-                if not is_public:
-                    return {
-                        "allowed": False,
-                        "reason": f"Private content: {public_reason}"
-                    }
-                
-                # Parse HTML
-                soup = BeautifulSoup(html, 'lxml')
-                
-                # Check if JS required
-                body_text = soup.body.get_text(strip=True) if soup.body else ""
-                if len(body_text) < 200 or soup.find(id="root") or soup.find(id="app"):
-                    requires_js = True
-                
-                # Extract all links
-                for a_tag in soup.find_all('a', href=True):
-                    href = a_tag['href']
-                    absolute_url = urljoin(url, href)
-                    
-                    # Check if should crawl
-                    should_crawl, crawl_reason = self.compliance.should_crawl_url(
-                        absolute_url, url
-                    )
-                    
-                    if should_crawl:
-                        links.append({
-                            "url": absolute_url,
-                            "text": a_tag.get_text(strip=True)[:100],
-                            "depth": 1
-                        })
-                        
-                        # Check if in navigation
-                        parent = a_tag.parent
-                        if parent and parent.name in ['nav', 'header', 'menu']:
-                            nav_links.append(absolute_url)
+            # Rate limit is enforced by the session on cache misses
+            response = await session.get(url)
+            html = response.text
+            
+            # Check if public content
+            is_public, public_reason = self.compliance.is_public_content(url, html)
+            if not is_public:
+                return {
+                    "allowed": False,
+                    "reason": f"Private content: {public_reason}"
+                }
+            
+            # Parse HTML (shared with later phases via the document cache)
+            document = await document_cache.parse(html)
+            
+            # Check if JS required
+            if document.body_text_length < 200 or document.has_spa_root:
+                requires_js = True
+            
+            root_links = self._extract_links(url, document, url)
         
         except Exception as e:
             return {
@@ -215,13 +286,41 @@ class DiscoveryService:
                 "reason": f"Error fetching: {str(e)}"
             }
         
+        nav_links = [link["url"] for link in root_links if link["nav"]]
+        
+        # Crawl outward from the homepage (BFS up to MAX_DEPTH)
+        async def allow_fetch(page_url: str, html: Optional[str] = None) -> bool:
+            allowed, _ = await self.compliance.validate_request(
+                page_url, url, html=html, enforce_rate_limit=False
+            )
+            return allowed
+        
+        frontier = CrawlFrontier(
+            session,
+            extract_links=lambda page_url, page_html: self._extract_links(
+                page_url, document_cache.get(page_html), url
+            ),
+            allow_fetch=allow_fetch,
+            max_depth=self.MAX_DEPTH,
+            max_pages=self.MAX_PAGES_PER_SITE,
+            max_bytes=self.MAX_CRAWL_BYTES,
+            max_seconds=self._crawl_seconds(),
+            concurrency=self.CRAWL_CONCURRENCY,
+            per_host_concurrency=self.PER_HOST_CONCURRENCY
+        )
+        crawl = await frontier.crawl(url, root_links)
+        links = crawl["links"]
+        
         # If JS required, use Playwright for deeper exploration
         if requires_js:
             playwright_links = await self._explore_with_playwright(url)
-            links.extend(playwright_links)
+            links.extend(
+                link for link in playwright_links
+                if CrawlFrontier.normalize(link["url"]) not in frontier.links
+            )
         
         # Limit links
-        links = links[:self.MAX_PAGES_PER_SITE]
+        links = links[:self.MAX_LINKS_PER_SITE]
         
         return {
             "allowed": True,
@@ -229,9 +328,41 @@ class DiscoveryService:
             "nav_links": nav_links,
             "total_links": len(links),
             "requires_js": requires_js,
-            "homepage_html": html if not requires_js else None
+            "homepage_html": html if not requires_js else None,
+            "robots": {
+                "crawl_delay": robots.crawl_delay,
+                "sitemaps": robots.sitemaps
+            },
+            "crawl": {
+                "pages_crawled": crawl["pages_crawled"],
+                "bytes_fetched": crawl["bytes_fetched"],
+                "max_depth_reached": max((l["depth"] for l in links), default=0),
+                "stop_reason": crawl["stop_reason"],
+                "elapsed_seconds": crawl["elapsed_seconds"]
+            }
         }
     
+    def _extract_links(self, page_url: str, document: ParsedDocument, base_url: str) -> List[Dict]:
+        """Extract crawlable internal links from a parsed page"""
+        links = []
+        
+        for anchor in document.anchors:
+            absolute_url = urljoin(page_url, anchor.href)
+            
+            # Check if should crawl
+            should_crawl, _ = self.compliance.should_crawl_url(absolute_url, base_url)
+            if not should_crawl:
+                continue
+            
+            # Check if in navigation
+            links.append({
+                "url": absolute_url,
+                "text": anchor.text[:100],
+                "nav": anchor.parent in ('nav', 'header', 'menu')
+            })
+        
+        return links
+    
     async def _explore_with_playwright(self, url: str) -> List[Dict]:
         """
         Use Playwright for JS-heavy sites
@@ -240,22 +371,12 @@ class DiscoveryService:
         links = []
         
         try:
-            async with async_playwright() as p:
-                # Launch browser (visible, not stealth - we're transparent)
-                browser = await p.chromium.launch(
-                    headless=True,
-                    args=[
-                        '--no-sandbox',
-                        '--disable-setuid-sandbox'
-                    ]
-                )
-                
-                # Create context with our user agent
-                context = await browser.new_context(
-                    user_agent=self.compliance.USER_AGENT,
-                    viewport={"width": 1920, "height": 1080}
-                )
-                
+            # Lease an isolated context from the long-lived browser pool
+            # (visible, not stealth - we're transparent)
+            async with browser_pool.context(
+                user_agent=self.compliance.USER_AGENT,
+                viewport={"width": 1920, "height": 1080}
+            ) as context:
                 page = await context.new_page()
                 
                 # Enforce rate limit
@@ -291,8 +412,6 @@ class DiscoveryService:
                     except:
                         continue
                 
-                await browser.close()
-                
         except Exception as e:
             print(f"Playwright error: {e}")
         
@@ -445,76 +564,44 @@ class DiscoveryService:
     async def _phase4_selector_extraction(
         self,
         base_url: str,
-        sample_pages: List[str]
+        sample_pages: List[str],
+        session: FetchSession,
+        selector_candidates: Optional[Dict[str, List[str]]] = None
     ) -> Dict:
         """
         Phase 4: Selector Extraction
         
         - Analyze DOM structure of sample pages
-        - Find repeating patterns
-        - Generate CSS selectors
-        - Validate selectors
+        - Evaluate every compiled candidate selector in one pass per page
+        - Vote for the selectors that match most pages
         """
         if not sample_pages:
             return {"selectors": {}, "confidence": 0.0}
         
+        engine = self.selector_engine
+        if selector_candidates:
+            engine = engine.extended(selector_candidates)
+        
         selectors = {}
         selector_votes = defaultdict(lambda: defaultdict(int))
         
-        # Analyze up to 3 sample pages
-        for sample_url in sample_pages[:3]:
+        # Analyze up to MAX_SELECTOR_SAMPLES sample pages
+        for sample_url in sample_pages[:self.MAX_SELECTOR_SAMPLES]:
             try:
                 # Enforce compliance
                 allowed, reason = await self.compliance.validate_request(
-                    sample_url, base_url
+                    sample_url, base_url, enforce_rate_limit=False
                 )
                 if not allowed:
                     continue
                 
-                async with httpx.AsyncClient(
-                    timeout=20.0,
-                    headers=self.compliance.get_headers()
-                ) as client:
-                    response = await client.get(sample_url)
-                    html = response.text
-                    soup = BeautifulSoup(html, 'lxml')
-                    
-                    # Try to find common product selectors
-                    # Title/Name
-                    title_candidates = [
-                        'h1.product-title', 'h1[itemprop="name"]', 'h1.title',
-                        '.product-name', '[data-testid="product-name"]'
-                    ]
-                    for selector in title_candidates:
-                        if soup.select_one(selector):
-                            selector_votes['name'][selector] += 1
-                    
-                    # Price
-                    price_candidates = [
-                        '.price', '[itemprop="price"]', '.product-price',
-                        '[data-price]', '.price--final', '.current-price'
-                    ]
-                    for selector in price_candidates:
-                        if soup.select_one(selector):
-                            selector_votes['price'][selector] += 1
-                    
-                    # Image
-                    image_candidates = [
-                        'img.product-image', '[itemprop="image"]',
-                        '.product-img img', '.main-image img'
-                    ]
-                    for selector in image_candidates:
-                        if soup.select_one(selector):
-                            selector_votes['image'][selector] += 1
-                    
-                    # Description
-                    desc_candidates = [
-                        '[itemprop="description"]', '.description',
-                        '.product-description', '#description'
-                    ]
-                    for selector in desc_candidates:
-                        if soup.select_one(selector):
-                            selector_votes['description'][selector] += 1
+                response = await session.get(sample_url)
+                soup = (await document_cache.parse(response.text)).soup
+                
+                evaluated = await asyncio.to_thread(engine.evaluate, soup)
+                for field, matched in evaluated.items():
+                    for selector in matched:
+                        selector_votes[field][selector] += 1
                 
             except Exception as e:
                 print(f"Error analyzing {sample_url}: {e}")
@@ -534,7 +621,11 @@ class DiscoveryService:
             "fields_found": list(selectors.keys())
         }
     
-    async def _phase5_endpoint_discovery(self, url: str) -> Dict:
+    async def _phase5_endpoint_discovery(
+        self,
+        url: str,
+        session: FetchSession
+    ) -> Dict:
         """
         Phase 5: API Endpoint Discovery
         
@@ -545,33 +636,28 @@ class DiscoveryService:
         endpoints = []
         
         try:
-            async with httpx.AsyncClient(
-                timeout=20.0,
-                headers=self.compliance.get_headers()
-            ) as client:
-                await self.compliance.enforce_rate_limit(url)
-                response = await client.get(url)
-                html = response.text
-                
-                # Look for common API patterns in HTML
-                api_patterns = [
-                    (r'/api/[^"\']+', 'REST'),
-                    (r'/graphql[^"\']*', 'GraphQL'),
-                    (r'/v\d+/[^"\']+', 'REST'),
-                    (r'/_next/data/[^"\']+', 'Next.js Data')
-                ]
-                
-                for pattern, api_type in api_patterns:
-                    matches = re.findall(pattern, html)
-                    for match in matches[:5]:  # Limit
-                        full_url = urljoin(url, match)
-                        if full_url not in [e['url'] for e in endpoints]:
-                            endpoints.append({
-                                "url": match,
-                                "type": api_type,
-                                "method": "GET",
-                                "discovered_from": "html_analysis"
-                            })
+            response = await session.get(url)
+            html = response.text
+            
+            # Look for common API patterns in HTML
+            api_patterns = [
+                (r'/api/[^"\']+', 'REST'),
+                (r'/graphql[^"\']*', 'GraphQL'),
+                (r'/v\d+/[^"\']+', 'REST'),
+                (r'/_next/data/[^"\']+', 'Next.js Data')
+            ]
+            
+            for pattern, api_type in api_patterns:
+                matches = re.findall(pattern, html)
+                for match in matches[:5]:  # Limit
+                    full_url = urljoin(url, match)
+                    if full_url not in [e['url'] for e in endpoints]:
+                        endpoints.append({
+                            "url": match,
+                            "type": api_type,
+                            "method": "GET",
+                            "discovered_from": "html_analysis"
+                        })
         
         except Exception as e:
             print(f"Endpoint discovery error: {e}")
@@ -584,7 +670,8 @@ class DiscoveryService:
     async def _phase6_pagination_detection(
         self,
         base_url: str,
-        listing_pages: List[str]
+        listing_pages: List[str],
+        session: FetchSession
     ) -> Dict:
         """
         Phase 6: Pagination Detection
@@ -607,60 +694,55 @@ class DiscoveryService:
         sample_url = listing_pages[0]
         
         try:
-            async with httpx.AsyncClient(
-                timeout=20.0,
-                headers=self.compliance.get_headers()
-            ) as client:
-                await self.compliance.enforce_rate_limit(sample_url)
-                response = await client.get(sample_url)
-                html = response.text
-                soup = BeautifulSoup(html, 'lxml')
-                
-                # Look for pagination links
-                pagination_selectors = [
-                    'a[href*="page="]',
-                    'a[href*="/page/"]',
-                    '.pagination a',
-                    '[class*="pagination"] a'
-                ]
-                
-                for selector in pagination_selectors:
-                    links = soup.select(selector)
-                    if links:
-                        # Found pagination
-                        href = links[0].get('href', '')
-                        if 'page=' in href:
-                            pagination['type'] = 'query_param'
-                            pagination['param'] = 'page'
-                        elif '/page/' in href:
-                            pagination['type'] = 'path_param'
-                            pagination['param'] = 'page'
-                        
-                        # Try to find max pages
-                        page_numbers = []
-                        for link in links:
-                            href = link.get('href', '')
-                            page_match = re.search(r'page[=/](\d+)', href)
-                            if page_match:
-                                page_numbers.append(int(page_match.group(1)))
-                        
-                        if page_numbers:
-                            pagination['max_pages'] = max(page_numbers)
-                        
-                        break
-                
-                # Check for infinite scroll indicators
-                infinite_scroll_indicators = [
-                    'data-infinite-scroll',
-                    'class*="infinite"',
-                    'load-more',
-                    'show-more'
-                ]
-                
-                for indicator in infinite_scroll_indicators:
-                    if soup.select(f'[{indicator}]') or indicator in html.lower():
-                        pagination['infinite_scroll'] = True
-                        break
+            response = await session.get(sample_url)
+            html = response.text
+            soup = (await document_cache.parse(html)).soup
+            
+            # Look for pagination links
+            pagination_selectors = [
+                'a[href*="page="]',
+                'a[href*="/page/"]',
+                '.pagination a',
+                '[class*="pagination"] a'
+            ]
+            
+            for selector in pagination_selectors:
+                links = soup.select(selector)
+                if links:
+                    # Found pagination
+                    href = links[0].get('href', '')
+                    if 'page=' in href:
+                        pagination['type'] = 'query_param'
+                        pagination['param'] = 'page'
+                    elif '/page/' in href:
+                        pagination['type'] = 'path_param'
+                        pagination['param'] = 'page'
+                    
+                    # Try to find max pages
+                    page_numbers = []
+                    for link in links:
+                        href = link.get('href', '')
+                        page_match = re.search(r'page[=/](\d+)', href)
+                        if page_match:
+                            page_numbers.append(int(page_match.group(1)))
+                    
+                    if page_numbers:
+                        pagination['max_pages'] = max(page_numbers)
+                    
+                    break
+            
+            # Check for infinite scroll indicators
+            infinite_scroll_indicators = [
+                'data-infinite-scroll',
+                'class*="infinite"',
+                'load-more',
+                'show-more'
+            ]
+            
+            for indicator in infinite_scroll_indicators:
+                if soup.select(f'[{indicator}]') or indicator in html.lower():
+                    pagination['infinite_scroll'] = True
+                    break
         
         except Exception as e:
             print(f"Pagination detection error: {e}")
@@ -0,0 +1,207 @@
+"""Per-run HTTP fetch session with a shared connection pool and response cache"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Optional
+
+import httpx
+
+from app.services.revalidation import RevalidationCache
+from app.services.snapshot_store import SnapshotStore
+
+
+class _FetchAborted(Exception):
+    """The task downloading a URL was cancelled before it finished"""
+
+
+class FetchSession:
+    """
+    One pooled keep-alive client plus an in-memory response cache keyed by URL.
+
+    Scoped to a single discovery run so no page is downloaded twice and
+    every phase reuses the same TLS connections. Concurrent requests for the
+    same URL share one in-flight download.
+
+    With a RevalidationCache, pages fetched by an earlier run are requested
+    conditionally (If-None-Match / If-Modified-Since) and a 304 is answered
+    with the stored body, so callers always see a normal 200 response.
+
+    With a SnapshotStore, a recent enough snapshot is served without any
+    request (extensions["snapshot"] is True and it counts as a snapshot hit,
+    not a miss), and every 200 is stored for later stages and runs.
+    """
+
+    MAX_CONNECTIONS = 20
+    MAX_KEEPALIVE_CONNECTIONS = 10
+
+    def __init__(
+        self,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 30.0,
+        before_request: Optional[Callable[[str], Awaitable[None]]] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        revalidation: Optional[RevalidationCache] = None,
+        snapshots: Optional[SnapshotStore] = None
+    ):
+        self.headers = headers or {}
+        self.timeout = timeout
+        self.before_request = before_request
+        self.transport = transport
+        self.revalidation = revalidation
+        self.snapshots = snapshots if snapshots is not None and snapshots.enabled else None
+        self.client: Optional[httpx.AsyncClient] = None
+
+        self._cache: Dict[str, httpx.Response] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.snapshot_hits = 0
+
+    async def __aenter__(self) -> "FetchSession":
+        self.client = httpx.AsyncClient(
+            timeout=self.timeout,
+            headers=self.headers,
+            follow_redirects=True,
+            transport=self.transport,
+            limits=httpx.Limits(
+                max_connections=self.MAX_CONNECTIONS,
+                max_keepalive_connections=self.MAX_KEEPALIVE_CONNECTIONS
+            )
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the underlying client and drop cached responses"""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+        self._cache.clear()
+
+    async def get(self, url: str) -> httpx.Response:
+        """
+        Fetch a URL, serving it from the run cache when already downloaded
+
+        The before_request hook (e.g. the compliance rate limiter) only runs
+        for real network requests, never for cache hits.
+        """
+        while True:
+            cached = self._cache.get(url)
+            if cached is not None:
+                self.cache_hits += 1
+                return cached
+
+            pending = self._inflight.get(url)
+            if pending is None:
+                return await self._download(url)
+            try:
+                response = await asyncio.shield(pending)
+            except _FetchAborted:
+                # Its fetcher was cancelled, not the fetch: take it over
+                continue
+            self.cache_hits += 1
+            return response
+
+    async def _download(self, url: str) -> httpx.Response:
+        """Fetch url once for every caller waiting on it"""
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[url] = future
+
+        try:
+            response = await self._fetch(url)
+        except asyncio.CancelledError:
+            # Only the fetching task is cancelled: let waiters retry the URL
+            future.set_exception(_FetchAborted(url))
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody else may be waiting; mark the exception as retrieved
+            future.exception()
+            raise
+        else:
+            self._cache[url] = response
+            future.set_result(response)
+            return response
+        finally:
+            self._inflight.pop(url, None)
+
+    async def _fetch(self, url: str) -> httpx.Response:
+        if self.client is None:
+            raise RuntimeError("FetchSession used outside of 'async with'")
+
+        if self.snapshots is not None:
+            snapshot = await self._from_snapshot(url)
+            if snapshot is not None:
+                return snapshot
+
+        self.cache_misses += 1
+        if self.before_request is not None:
+            await self.before_request(url)
+
+        response = await self._request(url)
+        if self.snapshots is not None and response.status_code == 200:
+            await self._store_snapshot(url, response)
+        return response
+
+    async def _request(self, url: str) -> httpx.Response:
+        if self.revalidation is None:
+            return await self.client.get(url)
+
+        conditional = self.revalidation.conditional_headers(url)
+        response = await self.client.get(url, headers=conditional or None)
+        if response.status_code == 304 and conditional:
+            return self.revalidation.replay(url, response)
+        self.revalidation.record(url, response)
+        return response
+
+    async def _from_snapshot(self, url: str) -> Optional[httpx.Response]:
+        """A stored 200 for url if the store has a fresh enough snapshot"""
+        # Local disk and SQLite: keep the blocking I/O off the event loop
+        try:
+            snapshot = await asyncio.to_thread(self.snapshots.latest, url)
+            if snapshot is None:
+                return None
+            body = await asyncio.to_thread(self.snapshots.read, snapshot)
+        except Exception as e:
+            print(f"⚠️  Snapshot read failed for {url}: {e}")
+            return None
+
+        self.snapshot_hits += 1
+        headers = {"content-type": snapshot.content_type} if snapshot.content_type else {}
+        return httpx.Response(
+            snapshot.status_code,
+            headers=headers,
+            content=body,
+            request=httpx.Request("GET", url),
+            extensions={"snapshot": True}
+        )
+
+    async def _store_snapshot(self, url: str, response: httpx.Response) -> None:
+        try:
+            await asyncio.to_thread(
+                self.snapshots.put,
+                url,
+                response.content,
+                response.status_code,
+                response.headers.get("content-type")
+            )
+        except Exception as e:
+            # The store is an optimisation: never fail the fetch over it
+            print(f"⚠️  Snapshot write failed for {url}: {e}")
+
+    def stats(self) -> Dict[str, float]:
+        """Per-run cache (and revalidation) counters"""
+        total = self.cache_hits + self.cache_misses + self.snapshot_hits
+        stats = {
+            "requests": total,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_hit_rate": round(self.cache_hits / total, 3) if total else 0.0
+        }
+        if self.snapshots is not None:
+            stats["snapshot_hits"] = self.snapshot_hits
+        if self.revalidation is not None:
+            stats.update(self.revalidation.stats())
+        return stats
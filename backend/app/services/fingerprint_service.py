@@ -1,65 +1,121 @@
 """Site fingerprinting service - detect CMS, frameworks, tech stack"""
-import re
-from typing import Dict, List
-import httpx
-from bs4 import BeautifulSoup
+import asyncio
+from typing import Dict, List, Optional, Set
+from app.services.fetch_session import FetchSession
+from app.services.parsed_document import ParsedDocument, document_cache
+from app.services.revalidation import RevalidationCache
+from app.services.signature_scanner import SignatureScanner
+from app.services.snapshot_store import snapshot_store
 
 
 class FingerprintService:
     """Detect website platform, CMS, and technology stack"""
     
-    async def fingerprint_site(self, url: str) -> Dict:
-        """Complete site fingerprinting"""
+    # Every signature is checked by one SignatureScanner call per page.
+    # Each entry is (regex, ignore_case).
+    SIGNATURES = {
+        # E-commerce platforms
+        "platform:Shopify": [
+            (r"cdn\.shopify\.com", True),
+            (r"Shopify\.theme", True),
+            (r"shopify-section", True)
+        ],
+        "platform:WooCommerce": [
+            (r"woocommerce", True),
+            (r"wp-content/plugins/woocommerce", True)
+        ],
+        "platform:Magento": [
+            (r"Mage\.Cookies", True),
+            (r"/static/frontend/", True),
+            (r"mage/cookies", True)
+        ],
+        "platform:BigCommerce": [
+            (r"bigcommerce\.com", True),
+            (r"cdn\d+\.bigcommerce", True)
+        ],
+        "platform:PrestaShop": [
+            (r"prestashop", True),
+            (r"/themes/[^/]+/assets", True)
+        ],
+        # CMS
+        "cms:WordPress": [("WordPress", False), ("wp-content", False)],
+        "cms:Drupal": [("Drupal", False), ("sites/default", False)],
+        "cms:Joomla": [("Joomla", False)],
+        # JavaScript frameworks
+        "js:React": [("react", True)],
+        "js:Angular": [("ng-app", False), ("angular", True)],
+        "js:Vue": [("Vue", False), ("_vue", False)],
+        "js:next": [("next", True)],
+        "js:next_assets": [("/_next/", False)],
+        "js:Nuxt": [("nuxt", True)],
+        # Anti-bot services
+        "antibot:cloudflare": [("cloudflare", True)],
+        "antibot:recaptcha": [("recaptcha", True)],
+        "antibot:datadome": [("datadome", True)],
+        "antibot:imperva": [("imperva", True), ("_Incapsula", False)],
+        "antibot:perimeterx": [("perimeterx", True)]
+    }
+    
+    PLATFORM_ORDER = ["Shopify", "WooCommerce", "Magento", "BigCommerce", "PrestaShop"]
+    
+    _scanner = SignatureScanner(SIGNATURES)
+    
+    async def fingerprint_site(
+        self,
+        url: str,
+        revalidation: Optional[RevalidationCache] = None,
+        previous: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Complete site fingerprinting
+        
+        With revalidation the homepage is fetched conditionally; when it is
+        unchanged (304) the previous fingerprint is returned as-is.
+        """
         try:
-            async with httpx.AsyncClient(timeout=15.0, follow_redirects=True) as client:
-                response = await client.get(url, headers={"User-Agent": "Mozilla/5.0"})
+            async with FetchSession(
+                headers={"User-Agent": "Mozilla/5.0"},
+                timeout=15.0,
+                revalidation=revalidation,
+                snapshots=snapshot_store
+            ) as session:
+                response = await session.get(url)
                 html = response.text
                 headers = dict(response.headers)
             
-            fingerprint = {
-                "platform": await self._detect_platform(html, headers),
-                "cms": await self._detect_cms(html, headers),
-                "javascript_frameworks": await self._detect_js_frameworks(html),
-                "anti_bot": await self._detect_anti_bot(html, headers),
-                "requires_js": await self._requires_javascript(html),
-                "complexity_score": await self._calculate_complexity(html, headers)
-            }
+            if previous and "error" not in previous and response.extensions.get("revalidated"):
+                return previous
             
-            return fingerprint
+            return await self.analyze(html, headers)
             
         except Exception as e:
             return {"error": str(e), "platform": "unknown"}
     
-    async def _detect_platform(self, html: str, headers: Dict) -> str:
-        """Detect e-commerce platform"""
-        patterns = {
-            "Shopify": [
-                r"cdn\.shopify\.com",
-                r"Shopify\.theme",
-                r"shopify-section"
-            ],
-            "WooCommerce": [
-                r"woocommerce",
-                r"wp-content/plugins/woocommerce"
-            ],
-            "Magento": [
-                r"Mage\.Cookies",
-                r"/static/frontend/",
-                r"mage/cookies"
-            ],
-            "BigCommerce": [
-                r"bigcommerce\.com",
-                r"cdn\d+\.bigcommerce"
-            ],
-            "PrestaShop": [
-                r"prestashop",
-                r"/themes/[^/]+/assets"
-            ],
-            "Custom": []
-        }
+    async def analyze(self, html: str, headers: Dict) -> Dict:
+        """Fingerprint already-fetched HTML with one SignatureScanner call"""
+        # Scanning and parsing are CPU-bound; keep them off the shared loop
+        hits = await asyncio.to_thread(self._scanner.scan, html)
+        document = await document_cache.parse(html)
+        
+        anti_bot = await self._detect_anti_bot(hits, headers)
+        frameworks = await self._detect_js_frameworks(hits)
+        requires_js = await self._requires_javascript(document)
         
-        for platform, patterns_list in patterns.items():
-            if any(re.search(pattern, html, re.IGNORECASE) for pattern in patterns_list):
+        return {
+            "platform": await self._detect_platform(hits, headers),
+            "cms": await self._detect_cms(hits, headers),
+            "javascript_frameworks": frameworks,
+            "anti_bot": anti_bot,
+            "requires_js": requires_js,
+            "complexity_score": await self._calculate_complexity(
+                document, requires_js, anti_bot, frameworks
+            )
+        }
+    
+    async def _detect_platform(self, hits: Set[str], headers: Dict) -> str:
+        """Detect e-commerce platform"""
+        for platform in self.PLATFORM_ORDER:
+            if f"platform:{platform}" in hits:
                 return platform
         
         # Check headers
@@ -68,41 +124,41 @@ class FingerprintService:
         
         return "Custom"
     
-    async def _detect_cms(self, html: str, headers: Dict) -> str:
+    async def _detect_cms(self, hits: Set[str], headers: Dict) -> str:
         """Detect CMS"""
-        if "WordPress" in html or "wp-content" in html:
+        if "cms:WordPress" in hits:
             return "WordPress"
-        elif "Drupal" in html or "sites/default" in html:
+        elif "cms:Drupal" in hits:
             return "Drupal"
-        elif "Joomla" in html:
+        elif "cms:Joomla" in hits:
             return "Joomla"
         return "None"
     
-    async def _detect_js_frameworks(self, html: str) -> List[str]:
+    async def _detect_js_frameworks(self, hits: Set[str]) -> List[str]:
         """Detect JavaScript frameworks"""
         frameworks = []
         
-        if re.search(r"react", html, re.IGNORECASE) or "data-react" in html:
+        if "js:React" in hits:
             frameworks.append("React")
-        if "ng-app" in html or "angular" in html.lower():
+        if "js:Angular" in hits:
             frameworks.append("Angular")
-        if "Vue" in html or "_vue" in html:
+        if "js:Vue" in hits:
             frameworks.append("Vue")
-        if "next" in html.lower() and "/_next/" in html:
+        if "js:next" in hits and "js:next_assets" in hits:
             frameworks.append("Next.js")
-        if "nuxt" in html.lower():
+        if "js:Nuxt" in hits:
             frameworks.append("Nuxt")
         
         return frameworks or ["None"]
     
-    async def _detect_anti_bot(self, html: str, headers: Dict) -> Dict:
+    async def _detect_anti_bot(self, hits: Set[str], headers: Dict) -> Dict:
         """Detect anti-bot/protection systems"""
         protections = {
-            "cloudflare": bool(re.search(r"cloudflare", html, re.IGNORECASE)) or "cf-ray" in headers,
-            "recaptcha": "recaptcha" in html.lower(),
-            "datadome": "datadome" in html.lower(),
-            "imperva": "imperva" in html.lower() or "_Incapsula" in html,
-            "perimeterx": "perimeterx" in html.lower()
+            "cloudflare": "antibot:cloudflare" in hits or "cf-ray" in headers,
+            "recaptcha": "antibot:recaptcha" in hits,
+            "datadome": "antibot:datadome" in hits,
+            "imperva": "antibot:imperva" in hits,
+            "perimeterx": "antibot:perimeterx" in hits
         }
         
         return {
@@ -110,51 +166,48 @@ class FingerprintService:
             "services": [k for k, v in protections.items() if v]
         }
     
-    async def _requires_javascript(self, html: str) -> bool:
+    async def _requires_javascript(self, document: ParsedDocument) -> bool:
         """Check if site requires JS rendering"""
-        soup = BeautifulSoup(html, 'html.parser')
-        
-        # Check for SPA indicators
-        body_text = soup.body.get_text(strip=True) if soup.body else ""
-        
         # If body is nearly empty, likely needs JS
-        if len(body_text) < 200:
+        if document.body_text_length < 200:
             return True
         
         # Check for common SPA root elements
-        if soup.find(id="root") or soup.find(id="app"):
+        if document.has_spa_root:
             return True
         
         # Check script dominance
-        scripts = soup.find_all('script')
-        if len(scripts) > 20:
+        if document.script_count > 20:
             return True
         
         return False
     
-    async def _calculate_complexity(self, html: str, headers: Dict) -> float:
-        """Calculate site complexity score (0-1)"""
+    async def _calculate_complexity(
+        self,
+        document: ParsedDocument,
+        requires_js: bool,
+        anti_bot: Dict,
+        frameworks: List[str]
+    ) -> float:
+        """Calculate site complexity score (0-1) from the detector results"""
         score = 0.0
         
         # Base factors
-        if await self._requires_javascript(html):
+        if requires_js:
             score += 0.3
         
-        anti_bot = await self._detect_anti_bot(html, headers)
         if anti_bot["detected"]:
             score += 0.2 * len(anti_bot["services"])
         
         # Framework complexity
-        frameworks = await self._detect_js_frameworks(html)
         if "React" in frameworks or "Vue" in frameworks or "Angular" in frameworks:
             score += 0.2
         
         # HTML complexity
-        if len(html) > 100000:
+        if document.html_length > 100000:
             score += 0.1
         
         return min(score, 1.0)
 
 
 fingerprint_service = FingerprintService()
-
@@ -0,0 +1,133 @@
+"""Wake idle queue runners on new jobs via Postgres LISTEN/NOTIFY"""
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+import asyncpg
+
+from app.config import settings
+from app.database import connect_args, database_url
+
+# Fired by the jobs_notify_queued trigger (migration 0005) with the job type
+CHANNEL = "jobs_queued"
+
+
+def listen_dsn() -> str:
+    """asyncpg DSN for the LISTEN connection"""
+    # LISTEN needs a session: behind a transaction pooler (e.g. port 6543)
+    # point JOB_NOTIFY_DATABASE_URL at a direct or session-mode connection
+    url = settings.JOB_NOTIFY_DATABASE_URL or database_url
+    return url.split("?")[0].replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+async def _connect() -> asyncpg.Connection:
+    return await asyncpg.connect(listen_dsn(), **connect_args)
+
+
+class JobNotifier:
+    """
+    One LISTEN connection per runner, turning NOTIFYs into per-type events.
+
+    A trigger on jobs sends NOTIFY whenever a row becomes queued (insert,
+    retry or reaper requeue), so an idle runner starts the job within
+    milliseconds instead of at its next poll, without a Redis broker.
+
+    Notifications are not durable: anything sent while the connection is
+    down is lost. wait() therefore never sleeps longer than poll_interval,
+    and if LISTEN cannot be (re)established the runner simply polls.
+
+    Clear the job type's event before claiming, then wait() once the claim
+    comes back empty: a NOTIFY in between leaves the event set, so no
+    wake-up is missed.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Awaitable[asyncpg.Connection]] = _connect,
+        poll_interval: Optional[float] = None
+    ):
+        self.connect = connect
+        self.poll_interval = settings.JOB_POLL_INTERVAL if poll_interval is None else poll_interval
+
+        self._conn: Optional[asyncpg.Connection] = None
+        self._events: Dict[str, asyncio.Event] = {}
+        self._next_connect_attempt = 0.0
+
+        self.notifications = 0
+        self.wakeups = 0
+        self.polls = 0
+        self.connect_failures = 0
+
+    @property
+    def listening(self) -> bool:
+        return self._conn is not None and not self._conn.is_closed()
+
+    def _event(self, job_type: str) -> asyncio.Event:
+        event = self._events.get(job_type)
+        if event is None:
+            event = self._events[job_type] = asyncio.Event()
+        return event
+
+    def _on_notify(self, conn, pid: int, channel: str, payload: str) -> None:
+        self.notifications += 1
+        self._event(payload).set()
+
+    def _on_lost(self, conn) -> None:
+        print("⚠️  Job LISTEN connection lost, polling until it reconnects")
+        self._conn = None
+
+    async def listen(self) -> bool:
+        """Open the LISTEN connection if needed; False while unavailable"""
+        if self.listening:
+            return True
+        if time.monotonic() < self._next_connect_attempt:
+            return False
+
+        try:
+            conn = await self.connect()
+            await conn.add_listener(CHANNEL, self._on_notify)
+            conn.add_termination_listener(self._on_lost)
+        except Exception as e:
+            self.connect_failures += 1
+            self._next_connect_attempt = time.monotonic() + self.poll_interval
+            print(f"⚠️  LISTEN {CHANNEL} unavailable, falling back to polling: {e}")
+            return False
+
+        self._conn = conn
+        # Jobs queued while we were not listening: look once
+        for event in self._events.values():
+            event.set()
+        return True
+
+    def clear(self, job_type: str) -> None:
+        """Call right before claiming jobs of this type"""
+        self._event(job_type).clear()
+
+    async def wait(self, job_type: str, timeout: Optional[float] = None) -> bool:
+        """Wait for a NOTIFY for job_type; False when the poll interval ran out"""
+        await self.listen()
+        timeout = self.poll_interval if timeout is None else min(timeout, self.poll_interval)
+        try:
+            await asyncio.wait_for(self._event(job_type).wait(), timeout=max(timeout, 0))
+        except asyncio.TimeoutError:
+            self.polls += 1
+            return False
+        self.wakeups += 1
+        return True
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            try:
+                await conn.close()
+            except Exception:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "listening": self.listening,
+            "notifications": self.notifications,
+            "wakeups": self.wakeups,
+            "polls": self.polls,
+            "connect_failures": self.connect_failures
+        }
@@ -0,0 +1,261 @@
+"""Atomic job claiming, leases and reaping for queue runners"""
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import Job
+
+# At most one job per (site_id, job_type) in these statuses (uq_jobs_active_site_type)
+ACTIVE_STATUSES = ("queued", "running")
+
+# Requested methods that leave the choice to the worker
+UNRESOLVED_METHODS = (None, "auto", "manual")
+
+
+class ClaimedJob(NamedTuple):
+    job_id: str
+    site_id: Optional[str]
+    job_type: str
+    payload: Optional[dict]
+
+
+def default_worker_id() -> str:
+    """Identify this runner in jobs.worker_id"""
+    return os.getenv("GITHUB_RUN_ID") or f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobQueue:
+    """
+    Claim queued jobs so concurrent runners never process the same one.
+
+    claim() selects the next jobs with FOR UPDATE SKIP LOCKED in
+    idx_jobs_priority order (priority DESC, created_at ASC) and flips them
+    to running in the same transaction. Rows another runner is claiming are
+    skipped rather than waited on, and once committed they are no longer
+    queued, so each job is handed to exactly one runner.
+
+    enqueue() coalesces duplicate triggers: a unique index over active jobs
+    per (site_id, job_type) lets the insert itself detect an existing one,
+    which the caller then attaches to instead of creating more work. The
+    queued row may then reach both a NOTIFY runner and a Celery task; only
+    one of them claims it.
+
+    Workers handed a job id (Celery tasks, however many times one was sent)
+    take it with claim_job(), which only succeeds while the job is still
+    queued, so a job is never started twice.
+
+    A running job holds a lease until lease_expires_at, which its worker
+    renews with heartbeat(). Each start counts as an attempt; reap() puts
+    jobs whose lease ran out (dead or killed worker) back in the queue, or
+    fails them once attempt_count reaches max_retries.
+    """
+
+    def __init__(self, lease_seconds: Optional[float] = None):
+        self.lease_seconds = settings.JOB_LEASE_SECONDS if lease_seconds is None else lease_seconds
+
+    def lease_until(self, now: datetime) -> datetime:
+        return now + timedelta(seconds=self.lease_seconds)
+
+    async def enqueue(
+        self,
+        db: AsyncSession,
+        site_id: UUID,
+        job_type: str,
+        method: str = "auto",
+        priority: int = 0,
+        payload: Optional[dict] = None
+    ) -> Tuple[Job, bool]:
+        """Queue a job or attach to the active one; commits, returns (job, created)"""
+        # A matching job can finish between the insert and the lookup: retry
+        for _ in range(3):
+            result = await db.execute(
+                self._insert_unless_active(site_id, job_type, method, priority, payload)
+            )
+            job = result.scalar_one_or_none()
+            if job is not None:
+                await db.commit()
+                return job, True
+
+            result = await db.execute(
+                select(Job).where(
+                    Job.site_id == site_id,
+                    Job.job_type == job_type,
+                    Job.status.in_(ACTIVE_STATUSES)
+                )
+            )
+            existing = result.scalar_one_or_none()
+            if existing is not None:
+                if existing.status == "queued" and priority > existing.priority:
+                    # A more urgent duplicate moves the queued job up
+                    existing.priority = priority
+                await db.commit()
+                return existing, False
+
+        raise RuntimeError(f"Could not enqueue {job_type} job for site {site_id}")
+
+    @staticmethod
+    def _insert_unless_active(
+        site_id: UUID,
+        job_type: str,
+        method: str,
+        priority: int,
+        payload: Optional[dict]
+    ):
+        now = datetime.utcnow()
+        return (
+            insert(Job)
+            .values(
+                job_id=uuid.uuid4(),
+                site_id=site_id,
+                job_type=job_type,
+                method=method,
+                status="queued",
+                priority=priority,
+                progress=0,
+                attempt_count=0,
+                max_retries=3,
+                payload=payload,
+                created_at=now,
+                updated_at=now
+            )
+            .on_conflict_do_nothing(
+                index_elements=[Job.site_id, Job.job_type],
+                # Literal, not bound parameters: Postgres infers the partial
+                # index only from a predicate it can match at plan time
+                index_where=text("status IN ('queued', 'running')")
+            )
+            .returning(Job)
+        )
+
+    async def claim(
+        self,
+        db: AsyncSession,
+        job_type: str,
+        limit: int,
+        worker_id: Optional[str] = None
+    ) -> List[ClaimedJob]:
+        if limit <= 0:
+            return []
+
+        result = await db.execute(
+            select(Job.job_id, Job.site_id, Job.job_type, Job.payload)
+            .where(Job.job_type == job_type, Job.status == "queued")
+            .order_by(Job.priority.desc(), Job.created_at.asc())
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        rows = result.all()
+        if not rows:
+            await db.rollback()
+            return []
+
+        await db.execute(
+            update(Job)
+            .where(Job.job_id.in_([row.job_id for row in rows]))
+            .values(**self._running(worker_id))
+        )
+        await db.commit()
+
+        return [self._claimed(row) for row in rows]
+
+    async def claim_job(self, db: AsyncSession, job_id: str, worker_id: Optional[str] = None) -> bool:
+        """Claim one job by id if it is still queued; commits, False if it is not"""
+        result = await db.execute(
+            update(Job)
+            .where(Job.job_id == UUID(job_id), Job.status == "queued")
+            .values(**self._running(worker_id))
+            .returning(Job.job_id)
+        )
+        claimed = result.first() is not None
+        await db.commit()
+        return claimed
+
+    def _running(self, worker_id: Optional[str]) -> dict:
+        """Column values that start a claimed job's attempt under a fresh lease"""
+        now = datetime.utcnow()
+        return dict(
+            status="running",
+            started_at=now,
+            worker_id=worker_id or default_worker_id(),
+            attempt_count=Job.attempt_count + 1,
+            heartbeat_at=now,
+            lease_expires_at=self.lease_until(now)
+        )
+
+    @staticmethod
+    def held_by(job_id: str, worker_id: Optional[str] = None) -> tuple:
+        """Filter for a job this worker is running (not one it never claimed)"""
+        return (
+            Job.job_id == UUID(job_id),
+            Job.status == "running",
+            Job.worker_id == (worker_id or default_worker_id())
+        )
+
+    @staticmethod
+    def record_method(job: Job, method: str) -> None:
+        """Store the method a job ran with unless the trigger asked for one"""
+        if job.method in UNRESOLVED_METHODS:
+            job.method = method
+
+    async def heartbeat(self, db: AsyncSession, job_id: str, worker_id: Optional[str] = None) -> bool:
+        """Renew this worker's lease on a running job; False once it no longer holds it"""
+        now = datetime.utcnow()
+        result = await db.execute(
+            update(Job)
+            .where(*self.held_by(job_id, worker_id))
+            .values(heartbeat_at=now, lease_expires_at=self.lease_until(now))
+        )
+        return result.rowcount > 0
+
+    async def reap(
+        self,
+        db: AsyncSession,
+        now: Optional[datetime] = None
+    ) -> Tuple[List[ClaimedJob], List[str]]:
+        """Requeue or fail running jobs whose lease expired; caller commits"""
+        now = now or datetime.utcnow()
+        expired = (Job.status == "running", Job.lease_expires_at < now)
+
+        requeued = await db.execute(
+            update(Job)
+            .where(*expired, Job.attempt_count < Job.max_retries)
+            .values(status="queued", started_at=None, worker_id=None, lease_expires_at=None)
+            .returning(Job.job_id, Job.site_id, Job.job_type, Job.payload)
+        )
+        requeued_jobs = [self._claimed(row) for row in requeued.all()]
+
+        failed = await db.execute(
+            update(Job)
+            .where(*expired, Job.attempt_count >= Job.max_retries)
+            .values(
+                status="failed",
+                completed_at=now,
+                lease_expires_at=None,
+                error_message="Worker lease expired after the final attempt"
+            )
+            .returning(Job.job_id)
+        )
+        failed_ids = [str(row.job_id) for row in failed.all()]
+
+        return requeued_jobs, failed_ids
+
+    @staticmethod
+    def _claimed(row) -> ClaimedJob:
+        return ClaimedJob(
+            job_id=str(row.job_id),
+            site_id=str(row.site_id) if row.site_id else None,
+            job_type=row.job_type,
+            payload=row.payload
+        )
+
+
+# Global instance
+job_queue = JobQueue()
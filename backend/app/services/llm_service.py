@@ -1,10 +1,35 @@
 """LLM integration service for site analysis"""
 import os
-from typing import Dict, List, Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
 import anthropic
 from app.config import settings
 
 
+@dataclass
+class LLMUsage:
+    """Token usage and cost of the LLM calls made for one job"""
+    calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost_usd: float = 0.0
+
+    def add(self, input_tokens: int, output_tokens: int) -> None:
+        self.calls += 1
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        self.cost_usd += (
+            input_tokens * settings.LLM_INPUT_COST_PER_MTOK
+            + output_tokens * settings.LLM_OUTPUT_COST_PER_MTOK
+        ) / 1_000_000
+
+
+# Usage accumulator of the running job (per asyncio task)
+_usage: ContextVar[Optional[LLMUsage]] = ContextVar("llm_usage", default=None)
+
+
 class LLMService:
     """Service for LLM-powered site analysis"""
     
@@ -13,6 +38,25 @@ class LLMService:
         if settings.ANTHROPIC_API_KEY:
             self.client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
     
+    @contextmanager
+    def track_usage(self, usage: Optional[LLMUsage] = None) -> Iterator[LLMUsage]:
+        """Add the usage of LLM calls made inside the block to `usage`"""
+        usage = usage if usage is not None else LLMUsage()
+        token = _usage.set(usage)
+        try:
+            yield usage
+        finally:
+            _usage.reset(token)
+    
+    def _record_usage(self, message) -> None:
+        usage = _usage.get()
+        counts = getattr(message, "usage", None)
+        if usage is not None and counts is not None:
+            usage.add(
+                getattr(counts, "input_tokens", 0) or 0,
+                getattr(counts, "output_tokens", 0) or 0
+            )
+    
     async def analyze_site_structure(self, html: str, url: str) -> Dict:
         """Analyze site HTML to detect structure and categories"""
         if not self.client:
@@ -43,6 +87,7 @@ Respond in JSON format with:
                 temperature=settings.LLM_TEMPERATURE,
                 messages=[{"role": "user", "content": prompt}]
             )
+            self._record_usage(message)
             return {"success": True, "analysis": message.content[0].text}
         except Exception as e:
             return {"success": False, "error": str(e)}
@@ -73,6 +118,7 @@ Return 3 selector candidates ranked by robustness, in JSON:
                 temperature=0.3,
                 messages=[{"role": "user", "content": prompt}]
             )
+            self._record_usage(message)
             return {"success": True, "selectors": message.content[0].text}
         except Exception as e:
             return {"success": False, "error": str(e)}
@@ -98,6 +144,7 @@ Return only the selector string.
                 temperature=0.1,
                 messages=[{"role": "user", "content": prompt}]
             )
+            self._record_usage(message)
             return message.content[0].text.strip()
         except Exception as e:
             return old_selector
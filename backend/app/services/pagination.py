@@ -0,0 +1,136 @@
+"""Keyset (cursor) pagination and cheap row counts for listings"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.services.response_cache import response_cache
+
+COUNT_MODES = ("none", "estimate", "exact")
+
+
+class InvalidCursor(ValueError):
+    """Cursor that was not issued for this listing"""
+
+
+def sort_spec(columns: Sequence, descending: bool = True) -> str:
+    """Sort order a cursor is issued for, e.g. '-Site.created_at,-Site.site_id'"""
+    return ",".join(("-" if descending else "") + str(c) for c in columns)
+
+
+def encode_cursor(values: Sequence[Any], sort: str) -> str:
+    """Opaque cursor for the sort key of the last row on a page, tied to its sort order"""
+    plain = [v.isoformat() if isinstance(v, datetime) else str(v) if isinstance(v, UUID) else v for v in values]
+    raw = json.dumps({"s": sort, "k": plain}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence, sort: str) -> List[Any]:
+    """Sort key values from a cursor, typed like `columns`; the sort order must match"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, dict):
+            raise ValueError("not a cursor")
+        if payload.get("s") != sort:
+            raise ValueError("issued for a different sort order")
+        plain = payload.get("k")
+        if not isinstance(plain, list) or len(plain) != len(columns):
+            raise ValueError("wrong number of values")
+        values = []
+        for column, value in zip(columns, plain):
+            kind = column.type.python_type
+            if kind is datetime:
+                value = datetime.fromisoformat(value)
+            elif not isinstance(value, kind):
+                value = kind(value)
+            values.append(value)
+        return values
+    except (ValueError, TypeError, NotImplementedError) as e:
+        raise InvalidCursor(f"Invalid cursor: {e}") from e
+
+
+def keyset(
+    stmt,
+    columns: Sequence,
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = True,
+    offset: int = 0
+):
+    """
+    Page of stmt ordered by `columns` (unique together), after `cursor`.
+
+    Fetches limit + 1 rows so page() can tell whether another page exists.
+    The row comparison (a, b) < (x, y) walks an index on the same columns,
+    so every page costs the same however deep it is. `offset` is still
+    honoured for callers that have no cursor yet (it scans what it skips).
+    A cursor issued under another sort order raises InvalidCursor.
+    """
+    if cursor and offset:
+        raise InvalidCursor("Pass either cursor or offset, not both")
+    if cursor:
+        values = decode_cursor(cursor, columns, sort_spec(columns, descending))
+        bound = tuple_(*(literal(v, c.type) for c, v in zip(columns, values)))
+        key = tuple_(*columns)
+        stmt = stmt.where(key < bound if descending else key > bound)
+    stmt = stmt.order_by(*(c.desc() if descending else c.asc() for c in columns)).limit(limit + 1)
+    return stmt.offset(offset) if offset else stmt
+
+
+def page(
+    rows: Sequence,
+    columns: Sequence,
+    limit: int,
+    descending: bool = True
+) -> Tuple[List, Optional[str]]:
+    """Rows for this page and the cursor of the next one (None on the last)"""
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor([getattr(rows[-1], c.key) for c in columns], sort_spec(columns, descending))
+
+
+class _Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def estimate_count(db: AsyncSession, stmt) -> int:
+    """Planner's row estimate for stmt; no scan, as fresh as ANALYZE statistics"""
+    plan = (await db.execute(_Explain(stmt))).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_rows(
+    db: AsyncSession,
+    stmt,
+    mode: str,
+    cache_key: str,
+    tags: Sequence[str]
+) -> Tuple[Optional[int], bool]:
+    """(total, estimated) for a filtered select, per count mode"""
+    if mode == "estimate":
+        return await estimate_count(db, stmt), True
+    if mode == "exact":
+        # Cached until a write to the counted table invalidates its tags
+        async def exact():
+            return (await db.execute(select(func.count()).select_from(stmt.subquery()))).scalar() or 0
+        return await response_cache.get_or_load(f"count:{cache_key}", exact, tags=tags), False
+    return None, False
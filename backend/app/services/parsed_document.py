@@ -0,0 +1,108 @@
+"""Parse-once document model shared by the fingerprint and discovery analyzers"""
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, NamedTuple, Optional
+
+from bs4 import BeautifulSoup
+
+
+class Anchor(NamedTuple):
+    """One <a href> element, reduced to what the link analyzers use"""
+    href: str
+    text: str
+    parent: Optional[str]
+
+
+class ParsedDocument:
+    """
+    An HTML page parsed once with lxml, plus the facts every analyzer needs.
+
+    Body text length, script count, SPA root markers and the anchor list are
+    computed at parse time so analyzers never walk the tree for them again;
+    CSS-selector analyzers use the shared ``soup``.
+    """
+
+    SPA_ROOT_IDS = ("root", "app")
+
+    def __init__(self, html: str, content_hash: Optional[str] = None):
+        self.content_hash = content_hash or ParsedDocument.hash(html)
+        self.html_length = len(html)
+        self.soup = BeautifulSoup(html, 'lxml')
+
+        body = self.soup.body
+        self.body_text_length = len(body.get_text(strip=True)) if body else 0
+        self.script_count = len(self.soup.find_all('script'))
+        self.has_spa_root = any(
+            self.soup.find(id=root_id) is not None for root_id in self.SPA_ROOT_IDS
+        )
+
+        self.anchors: List[Anchor] = []
+        for a_tag in self.soup.find_all('a', href=True):
+            parent = a_tag.parent
+            self.anchors.append(Anchor(
+                href=a_tag['href'],
+                text=a_tag.get_text(strip=True),
+                parent=parent.name if parent is not None else None
+            ))
+
+    @staticmethod
+    def hash(html: str) -> str:
+        return hashlib.sha1(html.encode('utf-8', 'replace')).hexdigest()
+
+
+class DocumentCache:
+    """Bounded LRU of ParsedDocuments keyed by content hash"""
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._documents: "OrderedDict[str, ParsedDocument]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, html: str) -> ParsedDocument:
+        """Return the parsed document for html, parsing it only on first sight"""
+        content_hash = ParsedDocument.hash(html)
+
+        with self._lock:
+            document = self._documents.get(content_hash)
+            if document is not None:
+                self._documents.move_to_end(content_hash)
+                self.hits += 1
+                return document
+            self.misses += 1
+
+        # Parse outside the lock; a concurrent parse of the same page is
+        # harmless and the last one simply wins the slot
+        document = ParsedDocument(html, content_hash)
+
+        with self._lock:
+            self._documents[content_hash] = document
+            self._documents.move_to_end(content_hash)
+            while len(self._documents) > self.max_entries:
+                self._documents.popitem(last=False)
+
+        return document
+
+    async def parse(self, html: str) -> ParsedDocument:
+        """get() for async callers; parses in a thread so the shared loop keeps heartbeating"""
+        return await asyncio.to_thread(self.get, html)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._documents.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "documents": len(self._documents),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
+
+
+# Global instance (one cache per worker process)
+document_cache = DocumentCache()
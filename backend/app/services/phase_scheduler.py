@@ -0,0 +1,184 @@
+"""Dependency-graph scheduler for running discovery phases concurrently"""
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+PhaseFunc = Callable[..., Awaitable[Any]]
+# Called as (phase name, phases finished, total phases); timed-out and
+# skipped phases count as finished
+PhaseDoneHook = Callable[[str, int, int], Awaitable[None]]
+
+# Result placeholder for phases that timed out or were skipped
+_INCOMPLETE = object()
+
+# Set inside each phase's task, so long phases can stop early on their own
+_phase_deadline: ContextVar[Optional[float]] = ContextVar("phase_deadline", default=None)
+
+
+class PhaseGraph:
+    """
+    Declare phases with their dependencies and run them with asyncio.
+
+    Each phase is called with the results of its dependencies as keyword
+    arguments, and starts as soon as those dependencies finish, so
+    independent phases overlap. The wall time of every phase is recorded.
+    If any phase raises, the remaining phases are cancelled and the error
+    propagates to the caller.
+
+    With a deadline, each phase gets a share of the time left when it
+    starts, in proportion to its weight over the heaviest chain of phases
+    still ahead of it. A phase that overruns its share is cancelled and
+    its dependents are skipped; everything else still runs, so the caller
+    gets the phases that finished (see status).
+    """
+
+    def __init__(self):
+        self._phases: Dict[str, Tuple[PhaseFunc, Tuple[str, ...]]] = {}
+        self._weights: Dict[str, float] = {}
+        # Per phase after run(): done | timeout | skipped
+        self.status: Dict[str, str] = {}
+
+    def add(
+        self,
+        name: str,
+        func: PhaseFunc,
+        depends_on: Iterable[str] = (),
+        weight: float = 1.0
+    ) -> "PhaseGraph":
+        if name in self._phases:
+            raise ValueError(f"Phase already declared: {name}")
+        self._phases[name] = (func, tuple(depends_on))
+        self._weights[name] = weight
+        return self
+
+    def order(self) -> List[str]:
+        """Topological order of the declared phases"""
+        ordered: List[str] = []
+        state: Dict[str, str] = {}
+
+        def visit(name: str) -> None:
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Phase dependency cycle at: {name}")
+            if name not in self._phases:
+                raise ValueError(f"Unknown phase dependency: {name}")
+            state[name] = "visiting"
+            for dep in self._phases[name][1]:
+                visit(dep)
+            state[name] = "done"
+            ordered.append(name)
+
+        for name in self._phases:
+            visit(name)
+        return ordered
+
+    def path_weights(self) -> Dict[str, float]:
+        """Weight of each phase plus its heaviest chain of dependents"""
+        dependents: Dict[str, List[str]] = {name: [] for name in self._phases}
+        for name, (_, deps) in self._phases.items():
+            for dep in deps:
+                dependents[dep].append(name)
+
+        weights: Dict[str, float] = {}
+        for name in reversed(self.order()):
+            weights[name] = self._weights[name] + max(
+                (weights[child] for child in dependents[name]), default=0.0
+            )
+        return weights
+
+    async def run(
+        self,
+        on_phase_done: Optional[PhaseDoneHook] = None,
+        deadline: Optional[float] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """
+        Run every phase; returns (results, wall-time seconds per phase).
+
+        deadline is a time.monotonic() value; results then only hold the
+        phases that finished in time.
+        """
+        tasks: Dict[str, asyncio.Task] = {}
+        timings: Dict[str, float] = {}
+        path_weights = self.path_weights() if deadline is not None else {}
+        self.status = {}
+        settled = 0
+
+        async def run_phase(name: str) -> Any:
+            func, deps = self._phases[name]
+            inputs = {dep: await tasks[dep] for dep in deps}
+
+            if any(value is _INCOMPLETE for value in inputs.values()):
+                self.status[name] = "skipped"
+            else:
+                started = time.perf_counter()
+                try:
+                    if deadline is None:
+                        result = await func(**inputs)
+                    else:
+                        result = await self._run_with_budget(
+                            name, func, inputs, deadline, path_weights[name]
+                        )
+                finally:
+                    timings[name] = round(time.perf_counter() - started, 3)
+                self.status[name] = "timeout" if result is _INCOMPLETE else "done"
+
+            nonlocal settled
+            settled += 1
+            if on_phase_done is not None:
+                await on_phase_done(name, settled, len(self._phases))
+            return result if self.status[name] == "done" else _INCOMPLETE
+
+        for name in self.order():
+            tasks[name] = asyncio.create_task(run_phase(name), name=f"phase:{name}")
+
+        try:
+            done, pending = await asyncio.wait(
+                tasks.values(), return_when=asyncio.FIRST_EXCEPTION
+            )
+        except asyncio.CancelledError:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        for name, task in tasks.items():
+            if task.done() and not task.cancelled() and task.exception() is not None:
+                raise task.exception()
+
+        results = {
+            name: task.result() for name, task in tasks.items()
+            if task.result() is not _INCOMPLETE
+        }
+        return results, timings
+
+    async def _run_with_budget(
+        self,
+        name: str,
+        func: PhaseFunc,
+        inputs: Dict[str, Any],
+        deadline: float,
+        path_weight: float
+    ) -> Any:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return _INCOMPLETE
+        budget = remaining * self._weights[name] / path_weight
+        _phase_deadline.set(time.monotonic() + budget)
+        try:
+            return await asyncio.wait_for(func(**inputs), timeout=budget)
+        except asyncio.TimeoutError:
+            print(f"⏱️  Phase {name} overran its {budget:.1f}s budget, cancelled")
+            return _INCOMPLETE
+
+
+def phase_deadline() -> Optional[float]:
+    """time.monotonic() deadline of the running phase, if it has one"""
+    return _phase_deadline.get()
@@ -0,0 +1,225 @@
+"""Job progress events over Redis pub/sub or an in-process bus, streamed as SSE"""
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from app.config import settings
+
+try:
+    from redis import asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    aioredis = None
+    REDIS_AVAILABLE = False
+
+TERMINAL_STATUSES = {"success", "failed", "cancelled", "timeout"}
+
+CHANNEL_PREFIX = "progress:"
+
+
+def job_channel(job_id: str) -> str:
+    return f"{CHANNEL_PREFIX}job:{job_id}"
+
+
+def site_channel(site_id: str) -> str:
+    return f"{CHANNEL_PREFIX}site:{site_id}"
+
+
+class ProgressBus:
+    """
+    Fan job progress events out to subscribers by job and by site.
+
+    With PROGRESS_REDIS_URL set, events are published to Redis and each
+    API process keeps one pattern subscription (progress:*) that feeds its
+    local subscribers, so workers in other processes reach every stream.
+    Without Redis, publish() delivers straight to subscribers in this
+    process (single-process deployments and tests).
+
+    Subscriber queues are bounded; a slow consumer loses its oldest
+    events, never blocks publishers.
+    """
+
+    QUEUE_SIZE = 100
+
+    def __init__(self, redis_url: Optional[str] = None):
+        self.redis_url = settings.PROGRESS_REDIS_URL if redis_url is None else redis_url
+        self._subscribers: Dict[str, Set[Tuple[asyncio.Queue, asyncio.AbstractEventLoop]]] = {}
+        self._redis = None
+        self._redis_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listener: Optional[asyncio.Task] = None
+
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    @property
+    def distributed(self) -> bool:
+        return bool(self.redis_url) and REDIS_AVAILABLE
+
+    def _client(self):
+        """Redis client bound to the running loop"""
+        loop = asyncio.get_running_loop()
+        if self._redis is None or self._redis_loop is not loop:
+            self._redis = aioredis.from_url(self.redis_url, decode_responses=True)
+            self._redis_loop = loop
+        return self._redis
+
+    async def publish(self, event: Dict) -> None:
+        """Send an event to the job's channel and its site's channel"""
+        event = {**event, "ts": time.time()}
+        channels = [job_channel(event["job_id"])]
+        if event.get("site_id"):
+            channels.append(site_channel(event["site_id"]))
+        self.published += 1
+
+        if self.distributed:
+            try:
+                payload = json.dumps(event, default=str)
+                for channel in channels:
+                    await self._client().publish(channel, payload)
+                return
+            except Exception as e:
+                # Progress is best effort; at least reach local subscribers
+                print(f"⚠️  Progress publish to Redis failed: {e}")
+
+        for channel in channels:
+            self._deliver(channel, event)
+
+    def _deliver(self, channel: str, event: Dict) -> None:
+        for queue, loop in list(self._subscribers.get(channel, ())):
+            try:
+                running = asyncio.get_running_loop()
+            except RuntimeError:
+                running = None
+            if loop is running:
+                self._put(queue, event)
+            else:
+                # Subscriber lives on another thread's loop (e.g. worker runtime)
+                loop.call_soon_threadsafe(self._put, queue, event)
+
+    def _put(self, queue: asyncio.Queue, event: Dict) -> None:
+        if queue.full():
+            queue.get_nowait()
+            self.dropped += 1
+        queue.put_nowait(event)
+        self.delivered += 1
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str) -> AsyncIterator[asyncio.Queue]:
+        """Queue of events for a channel while the context is open"""
+        entry = (asyncio.Queue(maxsize=self.QUEUE_SIZE), asyncio.get_running_loop())
+        self._subscribers.setdefault(channel, set()).add(entry)
+        if self.distributed:
+            self._ensure_listener()
+        try:
+            yield entry[0]
+        finally:
+            subscribers = self._subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.discard(entry)
+                if not subscribers:
+                    del self._subscribers[channel]
+
+    def _ensure_listener(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._listener is None or self._listener.done() or self._listener.get_loop() is not loop:
+            self._listener = loop.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        """One pattern subscription per process, fanned out to local queues"""
+        while True:
+            pubsub = None
+            try:
+                pubsub = self._client().pubsub()
+                await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+                async for message in pubsub.listen():
+                    if message.get("type") != "pmessage":
+                        continue
+                    self._deliver(message["channel"], json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️  Progress subscription lost, retrying: {e}")
+                await asyncio.sleep(1)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.close()
+                    except Exception:
+                        pass
+
+    def stats(self) -> Dict:
+        return {
+            "distributed": self.distributed,
+            "channels": len(self._subscribers),
+            "subscribers": sum(len(s) for s in self._subscribers.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped
+        }
+
+
+# Global instance
+progress_bus = ProgressBus()
+
+
+def _sse(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def sse_stream(
+    channel: str,
+    initial: Dict,
+    refresh: Callable[[], Awaitable[Optional[Dict]]],
+    is_disconnected: Callable[[], Awaitable[bool]],
+    stop_on_terminal: bool = True,
+    bus: Optional[ProgressBus] = None,
+    keepalive: Optional[float] = None,
+    max_seconds: Optional[float] = None
+) -> AsyncIterator[str]:
+    """
+    Server-sent events for one channel.
+
+    Sends the current state ("snapshot"), then every "progress" event. On
+    each quiet keepalive interval it re-reads the state with refresh() and
+    sends it when it changed, which also covers events lost in transit.
+    Job streams end once the job reaches a terminal status; every stream
+    ends after max_seconds (EventSource clients reconnect on their own).
+    """
+    bus = bus or progress_bus
+    keepalive = settings.PROGRESS_SSE_KEEPALIVE if keepalive is None else keepalive
+    max_seconds = settings.PROGRESS_SSE_MAX_SECONDS if max_seconds is None else max_seconds
+    deadline = time.monotonic() + max_seconds
+
+    async with bus.subscribe(channel) as queue:
+        state = initial
+        yield f"retry: {int(keepalive * 1000)}\n\n"
+        yield _sse("snapshot", state)
+        if stop_on_terminal and state.get("status") in TERMINAL_STATUSES:
+            return
+
+        while time.monotonic() < deadline:
+            try:
+                event = await asyncio.wait_for(
+                    queue.get(), timeout=min(keepalive, max(deadline - time.monotonic(), 0))
+                )
+            except asyncio.TimeoutError:
+                if await is_disconnected():
+                    return
+                latest = await refresh()
+                if latest is None:
+                    return
+                if latest != state:
+                    state = latest
+                    yield _sse("snapshot", state)
+                else:
+                    yield ": keepalive\n\n"
+                if stop_on_terminal and state.get("status") in TERMINAL_STATUSES:
+                    return
+                continue
+
+            yield _sse("progress", event)
+            if stop_on_terminal and event.get("status") in TERMINAL_STATUSES:
+                return
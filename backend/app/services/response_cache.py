@@ -0,0 +1,384 @@
+"""Two-tier cache for hot read endpoints, invalidated by database writes"""
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from itertools import chain
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Iterable, Optional, Set, Tuple
+
+from prometheus_client import Counter, Gauge
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+try:
+    from redis import asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    aioredis = None
+    REDIS_AVAILABLE = False
+
+from app.config import settings
+
+CACHE_LOOKUPS = Counter(
+    "response_cache_lookups_total",
+    "Response cache lookups by outcome (hit, redis_hit, coalesced, miss)",
+    ["namespace", "result"]
+)
+CACHE_INVALIDATIONS = Counter(
+    "response_cache_invalidations_total",
+    "Response cache tags invalidated, by origin (local write or Redis message)",
+    ["origin"]
+)
+
+
+class ResponseCache:
+    """
+    JSON-able endpoint results cached per process and in Redis.
+
+    Lookups go memory LRU -> Redis (when RESPONSE_CACHE_REDIS_URL is set)
+    -> loader, and concurrent misses for a key share one load. Every entry
+    carries tags ("sites", "site:<id>", "templates", ...); committing a
+    write to those rows invalidates the tags here, deletes the tagged Redis
+    keys and tells other processes over pub/sub. A load that overlaps an
+    invalidation of one of its tags is returned but not cached.
+    """
+
+    REDIS_PREFIX = "response-cache:"
+    TAG_PREFIX = "response-cache-tag:"
+    CHANNEL = "response-cache:invalidate"
+
+    def __init__(
+        self,
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        redis_url: Optional[str] = None
+    ):
+        self.ttl = ttl or settings.RESPONSE_CACHE_TTL
+        self.max_entries = max_entries or settings.RESPONSE_CACHE_MAX_ENTRIES
+        self.redis_url = settings.RESPONSE_CACHE_REDIS_URL if redis_url is None else redis_url
+
+        # key -> (value, tags, expires_at on the monotonic clock)
+        self._entries: "OrderedDict[str, Tuple[Any, FrozenSet[str], float]]" = OrderedDict()
+        self._tagged: Dict[str, Set[str]] = {}
+        # tag -> wall-clock time it was last invalidated
+        self._invalidated: Dict[str, float] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._pending: Set[asyncio.Task] = set()
+        self._redis = None
+        self._redis_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listener: Optional[asyncio.Task] = None
+
+    @property
+    def distributed(self) -> bool:
+        return bool(self.redis_url) and REDIS_AVAILABLE
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        tags: Iterable[str],
+        ttl: Optional[float] = None
+    ) -> Any:
+        """Cached value for key, or loader()'s result (which must be JSON-able)"""
+        namespace = key.split(":", 1)[0]
+        tags = frozenset(tags)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, _, expires_at = entry
+            if time.monotonic() < expires_at:
+                self._entries.move_to_end(key)
+                CACHE_LOOKUPS.labels(namespace, "hit").inc()
+                return value
+            self._drop(key)
+
+        if self.distributed:
+            self._ensure_listener()
+
+        loop = asyncio.get_running_loop()
+        future = self._inflight.get(key)
+        if future is not None and future.get_loop() is loop:
+            CACHE_LOOKUPS.labels(namespace, "coalesced").inc()
+            return await asyncio.shield(future)
+
+        future = loop.create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._load(key, namespace, loader, tags, ttl or self.ttl)
+        except BaseException as e:
+            if isinstance(e, Exception):
+                future.set_exception(e)
+                future.exception()
+            else:
+                future.cancel()
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    async def _load(
+        self,
+        key: str,
+        namespace: str,
+        loader: Callable[[], Awaitable[Any]],
+        tags: FrozenSet[str],
+        ttl: float
+    ) -> Any:
+        started = time.time()
+        cached = await self._redis_get(key)
+        if cached is not None:
+            value, stored_at, remaining = cached
+            if not self._invalidated_since(tags, stored_at):
+                CACHE_LOOKUPS.labels(namespace, "redis_hit").inc()
+                self._store(key, value, tags, remaining)
+                return value
+
+        CACHE_LOOKUPS.labels(namespace, "miss").inc()
+        value = await loader()
+        if not self._invalidated_since(tags, started):
+            self._store(key, value, tags, ttl)
+            await self._redis_set(key, value, tags, started, ttl)
+        return value
+
+    def _invalidated_since(self, tags: FrozenSet[str], since: float) -> bool:
+        return any(self._invalidated.get(tag, 0.0) >= since for tag in tags)
+
+    def _store(self, key: str, value: Any, tags: FrozenSet[str], ttl: float) -> None:
+        self._drop(key)
+        self._entries[key] = (value, tags, time.monotonic() + ttl)
+        for tag in tags:
+            self._tagged.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[1]:
+            keys = self._tagged.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tagged[tag]
+
+    def _invalidate_local(self, tags: Iterable[str], origin: str) -> None:
+        now = time.time()
+        for tag in tags:
+            self._invalidated[tag] = now
+            for key in list(self._tagged.get(tag, ())):
+                self._drop(key)
+            CACHE_INVALIDATIONS.labels(origin).inc()
+        if len(self._invalidated) > 4 * self.max_entries:
+            # No cached value is older than the TTL, so older marks are moot
+            horizon = now - self.ttl
+            self._invalidated = {t: at for t, at in self._invalidated.items() if at >= horizon}
+
+    async def invalidate(self, *tags: str) -> None:
+        """Drop entries with any of these tags here, in Redis and in other processes"""
+        self._invalidate_local(tags, "local")
+        await self._redis_invalidate(tags)
+
+    def invalidate_soon(self, tags: Iterable[str]) -> None:
+        """invalidate() from sync code: local entries now, Redis in a task"""
+        tags = tuple(tags)
+        self._invalidate_local(tags, "local")
+        if not self.distributed:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._redis_invalidate(tags))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def _client(self):
+        """Redis client bound to the running loop, or None when disabled"""
+        if not self.distributed:
+            return None
+        loop = asyncio.get_running_loop()
+        if self._redis is None or self._redis_loop is not loop:
+            self._redis = aioredis.from_url(self.redis_url, decode_responses=True)
+            self._redis_loop = loop
+        return self._redis
+
+    async def _redis_get(self, key: str) -> Optional[Tuple[Any, float, float]]:
+        client = self._client()
+        if client is None:
+            return None
+        try:
+            raw, ttl = await asyncio.gather(
+                client.get(self.REDIS_PREFIX + key), client.ttl(self.REDIS_PREFIX + key)
+            )
+        except Exception as e:
+            print(f"⚠️  Response cache Redis read failed: {e}")
+            return None
+        if not raw or ttl is None or ttl <= 0:
+            return None
+        data = json.loads(raw)
+        return data["value"], data["stored_at"], float(ttl)
+
+    async def _redis_set(
+        self, key: str, value: Any, tags: FrozenSet[str], stored_at: float, ttl: float
+    ) -> None:
+        client = self._client()
+        if client is None:
+            return
+        try:
+            expires = max(int(ttl), 1)
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.set(
+                    self.REDIS_PREFIX + key,
+                    json.dumps({"value": value, "stored_at": stored_at}),
+                    ex=expires
+                )
+                for tag in tags:
+                    pipe.sadd(self.TAG_PREFIX + tag, key)
+                    pipe.expire(self.TAG_PREFIX + tag, expires)
+                await pipe.execute()
+        except Exception as e:
+            print(f"⚠️  Response cache Redis write failed: {e}")
+
+    async def _redis_invalidate(self, tags: Iterable[str]) -> None:
+        client = self._client()
+        if client is None:
+            return
+        tags = list(tags)
+        try:
+            tag_keys = [self.TAG_PREFIX + tag for tag in tags]
+            members = await asyncio.gather(*(client.smembers(k) for k in tag_keys))
+            keys = {self.REDIS_PREFIX + key for key in chain.from_iterable(members)}
+            await client.delete(*keys, *tag_keys)
+            await client.publish(self.CHANNEL, json.dumps(tags))
+        except Exception as e:
+            print(f"⚠️  Response cache Redis invalidation failed: {e}")
+
+    def _ensure_listener(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._listener is None or self._listener.done() or self._listener.get_loop() is not loop:
+            self._listener = loop.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        """Apply invalidations published by other processes"""
+        while True:
+            pubsub = None
+            try:
+                pubsub = self._client().pubsub()
+                await pubsub.subscribe(self.CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._invalidate_local(json.loads(message["data"]), "redis")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️  Response cache subscription lost, retrying: {e}")
+                await asyncio.sleep(1)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.close()
+                    except Exception:
+                        pass
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._tagged.clear()
+
+    def stats(self) -> Dict:
+        return {
+            "distributed": self.distributed,
+            "entries": len(self._entries),
+            "tags": len(self._tagged),
+            "inflight": len(self._inflight)
+        }
+
+
+# Global instance
+response_cache = ResponseCache()
+
+CACHE_ENTRIES = Gauge("response_cache_entries", "Entries in this process's response cache")
+CACHE_ENTRIES.set_function(lambda: response_cache.stats()["entries"])
+
+
+# ============================================================================
+# Write-driven invalidation
+# ============================================================================
+# Importing this module installs session hooks: tags touched by a flush or
+# an ORM INSERT/UPDATE/DELETE are collected on the session and invalidated
+# once it commits (dropped on rollback). Raw SQL writes call tag_session().
+
+_SESSION_TAGS = "response_cache_tags"
+
+
+def table_tags(table: str, row=None) -> Set[str]:
+    """Cache tags a write to `table` invalidates (row=None: any rows)"""
+    if table == "sites":
+        # Blueprint lookups check the site exists
+        return {"sites", "dashboard", f"site:{row.site_id}" if row is not None else "blueprints"}
+    if table == "blueprints":
+        return {f"site:{row.site_id}"} if row is not None else {"blueprints"}
+    if table == "jobs":
+        return {"jobs", "dashboard"}
+    if table == "analytics_metrics":
+        return {"dashboard"}
+    if table == "platform_templates":
+        return {"templates"}
+    return set()
+
+
+def tag_session(session, tags: Iterable[str]) -> None:
+    """Invalidate tags when session commits, for writes the hooks cannot see (text())"""
+    session.info.setdefault(_SESSION_TAGS, set()).update(tags)
+
+
+def _row_tags(session: Session, obj, changed: bool) -> Set[str]:
+    table = getattr(obj, "__tablename__", None)
+    if table is None:
+        return set()
+    if changed:
+        if not session.is_modified(obj):
+            return set()
+        # Job writes are mostly progress and heartbeats; only status counts
+        if table == "jobs" and not inspect(obj).attrs.status.history.has_changes():
+            return set()
+    return table_tags(table, obj)
+
+
+def _sets_column(statement, name: str) -> bool:
+    values = getattr(statement, "_values", None) or {}
+    return any(getattr(column, "key", column) == name for column in values)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed(session, flush_context):
+    tags = session.info.setdefault(_SESSION_TAGS, set())
+    for obj in chain(session.new, session.deleted):
+        tags |= _row_tags(session, obj, changed=False)
+    for obj in session.dirty:
+        tags |= _row_tags(session, obj, changed=True)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_statement(state):
+    if not (state.is_insert or state.is_update or state.is_delete) or state.bind_mapper is None:
+        return
+    table = state.bind_mapper.local_table.name
+    if table == "jobs" and state.is_update and not _sets_column(state.statement, "status"):
+        return
+    state.session.info.setdefault(_SESSION_TAGS, set()).update(table_tags(table))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    tags = session.info.pop(_SESSION_TAGS, None)
+    if tags:
+        response_cache.invalidate_soon(tags)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop(_SESSION_TAGS, None)
@@ -0,0 +1,118 @@
+"""Conditional-GET bookkeeping for one fetch session"""
+import gzip
+import hashlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import httpx
+
+
+@dataclass
+class StoredPage:
+    """Validators and compressed body of the last full response for a URL"""
+    url: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+    content_type: Optional[str] = None
+    body: Optional[bytes] = None  # gzip
+
+    @property
+    def revalidatable(self) -> bool:
+        return bool(self.body and (self.etag or self.last_modified))
+
+
+class RevalidationCache:
+    """
+    In-memory view of stored validators for one fetch session.
+
+    FetchSession asks it for conditional headers before a request and for
+    the stored body when the server answers 304; every fresh 200 is
+    recorded so the caller can persist what changed afterwards.
+    """
+
+    MAX_BODY_BYTES = 2_000_000
+
+    def __init__(self, pages: Optional[Dict[str, StoredPage]] = None):
+        self.pages: Dict[str, StoredPage] = pages or {}
+        self._changed: Dict[str, StoredPage] = {}
+
+        self.conditional_requests = 0
+        self.not_modified = 0
+        self.unchanged = 0
+        self.changed = 0
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        page = self.pages.get(url)
+        if page is None or not page.revalidatable:
+            return {}
+
+        self.conditional_requests += 1
+        headers = {}
+        if page.etag:
+            headers["If-None-Match"] = page.etag
+        if page.last_modified:
+            headers["If-Modified-Since"] = page.last_modified
+        return headers
+
+    def replay(self, url: str, response: httpx.Response) -> httpx.Response:
+        """Rebuild the stored 200 for a 304 Not Modified answer"""
+        page = self.pages[url]
+        self.not_modified += 1
+        self.unchanged += 1
+
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in ("content-length", "content-encoding")}
+        if page.content_type:
+            headers["content-type"] = page.content_type
+        return httpx.Response(
+            200,
+            headers=headers,
+            content=gzip.decompress(page.body),
+            request=response.request,
+            extensions={"revalidated": True}
+        )
+
+    def record(self, url: str, response: httpx.Response) -> None:
+        """Remember validators from a full 200 response"""
+        if response.status_code != 200:
+            return
+
+        content = response.content
+        content_hash = hashlib.sha256(content).hexdigest()
+        previous = self.pages.get(url)
+        if previous is not None and previous.content_hash == content_hash:
+            self.unchanged += 1
+        else:
+            self.changed += 1
+
+        page = StoredPage(
+            url=url,
+            etag=response.headers.get("etag"),
+            last_modified=response.headers.get("last-modified"),
+            content_hash=content_hash,
+            content_type=response.headers.get("content-type"),
+            body=gzip.compress(content, 6) if len(content) <= self.MAX_BODY_BYTES else None
+        )
+        if previous is not None and (
+            previous.content_hash == page.content_hash
+            and previous.etag == page.etag
+            and previous.last_modified == page.last_modified
+        ):
+            return
+
+        self.pages[url] = page
+        self._changed[url] = page
+
+    def changed_pages(self) -> List[StoredPage]:
+        return list(self._changed.values())
+
+    def stats(self) -> Dict[str, float]:
+        fetched = self.unchanged + self.changed
+        return {
+            "conditional_requests": self.conditional_requests,
+            "not_modified": self.not_modified,
+            "revalidation_hit_rate": round(self.not_modified / self.conditional_requests, 3) if self.conditional_requests else 0.0,
+            "unchanged_pages": self.unchanged,
+            "changed_pages": self.changed,
+            "unchanged_rate": round(self.unchanged / fetched, 3) if fetched else 0.0
+        }
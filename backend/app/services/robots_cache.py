@@ -0,0 +1,215 @@
+"""Bounded, single-flight robots.txt cache with an optional shared Redis tier"""
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import httpx
+
+try:
+    from redis import asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    aioredis = None
+    REDIS_AVAILABLE = False
+
+from app.config import settings
+
+
+class RobotsRules:
+    """Parsed robots.txt for one host plus the directives the crawler needs"""
+
+    # ok: parsed robots.txt; missing: 4xx, no restrictions;
+    # unreachable: fetch failed, allowed but cached only briefly
+    def __init__(self, user_agent: str, status: str, text: str = ""):
+        self.status = status
+        self.parser = RobotFileParser()
+        if status == "ok":
+            self.parser.parse(text.splitlines())
+        else:
+            self.parser.allow_all = True
+            self.parser.modified()
+
+        delay = self.parser.crawl_delay(user_agent) if status == "ok" else None
+        self.crawl_delay: Optional[float] = float(delay) if delay is not None else None
+        self.sitemaps: List[str] = (self.parser.site_maps() or []) if status == "ok" else []
+
+    def can_fetch(self, user_agent: str, url: str) -> bool:
+        return self.parser.can_fetch(user_agent, url)
+
+
+class RobotsCache:
+    """
+    robots.txt rules per host, fetched at most once at a time.
+
+    Lookups go memory LRU -> Redis (when ROBOTS_CACHE_REDIS_URL is set) ->
+    network. Concurrent misses for the same host share one download, and
+    failed downloads are cached for a short negative TTL so an unreachable
+    host is not retried on every page.
+    """
+
+    REDIS_PREFIX = "robots:"
+
+    def __init__(
+        self,
+        user_agent: str,
+        ttl: Optional[float] = None,
+        negative_ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        redis_url: Optional[str] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.user_agent = user_agent
+        self.ttl = ttl or settings.ROBOTS_CACHE_TTL
+        self.negative_ttl = negative_ttl or settings.ROBOTS_CACHE_NEGATIVE_TTL
+        self.max_entries = max_entries or settings.ROBOTS_CACHE_MAX_ENTRIES
+        self.redis_url = settings.ROBOTS_CACHE_REDIS_URL if redis_url is None else redis_url
+        self._transport = transport
+
+        # base_url -> (rules, expires_at on the monotonic clock)
+        self._entries: "OrderedDict[str, Tuple[RobotsRules, float]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._redis = None
+        self._redis_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.hits = 0
+        self.redis_hits = 0
+        self.fetches = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def base_url(url: str) -> str:
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}"
+
+    async def get(self, url: str) -> RobotsRules:
+        """Return the robots rules for url's host"""
+        base_url = self.base_url(url)
+
+        entry = self._entries.get(base_url)
+        if entry is not None:
+            rules, expires_at = entry
+            if time.monotonic() < expires_at:
+                self._entries.move_to_end(base_url)
+                self.hits += 1
+                return rules
+            del self._entries[base_url]
+
+        loop = asyncio.get_running_loop()
+        future = self._inflight.get(base_url)
+        if future is not None and future.get_loop() is loop:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        future = loop.create_future()
+        self._inflight[base_url] = future
+        try:
+            rules = await self._load(base_url)
+        except BaseException as e:
+            if isinstance(e, Exception):
+                future.set_exception(e)
+                future.exception()
+            else:
+                future.cancel()
+            raise
+        else:
+            future.set_result(rules)
+            return rules
+        finally:
+            if self._inflight.get(base_url) is future:
+                del self._inflight[base_url]
+
+    async def _load(self, base_url: str) -> RobotsRules:
+        cached = await self._redis_get(base_url)
+        if cached is not None:
+            self.redis_hits += 1
+            status, text, ttl = cached
+            rules = RobotsRules(self.user_agent, status, text)
+            self._store(base_url, rules, ttl)
+            return rules
+
+        status, text = await self._fetch(base_url)
+        ttl = self.negative_ttl if status == "unreachable" else self.ttl
+        rules = RobotsRules(self.user_agent, status, text)
+        self._store(base_url, rules, ttl)
+        await self._redis_set(base_url, status, text, ttl)
+        return rules
+
+    async def _fetch(self, base_url: str) -> Tuple[str, str]:
+        self.fetches += 1
+        try:
+            async with httpx.AsyncClient(timeout=10.0, transport=self._transport) as client:
+                response = await client.get(
+                    f"{base_url}/robots.txt",
+                    headers={"User-Agent": self.user_agent},
+                    follow_redirects=True
+                )
+        except Exception as e:
+            # If robots.txt is unreachable, assume allowed (standard practice)
+            print(f"⚠️  robots.txt unreachable for {base_url}: {e}")
+            return "unreachable", ""
+
+        if response.status_code >= 500:
+            return "unreachable", ""
+        if response.status_code >= 400:
+            return "missing", ""
+        return "ok", response.text
+
+    def _store(self, base_url: str, rules: RobotsRules, ttl: float) -> None:
+        self._entries[base_url] = (rules, time.monotonic() + ttl)
+        self._entries.move_to_end(base_url)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _client(self):
+        """Redis client bound to the running loop, or None when disabled"""
+        if not (self.redis_url and REDIS_AVAILABLE):
+            return None
+        loop = asyncio.get_running_loop()
+        if self._redis is None or self._redis_loop is not loop:
+            self._redis = aioredis.from_url(self.redis_url, decode_responses=True)
+            self._redis_loop = loop
+        return self._redis
+
+    async def _redis_get(self, base_url: str) -> Optional[Tuple[str, str, float]]:
+        client = self._client()
+        if client is None:
+            return None
+        try:
+            key = self.REDIS_PREFIX + base_url
+            raw, ttl = await asyncio.gather(client.get(key), client.ttl(key))
+        except Exception as e:
+            print(f"⚠️  robots cache Redis read failed: {e}")
+            return None
+        if not raw or ttl is None or ttl <= 0:
+            return None
+        data = json.loads(raw)
+        return data["status"], data.get("text", ""), float(ttl)
+
+    async def _redis_set(self, base_url: str, status: str, text: str, ttl: float) -> None:
+        client = self._client()
+        if client is None:
+            return
+        try:
+            await client.set(
+                self.REDIS_PREFIX + base_url,
+                json.dumps({"status": status, "text": text}),
+                ex=max(int(ttl), 1)
+            )
+        except Exception as e:
+            print(f"⚠️  robots cache Redis write failed: {e}")
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "fetches": self.fetches,
+            "coalesced": self.coalesced
+        }
@@ -0,0 +1,245 @@
+"""Compiled CSS selector-candidate evaluation for selector extraction"""
+import json
+import re
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+import soupsieve
+from bs4 import BeautifulSoup, Tag
+
+from app.config import settings
+
+
+# Built-in product page candidates, in preference order per field
+DEFAULT_CANDIDATES: Dict[str, List[str]] = {
+    "name": [
+        'h1.product-title', 'h1[itemprop="name"]', 'h1.title',
+        '.product-name', '[data-testid="product-name"]'
+    ],
+    "price": [
+        '.price', '[itemprop="price"]', '.product-price',
+        '[data-price]', '.price--final', '.current-price'
+    ],
+    "image": [
+        'img.product-image', '[itemprop="image"]',
+        '.product-img img', '.main-image img'
+    ],
+    "description": [
+        '[itemprop="description"]', '.description',
+        '.product-description', '#description'
+    ]
+}
+
+# Platform template keys (product_list_selectors) -> extraction fields
+TEMPLATE_FIELDS = {
+    "product_title": "name",
+    "product_price": "price",
+    "product_image": "image",
+    "product_description": "description"
+}
+
+
+@lru_cache(maxsize=2048)
+def _compile(selector: str):
+    """Compile a selector once per process; invalid selectors yield None"""
+    try:
+        return soupsieve.compile(selector)
+    except Exception as e:
+        print(f"⚠️  Ignoring invalid selector candidate {selector!r}: {e}")
+        return None
+
+
+_COMPONENT = re.compile(r"([.#]?)(-?[_a-zA-Z][-_a-zA-Z0-9]*|\*)|\[\s*([^\s~|^$*=\]]+)")
+
+
+def _split_top_level(text: str, separators: str) -> List[str]:
+    """Split on separator characters outside brackets, parens and quotes"""
+    parts, current, depth, quote = [], [], 0, None
+    for char in text:
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char in "[(":
+            depth += 1
+        elif char in "])":
+            depth -= 1
+        elif depth == 0 and char in separators:
+            parts.append("".join(current))
+            current = []
+            continue
+        current.append(char)
+    parts.append("".join(current))
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _strip_nested(compound: str) -> str:
+    """Drop pseudo-classes and attribute values, keeping [name] for indexing"""
+    out, depth, quote = [], 0, None
+    for char in compound:
+        if quote:
+            if char == quote:
+                quote = None
+            continue
+        if char in "'\"":
+            quote = char
+            continue
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif depth == 0:
+            out.append(char)
+    compound = re.sub(r"\[([^\]=~|^$*]*)[^\]]*\]", r"[\1]", "".join(out))
+    return re.sub(r"::?-?[_a-zA-Z][-_a-zA-Z0-9]*", "", compound)
+
+
+def required_keys(selector: str) -> Optional[List[Tuple[str, str]]]:
+    """
+    One token each alternative's subject element must carry, or None.
+
+    The subject (rightmost) compound of every comma-separated alternative
+    must match the element itself, so any class, id, attribute or tag it
+    names is a necessary condition. Returns None when some alternative has
+    no such token (e.g. '*' or a bare pseudo-class), meaning the selector
+    must be tried against every element.
+    """
+    keys = []
+    for alternative in _split_top_level(selector, ","):
+        compound = _split_top_level(alternative, " >+~")[-1]
+        found = {}
+        for prefix, name, attr in _COMPONENT.findall(_strip_nested(compound)):
+            if attr:
+                found.setdefault("attr", ("attr", attr.lower()))
+            elif prefix == ".":
+                found.setdefault("class", ("class", name))
+            elif prefix == "#":
+                found.setdefault("id", ("id", name))
+            elif name != "*" and not found:
+                found["tag"] = ("tag", name.lower())
+        for kind in ("id", "class", "attr", "tag"):
+            if kind in found:
+                keys.append(found[kind])
+                break
+        else:
+            return None
+    return keys
+
+
+def _element_keys(element: Tag) -> Set[Tuple[str, str]]:
+    keys = {("tag", element.name)}
+    for name, value in element.attrs.items():
+        keys.add(("attr", name.lower()))
+        if name == "class":
+            keys.update(("class", c) for c in (value if isinstance(value, list) else value.split()))
+        elif name == "id":
+            keys.add(("id", value))
+    return keys
+
+
+def load_config_candidates() -> Dict[str, List[str]]:
+    """Extra candidates from the SELECTOR_CANDIDATES JSON setting"""
+    raw = settings.SELECTOR_CANDIDATES
+    if not raw:
+        return {}
+    try:
+        data = json.loads(raw)
+    except ValueError as e:
+        print(f"⚠️  SELECTOR_CANDIDATES is not valid JSON: {e}")
+        return {}
+    return {
+        field: [s for s in selectors if isinstance(s, str)]
+        for field, selectors in data.items()
+        if isinstance(selectors, list)
+    }
+
+
+def template_candidates(product_list_selectors: Optional[Mapping[str, str]]) -> Dict[str, List[str]]:
+    """Map a platform template's product selectors onto extraction fields"""
+    candidates: Dict[str, List[str]] = {}
+    for key, selector in (product_list_selectors or {}).items():
+        field = TEMPLATE_FIELDS.get(key)
+        if field and isinstance(selector, str) and selector.strip():
+            candidates.setdefault(field, []).append(selector.strip())
+    return candidates
+
+
+class SelectorEngine:
+    """
+    Evaluate every candidate selector against a page in one tree traversal.
+
+    Candidates are compiled once (and cached process-wide), deduplicated
+    across fields, and indexed by a class/id/attribute/tag their subject
+    element requires, so each element is only tested against candidates it
+    could match. A selector drops out of the traversal as soon as it
+    matches, and the walk ends early once every candidate has been seen.
+    """
+
+    def __init__(self, candidates: Mapping[str, Iterable[str]]):
+        self.candidates: Dict[str, List[str]] = {}
+        self._patterns = {}
+        self._index: Dict[Tuple[str, str], List[str]] = defaultdict(list)
+        self._unindexed: List[str] = []
+
+        for field, selectors in candidates.items():
+            ordered = self.candidates.setdefault(field, [])
+            for selector in selectors:
+                if selector in ordered:
+                    continue
+                pattern = _compile(selector)
+                if pattern is None:
+                    continue
+                ordered.append(selector)
+                if selector in self._patterns:
+                    continue
+                self._patterns[selector] = pattern
+                keys = required_keys(selector)
+                if keys is None:
+                    self._unindexed.append(selector)
+                else:
+                    for key in set(keys):
+                        self._index[key].append(selector)
+
+    def extended(self, *extra: Mapping[str, Iterable[str]]) -> "SelectorEngine":
+        """New engine with extra candidates appended after the current ones"""
+        merged = {field: list(selectors) for field, selectors in self.candidates.items()}
+        for candidates in extra:
+            for field, selectors in (candidates or {}).items():
+                merged.setdefault(field, []).extend(selectors)
+        return SelectorEngine(merged)
+
+    def evaluate(self, soup: BeautifulSoup) -> Dict[str, List[str]]:
+        """Return, per field, the candidates that match somewhere in the page"""
+        pending = dict(self._patterns)
+        matched = set()
+        index = self._index
+
+        for element in soup.descendants:
+            if not isinstance(element, Tag):
+                continue
+
+            tried = set()
+            for key in _element_keys(element):
+                for selector in index.get(key, ()):
+                    if selector in pending and selector not in tried:
+                        tried.add(selector)
+                        if pending[selector].match(element):
+                            matched.add(selector)
+                            del pending[selector]
+            for selector in self._unindexed:
+                if selector in pending and pending[selector].match(element):
+                    matched.add(selector)
+                    del pending[selector]
+
+            if not pending:
+                break
+
+        return {
+            field: [s for s in selectors if s in matched]
+            for field, selectors in self.candidates.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self._patterns)
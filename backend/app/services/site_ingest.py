@@ -0,0 +1,287 @@
+"""Bulk site onboarding from streamed NDJSON or CSV"""
+import asyncio
+import codecs
+import csv
+import json
+import re
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import Job, Site
+
+# Hostname: dot-separated labels, each 1-63 chars, no leading/trailing hyphen
+_HOSTNAME = re.compile(
+    r"^(?=.{1,253}$)(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+[a-z0-9-]{2,63}$"
+)
+
+# Invalid rows reported back in detail (the count covers all of them)
+MAX_REPORTED_ERRORS = 100
+
+
+def normalize_domain(value: str) -> Optional[str]:
+    """Bare lowercase hostname from a domain or URL; None if invalid"""
+    domain = value.strip().lower()
+    if "://" in domain:
+        domain = domain.split("://", 1)[1]
+    domain = domain.split("/", 1)[0].split("?", 1)[0].split("#", 1)[0]
+    domain = domain.rsplit("@", 1)[-1].split(":", 1)[0].rstrip(".")
+    if not _HOSTNAME.match(domain):
+        return None
+    return domain
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into text lines without buffering the body"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+@dataclass
+class IngestRow:
+    line: int
+    domain: Optional[str] = None
+    business_value_score: Optional[float] = None
+    notes: Optional[str] = None
+    error: Optional[str] = None
+
+
+def _build_row(line: int, record: Dict) -> IngestRow:
+    raw = record.get("domain")
+    if not isinstance(raw, str) or not raw.strip():
+        return IngestRow(line, error="missing domain")
+    domain = normalize_domain(raw)
+    if domain is None:
+        return IngestRow(line, error=f"invalid domain: {raw[:100]}")
+
+    score = record.get("business_value_score")
+    if score in (None, ""):
+        score = None
+    else:
+        try:
+            score = float(score)
+        except (TypeError, ValueError):
+            return IngestRow(line, error="business_value_score is not a number")
+        if not 0 <= score <= 1:
+            return IngestRow(line, error="business_value_score must be between 0 and 1")
+
+    notes = record.get("notes") or None
+    return IngestRow(line, domain, score, str(notes) if notes is not None else None)
+
+
+async def parse_ndjson(lines: AsyncIterator[str]) -> AsyncIterator[IngestRow]:
+    """One JSON object ({"domain": ...}) or bare JSON string per line"""
+    number = 0
+    async for text in lines:
+        number += 1
+        if not text.strip():
+            continue
+        try:
+            record = json.loads(text)
+        except ValueError:
+            yield IngestRow(number, error="invalid JSON")
+            continue
+        if isinstance(record, str):
+            record = {"domain": record}
+        if not isinstance(record, dict):
+            yield IngestRow(number, error="expected a JSON object")
+            continue
+        yield _build_row(number, record)
+
+
+async def parse_csv(lines: AsyncIterator[str]) -> AsyncIterator[IngestRow]:
+    """CSV with a header naming a domain column, or a bare list of domains"""
+    number = 0
+    header: Optional[List[str]] = None
+    async for text in lines:
+        number += 1
+        if not text.strip():
+            continue
+        # Rows are parsed line by line, so quoted fields cannot span lines
+        values = next(csv.reader([text]))
+        if header is None:
+            names = [value.strip().lower() for value in values]
+            if "domain" in names:
+                header = names
+                continue
+            header = ["domain"] + names[1:]
+        yield _build_row(number, dict(zip(header, values)))
+
+
+@dataclass
+class IngestSummary:
+    received: int = 0
+    created: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    jobs_queued: int = 0
+    jobs_dispatched: int = 0
+    batches: int = 0
+    errors: List[Dict] = field(default_factory=list)
+
+    def add_error(self, row: IngestRow) -> None:
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": row.line, "error": row.error})
+
+    def to_dict(self) -> Dict:
+        return {
+            "received": self.received,
+            "created": self.created,
+            "duplicates": self.duplicates,
+            "invalid": self.invalid,
+            "jobs_queued": self.jobs_queued,
+            "jobs_dispatched": self.jobs_dispatched,
+            "batches": self.batches,
+            "errors": self.errors
+        }
+
+
+def dispatch_fingerprint_jobs(jobs: List[Tuple[str, str]]) -> int:
+    """Send (site_id, job_id) pairs to Celery over one producer connection"""
+    from app.celery_app import celery_app
+    from app.workers.fingerprinter import fingerprint_site
+
+    with celery_app.producer_or_acquire() as producer:
+        for site_id, job_id in jobs:
+            fingerprint_site.apply_async((site_id, job_id), producer=producer)
+    return len(jobs)
+
+
+class SiteIngestor:
+    """
+    Onboard large domain lists: one multi-row INSERT per batch for sites,
+    one for their fingerprint jobs, and one commit.
+
+    Duplicates are resolved by the insert itself (ON CONFLICT (domain)
+    DO NOTHING RETURNING), so existing domains cost no extra query and
+    concurrent uploads cannot race a SELECT. Repeats within the upload are
+    dropped before they reach the database.
+
+    New jobs are queued in the database first; runners listening on
+    jobs_queued pick them up even when Celery is unreachable. Celery
+    dispatch happens per batch over a single producer connection.
+    """
+
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        dispatch: Optional[Callable[[List[Tuple[str, str]]], int]] = dispatch_fingerprint_jobs
+    ):
+        self.batch_size = batch_size or settings.SITE_INGEST_BATCH_SIZE
+        self.dispatch = dispatch
+
+    async def ingest(self, db: AsyncSession, rows: AsyncIterator[IngestRow]) -> IngestSummary:
+        summary = IngestSummary()
+        seen: Set[str] = set()
+        batch: List[IngestRow] = []
+        dispatch_failed = False
+
+        async for row in rows:
+            summary.received += 1
+            if row.error:
+                summary.add_error(row)
+                continue
+            if row.domain in seen:
+                summary.duplicates += 1
+                continue
+            seen.add(row.domain)
+            batch.append(row)
+
+            if len(batch) >= self.batch_size:
+                dispatch_failed = await self._flush(db, batch, summary, dispatch_failed)
+                batch = []
+
+        if batch:
+            await self._flush(db, batch, summary, dispatch_failed)
+        return summary
+
+    async def _flush(
+        self,
+        db: AsyncSession,
+        batch: List[IngestRow],
+        summary: IngestSummary,
+        dispatch_failed: bool
+    ) -> bool:
+        now = datetime.utcnow()
+        created = await self._insert_sites(db, batch, now)
+        jobs = [(site_id, uuid.uuid4()) for site_id in created]
+        if jobs:
+            await self._insert_jobs(db, jobs, now)
+        await db.commit()
+
+        summary.batches += 1
+        summary.created += len(created)
+        summary.duplicates += len(batch) - len(created)
+        summary.jobs_queued += len(jobs)
+
+        if jobs and self.dispatch is not None and not dispatch_failed:
+            try:
+                # Publishing blocks on the broker: keep it off the event loop
+                summary.jobs_dispatched += await asyncio.to_thread(
+                    self.dispatch, [(str(site_id), str(job_id)) for site_id, job_id in jobs]
+                )
+            except Exception as e:
+                # Jobs stay queued for runners; don't retry Celery every batch
+                print(f"⚠️  Celery dispatch failed, leaving jobs queued: {e}")
+                return True
+        return dispatch_failed
+
+    async def _insert_sites(self, db: AsyncSession, batch: List[IngestRow], now: datetime) -> List[uuid.UUID]:
+        stmt = (
+            insert(Site)
+            .values([
+                {
+                    "site_id": uuid.uuid4(),
+                    "domain": row.domain,
+                    "status": "pending",
+                    "business_value_score": 0.5 if row.business_value_score is None else row.business_value_score,
+                    "notes": row.notes,
+                    "blueprint_version": 1,
+                    "created_at": now,
+                    "updated_at": now
+                }
+                for row in batch
+            ])
+            .on_conflict_do_nothing(index_elements=[Site.domain])
+            .returning(Site.site_id)
+        )
+        result = await db.execute(stmt)
+        return [row.site_id for row in result.all()]
+
+    async def _insert_jobs(self, db: AsyncSession, jobs: List[Tuple[uuid.UUID, uuid.UUID]], now: datetime) -> None:
+        await db.execute(
+            insert(Job).values([
+                {
+                    "job_id": job_id,
+                    "site_id": site_id,
+                    "job_type": "fingerprint",
+                    "method": "auto",
+                    "status": "queued",
+                    "priority": 0,
+                    "progress": 0,
+                    "attempt_count": 0,
+                    "max_retries": 3,
+                    "created_at": now,
+                    "updated_at": now
+                }
+                for site_id, job_id in jobs
+            ])
+        )
+
+
+# Global instance
+site_ingestor = SiteIngestor()
@@ -5,9 +5,9 @@ from typing import Optional, List
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import func
 
 from app.models.site import Site
+from app.services.pagination import count_rows, keyset, page
 from app.schemas.site import SiteCreate, SiteUpdate, SiteResponse, SiteListResponse
 
 logger = logging.getLogger(__name__)
@@ -16,6 +16,8 @@ logger = logging.getLogger(__name__)
 class SiteService:
     """Service for site operations"""
 
+    SORT_COLUMNS = {"created_at": Site.created_at, "updated_at": Site.updated_at, "domain": Site.domain}
+
     def __init__(self, db: AsyncSession):
         self.db = db
 
@@ -55,9 +57,11 @@ class SiteService:
         search: Optional[str] = None,
         limit: int = 50,
         offset: int = 0,
-        sort_by: str = "-created_at"
+        sort_by: str = "-created_at",
+        cursor: Optional[str] = None,
+        count: str = "none"
     ) -> SiteListResponse:
-        """List sites with filters and pagination"""
+        """List sites with filters and cursor pagination (raises InvalidCursor)"""
         query = select(Site)
 
         # Apply filters
@@ -68,31 +72,26 @@ class SiteService:
         if search:
             query = query.where(Site.domain.contains(search))
 
-        # Get total count
-        count_result = await self.db.execute(select(func.count(Site.site_id)).select_from(Site))
-        total = count_result.scalar()
-
-        # Apply sorting
-        if sort_by.startswith("-"):
-            # Descending
-            sort_column = getattr(Site, sort_by[1:], Site.created_at)
-            query = query.order_by(sort_column.desc())
-        else:
-            # Ascending
-            sort_column = getattr(Site, sort_by, Site.created_at)
-            query = query.order_by(sort_column)
-
-        # Apply pagination
-        query = query.limit(limit).offset(offset)
+        # Count what the filters match, only when asked to
+        total, estimated = await count_rows(
+            self.db, query, count, f"sites:{status}:{platform}:{search}", ("sites",)
+        )
 
-        # Execute query
-        result = await self.db.execute(query)
-        sites = result.scalars().all()
+        # Keyset sorting needs non-null columns; site_id breaks ties
+        descending = sort_by.startswith("-")
+        sort_column = self.SORT_COLUMNS.get(sort_by.lstrip("-"), Site.created_at)
+        keys = (sort_column, Site.site_id)
+        result = await self.db.execute(
+            keyset(query, keys, cursor, limit, descending=descending, offset=offset)
+        )
+        sites, next_cursor = page(result.scalars().all(), keys, limit, descending=descending)
 
         return SiteListResponse(
             total=total,
+            total_estimated=estimated,
             limit=limit,
             offset=offset,
+            next_cursor=next_cursor,
             sites=[SiteResponse.from_orm(site) for site in sites]
         )
 
@@ -0,0 +1,250 @@
+"""Local content-addressed store of fetched pages shared by all pipeline stages"""
+import gzip
+import hashlib
+import mmap
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import NamedTuple, Optional
+
+from app.config import settings
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+
+class Snapshot(NamedTuple):
+    url: str
+    fetched_at: float  # unix time
+    content_hash: str  # sha256 of the uncompressed body
+    codec: str  # zstd | gzip
+    status_code: int
+    content_type: Optional[str]
+    size: int
+
+
+class SnapshotStore:
+    """
+    Page bodies on local disk, stored once per distinct content.
+
+    Objects live under objects/<hash[:2]>/<hash>.<codec>, compressed with
+    zstd when available (gzip otherwise), and are written atomically, so
+    identical pages fetched by different stages or sites share one file.
+    A SQLite index (WAL, safe across worker processes on the host) maps
+    URL and fetch time to content hash.
+
+    Reads map the object file with mmap and decompress straight from the
+    mapping, without first copying the compressed bytes into Python.
+
+    FetchSession consults latest(url, max_age) before going to the network,
+    so the fingerprinter, discoverer and selector generator download a
+    homepage once between them; max_age < 0 accepts any age, which lets
+    analysis be re-run offline from the store.
+    """
+
+    # Prune expired index rows and objects every this many writes
+    PRUNE_EVERY = 500
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        max_age: Optional[float] = None,
+        retention: Optional[float] = None,
+        compression: Optional[str] = None
+    ):
+        self.root = settings.SNAPSHOT_DIR if root is None else root
+        self.max_age = settings.SNAPSHOT_MAX_AGE if max_age is None else max_age
+        self.retention = settings.SNAPSHOT_RETENTION if retention is None else retention
+        codec = compression or settings.SNAPSHOT_COMPRESSION
+        self.codec = "zstd" if codec == "zstd" and ZSTD_AVAILABLE else "gzip"
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.deduplicated = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.root)
+
+    def _index(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.join(self.root, "objects"), exist_ok=True)
+            db = sqlite3.connect(
+                os.path.join(self.root, "index.sqlite"),
+                timeout=30,
+                check_same_thread=False,
+                isolation_level=None
+            )
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots ("
+                " url TEXT NOT NULL, fetched_at REAL NOT NULL, content_hash TEXT NOT NULL,"
+                " codec TEXT NOT NULL, status_code INTEGER NOT NULL, content_type TEXT,"
+                " size INTEGER NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS idx_snapshots_url ON snapshots (url, fetched_at DESC)")
+            db.execute("CREATE INDEX IF NOT EXISTS idx_snapshots_fetched ON snapshots (fetched_at)")
+            db.execute("CREATE INDEX IF NOT EXISTS idx_snapshots_hash ON snapshots (content_hash)")
+            self._db = db
+        return self._db
+
+    def _object_path(self, content_hash: str, codec: str) -> str:
+        return os.path.join(self.root, "objects", content_hash[:2], f"{content_hash}.{codec}")
+
+    def _compress(self, body: bytes) -> bytes:
+        if self.codec == "zstd":
+            return zstandard.ZstdCompressor(level=10).compress(body)
+        return gzip.compress(body, compresslevel=6)
+
+    @staticmethod
+    def _decompress(data, codec: str) -> bytes:
+        if codec == "zstd":
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError("Snapshot is zstd-compressed but zstandard is not installed")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return gzip.decompress(data)
+
+    def put(
+        self,
+        url: str,
+        body: bytes,
+        status_code: int = 200,
+        content_type: Optional[str] = None,
+        fetched_at: Optional[float] = None
+    ) -> Snapshot:
+        """Store a fetched body (once per content hash) and index it for url"""
+        content_hash = hashlib.sha256(body).hexdigest()
+        fetched_at = time.time() if fetched_at is None else fetched_at
+
+        codec = self._existing_codec(content_hash)
+        if codec is None:
+            codec = self.codec
+            self._write_object(self._object_path(content_hash, codec), self._compress(body))
+            self.writes += 1
+        else:
+            self.deduplicated += 1
+
+        snapshot = Snapshot(url, fetched_at, content_hash, codec, status_code, content_type, len(body))
+        with self._lock:
+            db = self._index()
+            latest = db.execute(
+                "SELECT rowid, content_hash FROM snapshots WHERE url = ? ORDER BY fetched_at DESC LIMIT 1",
+                (url,)
+            ).fetchone()
+            if latest is not None and latest[1] == content_hash:
+                # Unchanged page: refresh the fetch time instead of adding a row
+                db.execute("UPDATE snapshots SET fetched_at = ? WHERE rowid = ?", (fetched_at, latest[0]))
+            else:
+                db.execute("INSERT INTO snapshots VALUES (?, ?, ?, ?, ?, ?, ?)", snapshot)
+            self._writes += 1
+            prune = self._writes % self.PRUNE_EVERY == 0
+        if prune:
+            self.prune()
+        return snapshot
+
+    def _existing_codec(self, content_hash: str) -> Optional[str]:
+        for codec in ("zstd", "gzip"):
+            if os.path.exists(self._object_path(content_hash, codec)):
+                return codec
+        return None
+
+    @staticmethod
+    def _write_object(path: str, data: bytes) -> None:
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def latest(self, url: str, max_age: Optional[float] = None) -> Optional[Snapshot]:
+        """Newest snapshot of url no older than max_age seconds (< 0: any age)"""
+        max_age = self.max_age if max_age is None else max_age
+        if max_age == 0:
+            return None
+        with self._lock:
+            row = self._index().execute(
+                "SELECT * FROM snapshots WHERE url = ? ORDER BY fetched_at DESC LIMIT 1",
+                (url,)
+            ).fetchone()
+
+        snapshot = Snapshot(*row) if row else None
+        if snapshot is None or (max_age > 0 and time.time() - snapshot.fetched_at > max_age):
+            self.misses += 1
+            return None
+        if self._existing_codec(snapshot.content_hash) is None:
+            # Object pruned or lost: treat as a miss
+            self.misses += 1
+            return None
+        self.hits += 1
+        return snapshot
+
+    def read(self, snapshot: Snapshot) -> bytes:
+        """Decompress a snapshot body straight from the mmap'd object"""
+        path = self._object_path(snapshot.content_hash, snapshot.codec)
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return self._decompress(mapped, snapshot.codec)
+
+    def prune(self, retention: Optional[float] = None) -> int:
+        """Drop index rows past retention and objects no row refers to"""
+        retention = self.retention if retention is None else retention
+        if retention <= 0:
+            return 0
+        cutoff = time.time() - retention
+        with self._lock:
+            db = self._index()
+            expired = {
+                row[0] for row in db.execute(
+                    "SELECT DISTINCT content_hash FROM snapshots WHERE fetched_at < ?", (cutoff,)
+                )
+            }
+            db.execute("DELETE FROM snapshots WHERE fetched_at < ?", (cutoff,))
+            # Identical content may still be indexed for another URL
+            orphaned = [
+                content_hash for content_hash in expired
+                if db.execute(
+                    "SELECT 1 FROM snapshots WHERE content_hash = ? LIMIT 1", (content_hash,)
+                ).fetchone() is None
+            ]
+
+        removed = 0
+        for content_hash in orphaned:
+            for codec in ("zstd", "gzip"):
+                path = self._object_path(content_hash, codec)
+                if os.path.exists(path):
+                    os.unlink(path)
+                    removed += 1
+        return removed
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def stats(self) -> dict:
+        return {
+            "snapshot_hits": self.hits,
+            "snapshot_misses": self.misses,
+            "snapshot_writes": self.writes,
+            "snapshot_deduplicated": self.deduplicated
+        }
+
+
+# Global instance (one per process; the directory is shared across processes)
+snapshot_store = SnapshotStore()
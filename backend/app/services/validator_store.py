@@ -0,0 +1,87 @@
+"""Persistent per-URL validators for conditional GETs on re-discovery"""
+from datetime import datetime
+from typing import Iterable, List
+from urllib.parse import urlparse
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import PageValidator
+from app.services.revalidation import RevalidationCache, StoredPage
+
+
+class ValidatorStore:
+    """Load and persist page validators in the page_validators table"""
+
+    # Rows per upsert statement (asyncpg caps bind parameters per query)
+    BATCH_SIZE = 500
+
+    @staticmethod
+    def host(url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    async def load_host(self, db: AsyncSession, url: str) -> RevalidationCache:
+        """Every stored page of url's host, for a discovery run"""
+        result = await db.execute(
+            select(PageValidator).where(PageValidator.host == self.host(url))
+        )
+        return RevalidationCache({row.url: self._to_page(row) for row in result.scalars()})
+
+    async def load_urls(self, db: AsyncSession, urls: Iterable[str]) -> RevalidationCache:
+        result = await db.execute(
+            select(PageValidator).where(PageValidator.url.in_(list(urls)))
+        )
+        return RevalidationCache({row.url: self._to_page(row) for row in result.scalars()})
+
+    async def save(self, db: AsyncSession, cache: RevalidationCache) -> int:
+        """Upsert the pages that changed during the run; caller commits"""
+        pages = cache.changed_pages()
+        if not pages:
+            return 0
+
+        now = datetime.utcnow()
+        saved = 0
+        for start in range(0, len(pages), self.BATCH_SIZE):
+            saved += await self._upsert(db, pages[start:start + self.BATCH_SIZE], now)
+        return saved
+
+    async def _upsert(self, db: AsyncSession, pages: List[StoredPage], now: datetime) -> int:
+        rows = [
+            {
+                "url": page.url,
+                "host": self.host(page.url),
+                "etag": page.etag,
+                "last_modified": page.last_modified,
+                "content_hash": page.content_hash,
+                "content_type": page.content_type,
+                "body": page.body,
+                "fetched_at": now
+            }
+            for page in pages
+        ]
+        stmt = insert(PageValidator).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[PageValidator.url],
+            set_={
+                column: stmt.excluded[column]
+                for column in ("etag", "last_modified", "content_hash", "content_type", "body", "fetched_at")
+            }
+        )
+        await db.execute(stmt)
+        return len(rows)
+
+    @staticmethod
+    def _to_page(row: PageValidator) -> StoredPage:
+        return StoredPage(
+            url=row.url,
+            etag=row.etag,
+            last_modified=row.last_modified,
+            content_hash=row.content_hash,
+            content_type=row.content_type,
+            body=row.body
+        )
+
+
+# Global instance
+validator_store = ValidatorStore()
@@ -1,24 +1,25 @@
 """Discoverer worker - Feature G: Advanced site discovery with compliance"""
-import asyncio
+import time
 from uuid import UUID, uuid4
 from datetime import datetime
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
 
 from app.celery_app import celery_app
 from app.config import settings
 from app.models import Site, Job, Blueprint
 from app.services.discovery_service import discovery_service
+from app.services.selector_engine import template_candidates
+from app.services.validator_store import validator_store
 from app.services.template_matcher import template_matcher
+from app.services.analytics_service import analytics_service
+from app.services.job_queue import job_queue
+from app.workers.progress import ProgressReporter
+from app.workers.runtime import JobHandedBack, run_async, worker_db
 
 
-async def _discover_site_async(site_id: str, job_id: str):
+async def _discover_site_async(site_id: str, job_id: str, claimed: bool = False):
     """Async discovery logic"""
-    engine = create_async_engine(settings.DATABASE_URL)
-    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-    
-    async with async_session() as db:
+    async with worker_db.session() as db:
         # Get site
         site_stmt = select(Site).where(Site.site_id == UUID(site_id))
         result = await db.execute(site_stmt)
@@ -27,6 +28,11 @@ async def _discover_site_async(site_id: str, job_id: str):
         if not site:
             return {"error": "Site not found"}
         
+        # Claim it unless a queue runner already did; whoever else holds it runs it
+        if not claimed and not await job_queue.claim_job(db, job_id):
+            print(f"⏭️  Job {job_id} is no longer queued, skipping")
+            return {"skipped": True, "reason": "Job is no longer queued"}
+        
         # Get job
         job_stmt = select(Job).where(Job.job_id == UUID(job_id))
         result = await db.execute(job_stmt)
@@ -35,17 +41,44 @@ async def _discover_site_async(site_id: str, job_id: str):
         if not job:
             return {"error": "Job not found"}
         
-        # Update job
-        job.status = "running"
-        job.started_at = datetime.utcnow()
-        await db.commit()
+        # Leave headroom under the job timeout (WORKER_JOB_TIMEOUT) to save partial results
+        deadline = time.monotonic() + settings.DISCOVERY_TIME_BUDGET
+        report = ProgressReporter(job_id, "discover", site_id)
+        await report("started", 0)
+        
+        async def on_phase_done(phase: str, completed: int, total: int):
+            # Discovery phases cover 5-90%; templating and saving the rest
+            await report(phase, 5 + 85 * completed // total)
         
         try:
+            # Find the platform template first (Feature F) so its selectors
+            # are evaluated as phase 4 candidates
+            template = None
+            if site.platform:
+                print(f"🔍 Looking for template for platform: {site.platform}")
+                template = await template_matcher.find_template(
+                    platform_name=site.platform,
+                    fingerprint_data=site.fingerprint_data,
+                    variant=None,  # Could extract from fingerprint_data if needed
+                    db=db
+                )
+            
             # Run Feature G discovery (all 6 phases with compliance)
             url = f"https://{site.domain}"
             print(f"🚀 Starting Feature G discovery for {url}")
             
-            discovery_result = await discovery_service.discover_site(url)
+            # Validators from earlier runs make unchanged pages cheap 304s
+            revalidation = await validator_store.load_host(db, url)
+            discovery_result = await discovery_service.discover_site(
+                url,
+                selector_candidates=template_candidates(
+                    template.product_list_selectors if template else None
+                ),
+                revalidation=revalidation,
+                on_phase_done=on_phase_done,
+                deadline=deadline
+            )
+            await validator_store.save(db, revalidation)
             
             if not discovery_result.get("success"):
                 error_msg = discovery_result.get("error", "Discovery failed")
@@ -53,17 +86,8 @@ async def _discover_site_async(site_id: str, job_id: str):
             
             print(f"✅ Discovery complete! Confidence: {discovery_result['confidence_score']}")
             
-            # Try to find and apply platform template (Feature F)
-            template = None
+            # Apply platform template (Feature F)
             if site.platform:
-                print(f"🔍 Looking for template for platform: {site.platform}")
-                template = await template_matcher.find_template(
-                    platform_name=site.platform,
-                    fingerprint_data=site.fingerprint_data,
-                    variant=None,  # Could extract from fingerprint_data if needed
-                    db=db
-                )
-                
                 if template:
                     print(f"✅ Found template: {template.platform_name} (confidence: {template.confidence})")
                     # Merge template data with discovery results
@@ -98,8 +122,10 @@ async def _discover_site_async(site_id: str, job_id: str):
                 render_hints_data=discovery_result.get("render_hints", {}),
                 # Store selectors data
                 selectors_data=discovery_result["selectors"].get("selectors", {}),
+                # Which phases finished (partial runs still save a blueprint)
+                phases_data=discovery_result.get("phases"),
                 created_by="system_featureG",
-                notes=f"Feature G discovery (job {job_id}). Found {discovery_result['categories'].get('total_categories', 0)} categories, {discovery_result['products'].get('total_products_found', 0)} products, {len(discovery_result['selectors'].get('selectors', {}))} selectors."
+                notes=f"{'Partial ' if discovery_result.get('partial') else ''}Feature G discovery (job {job_id}). Found {discovery_result['categories'].get('total_categories', 0)} categories, {discovery_result['products'].get('total_products_found', 0)} products, {len(discovery_result['selectors'].get('selectors', {}))} selectors."
             )
             
             db.add(blueprint)
@@ -111,7 +137,11 @@ async def _discover_site_async(site_id: str, job_id: str):
             
             # Update job with complete results
             job.status = "success"
+            job.progress = 100
             job.completed_at = datetime.utcnow()
+            # JS-heavy sites were explored through the browser pool
+            requires_js = discovery_result.get("render_hints", {}).get("requires_js")
+            job_queue.record_method(job, "browser" if requires_js else "static")
             job.result = {
                 "blueprint_id": str(blueprint.blueprint_id),
                 "version": version,
@@ -120,10 +150,19 @@ async def _discover_site_async(site_id: str, job_id: str):
                 "products_found": discovery_result["products"].get("total_products_found", 0),
                 "selectors_found": len(discovery_result["selectors"].get("selectors", {})),
                 "endpoints_found": discovery_result["endpoints"].get("total_endpoints", 0),
-                "duration_seconds": discovery_result.get("duration_seconds", 0)
+                "duration_seconds": discovery_result.get("duration_seconds", 0),
+                "fetch_stats": discovery_result.get("fetch_stats", {}),
+                "phase_timings": discovery_result.get("phase_timings", {}),
+                "partial": discovery_result.get("partial", False),
+                "phases": discovery_result.get("phases", {})
             }
             
+            await analytics_service.record(db, job)
             await db.commit()
+            await report(
+                "saved", 100, status="success",
+                message="partial blueprint" if discovery_result.get("partial") else None
+            )
             
             print(f"💾 Blueprint v{version} saved successfully!")
             
@@ -137,21 +176,27 @@ async def _discover_site_async(site_id: str, job_id: str):
             
         except Exception as e:
             job.status = "failed"
-            job.ended_at = datetime.utcnow()
+            job.completed_at = datetime.utcnow()
             job.error_message = str(e)
+            await analytics_service.record(db, job)
             await db.commit()
+            await report("failed", status="failed", message=str(e))
             
             return {"success": False, "error": str(e)}
-        
-        finally:
-            await engine.dispose()
 
 
 @celery_app.task(name="workers.discover_site", bind=True)
 def discover_site(self, site_id: str, job_id: str):
     """Celery task to discover site structure"""
     try:
-        result = asyncio.run(_discover_site_async(site_id, job_id))
+        result = run_async(
+            _discover_site_async(site_id, job_id),
+            job_type="discover",
+            job_id=job_id
+        )
         return result
+    except JobHandedBack:
+        # Requeued: the retry claims it again unless a queue runner did first
+        raise self.retry(countdown=5)
     except Exception as e:
         return {"success": False, "error": str(e)}
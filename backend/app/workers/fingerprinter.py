@@ -1,23 +1,21 @@
 """Fingerprinter worker - analyzes site and detects platform/CMS"""
-import asyncio
 from uuid import UUID
 from datetime import datetime
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
 
 from app.celery_app import celery_app
-from app.config import settings
 from app.models import Site, Job
 from app.services.fingerprint_service import fingerprint_service
+from app.services.validator_store import validator_store
+from app.services.analytics_service import analytics_service
+from app.services.job_queue import job_queue
+from app.workers.progress import ProgressReporter
+from app.workers.runtime import JobHandedBack, run_async, worker_db
 
 
-async def _fingerprint_site_async(site_id: str, job_id: str):
+async def _fingerprint_site_async(site_id: str, job_id: str, claimed: bool = False):
     """Async fingerprinting logic"""
-    engine = create_async_engine(settings.DATABASE_URL)
-    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-    
-    async with async_session() as db:
+    async with worker_db.session() as db:
         # Get site
         site_stmt = select(Site).where(Site.site_id == UUID(site_id))
         result = await db.execute(site_stmt)
@@ -26,6 +24,11 @@ async def _fingerprint_site_async(site_id: str, job_id: str):
         if not site:
             return {"error": "Site not found"}
         
+        # Claim it unless a queue runner already did; whoever else holds it runs it
+        if not claimed and not await job_queue.claim_job(db, job_id):
+            print(f"⏭️  Job {job_id} is no longer queued, skipping")
+            return {"skipped": True, "reason": "Job is no longer queued"}
+        
         # Get job
         job_stmt = select(Job).where(Job.job_id == UUID(job_id))
         result = await db.execute(job_stmt)
@@ -34,15 +37,20 @@ async def _fingerprint_site_async(site_id: str, job_id: str):
         if not job:
             return {"error": "Job not found"}
         
-        # Update job status
-        job.status = "running"
-        job.started_at = datetime.utcnow()
-        await db.commit()
+        report = ProgressReporter(job_id, "fingerprint", site_id)
+        await report("started", 0)
         
         try:
             # Run fingerprinting
             url = f"https://{site.domain}"
-            fingerprint = await fingerprint_service.fingerprint_site(url)
+            revalidation = await validator_store.load_urls(db, [url])
+            fingerprint = await fingerprint_service.fingerprint_site(
+                url,
+                revalidation=revalidation,
+                previous=site.fingerprint_data
+            )
+            await validator_store.save(db, revalidation)
+            await report("analyzed", 80)
             
             # Update site with fingerprint data
             site.platform = fingerprint.get("platform", "unknown")
@@ -53,10 +61,14 @@ async def _fingerprint_site_async(site_id: str, job_id: str):
             
             # Update job
             job.status = "success"
+            job.progress = 100
             job.completed_at = datetime.utcnow()
-            job.result = fingerprint
+            job_queue.record_method(job, "static")
+            job.result = {**fingerprint, "revalidation": revalidation.stats()}
             
+            await analytics_service.record(db, job)
             await db.commit()
+            await report("saved", 100, status="success")
             
             return {
                 "success": True,
@@ -67,22 +79,28 @@ async def _fingerprint_site_async(site_id: str, job_id: str):
             
         except Exception as e:
             job.status = "failed"
-            job.ended_at = datetime.utcnow()
+            job.completed_at = datetime.utcnow()
             job.error_message = str(e)
             site.status = "error"
+            await analytics_service.record(db, job)
             await db.commit()
+            await report("failed", status="failed", message=str(e))
             
             return {"success": False, "error": str(e)}
-        
-        finally:
-            await engine.dispose()
 
 
 @celery_app.task(name="workers.fingerprint_site", bind=True)
 def fingerprint_site(self, site_id: str, job_id: str):
     """Celery task to fingerprint a site"""
     try:
-        result = asyncio.run(_fingerprint_site_async(site_id, job_id))
+        result = run_async(
+            _fingerprint_site_async(site_id, job_id),
+            job_type="fingerprint",
+            job_id=job_id
+        )
         return result
+    except JobHandedBack:
+        # Requeued: the retry claims it again unless a queue runner did first
+        raise self.retry(countdown=5)
     except Exception as e:
         return {"success": False, "error": str(e)}
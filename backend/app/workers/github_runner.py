@@ -1,108 +1,254 @@
 """GitHub Actions worker runner - processes jobs from queue"""
 import asyncio
 import sys
-import os
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
-from uuid import UUID
+import time
+from typing import Awaitable, Callable, List, Optional
 
 from app.config import settings
-from app.models import Job
+from app.services.browser_pool import browser_pool
+from app.services.job_notifier import JobNotifier
+from app.services.job_queue import ClaimedJob, default_worker_id, job_queue
 from app.workers.fingerprinter import _fingerprint_site_async
 from app.workers.discoverer import _discover_site_async
 from app.workers.selector_generator import _generate_selectors_async
+from app.workers.reaper import reap_expired_jobs_async
+from app.workers.runtime import JobLimiter, job_lease, run_with_timeout, worker_db
 
 
-async def process_queued_jobs(job_type: str, max_jobs: int = 5):
-    """Process queued jobs of a specific type"""
-    engine = create_async_engine(settings.DATABASE_URL)
-    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-    
-    processed = 0
-    failed = 0
-    
-    async with async_session() as db:
-        # Get queued jobs
-        stmt = select(Job).where(
-            Job.job_type == job_type,
-            Job.status == "queued"
-        ).limit(max_jobs)
-        
-        result = await db.execute(stmt)
-        jobs = result.scalars().all()
-        
-        print(f"Found {len(jobs)} queued {job_type} jobs")
-        
-        for job in jobs:
-            try:
-                print(f"Processing job {job.job_id}...")
-                
-                if job_type == "fingerprint":
-                    result = await _fingerprint_site_async(
-                        str(job.site_id),
-                        str(job.job_id)
-                    )
-                elif job_type == "discover":
-                    # Feature G discovery
-                    from app.workers.discoverer import _discover_site_async
-                    result = await _discover_site_async(
-                        str(job.site_id),
-                        str(job.job_id)
-                    )
-                elif job_type == "selector_generation":
-                    # Get blueprint_id from job payload
-                    blueprint_id = job.payload.get("blueprint_id") if job.payload else None
-                    fields = job.payload.get("fields", ["title", "price"]) if job.payload else ["title", "price"]
-                    
-                    result = await _generate_selectors_async(
-                        blueprint_id,
-                        str(job.job_id),
-                        fields
-                    )
-                
-                if result.get("success"):
-                    processed += 1
-                    print(f"✅ Job {job.job_id} completed successfully")
+async def _run_claimed_job(job: ClaimedJob) -> dict:
+    """Run a claimed job, heartbeating its lease until it finishes or times out"""
+    async with job_lease(job.job_id):
+        return await run_with_timeout(_dispatch_job(job), job.job_type, job.job_id)
+
+
+async def _dispatch_job(job: ClaimedJob) -> dict:
+    """Dispatch a claimed job to its worker coroutine"""
+    if job.job_type == "fingerprint":
+        return await _fingerprint_site_async(job.site_id, job.job_id, claimed=True)
+    if job.job_type == "discover":
+        # Feature G discovery
+        return await _discover_site_async(job.site_id, job.job_id, claimed=True)
+    if job.job_type == "selector_generation":
+        payload = job.payload or {}
+        return await _generate_selectors_async(
+            payload.get("blueprint_id"),
+            job.job_id,
+            payload.get("fields", ["title", "price"]),
+            claimed=True
+        )
+    return {"success": False, "error": f"Unknown job type: {job.job_type}"}
+
+
+class QueueRunner:
+    """
+    Claim and run queued jobs until the queue is empty or time runs out.
+
+    At most `concurrency` jobs run at once. Whenever a slot frees up the
+    runner claims more (up to `batch_size` per claim), so a slow job never
+    holds back the rest of its batch. Once the time budget is spent no new
+    jobs are claimed; jobs already claimed are always run to completion.
+
+    With `wait_for_work` the runner does not stop on an empty queue: it
+    idles until that returns (a NOTIFY or the poll interval) and claims
+    again, until the time budget is spent.
+    """
+
+    def __init__(
+        self,
+        claim: Callable[[int], Awaitable[List[ClaimedJob]]],
+        run_job: Callable[[ClaimedJob], Awaitable[dict]] = _run_claimed_job,
+        concurrency: int = 4,
+        batch_size: int = 5,
+        time_budget: float = 180,
+        clock: Callable[[], float] = time.monotonic,
+        wait_for_work: Optional[Callable[[float], Awaitable[bool]]] = None
+    ):
+        self.claim = claim
+        self.run_job = run_job
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, batch_size)
+        self.time_budget = time_budget
+        self.clock = clock
+        self.wait_for_work = wait_for_work
+
+        self.claimed = 0
+        self.processed = 0
+        self.failed = 0
+        self.claims = 0
+        self.wakeups = 0
+        self.stop_reason: Optional[str] = None
+
+    async def _run_one(self, job: ClaimedJob) -> None:
+        print(f"Processing job {job.job_id}...")
+        try:
+            result = await self.run_job(job)
+        except Exception as e:
+            self.failed += 1
+            print(f"❌ Job {job.job_id} error: {str(e)}")
+            return
+
+        if result.get("success"):
+            self.processed += 1
+            print(f"✅ Job {job.job_id} completed successfully")
+        else:
+            self.failed += 1
+            print(f"❌ Job {job.job_id} failed: {result.get('error')}")
+
+    async def run(self) -> dict:
+        deadline = self.clock() + self.time_budget
+        running = set()
+        idle = False
+        waiter: Optional[asyncio.Task] = None
+
+        while True:
+            if self.stop_reason is None and self.clock() >= deadline:
+                self.stop_reason = "time_budget"
+
+            if self.stop_reason is None and not idle and len(running) < self.concurrency:
+                limit = min(self.concurrency - len(running), self.batch_size)
+                jobs = await self.claim(limit)
+                self.claims += 1
+                self.claimed += len(jobs)
+                if jobs:
+                    print(f"Claimed {len(jobs)} job(s)")
+                    running.update(asyncio.create_task(self._run_one(job)) for job in jobs)
+                elif self.wait_for_work is None:
+                    self.stop_reason = "queue_empty"
                 else:
-                    failed += 1
-                    print(f"❌ Job {job.job_id} failed: {result.get('error')}")
-                    
-            except Exception as e:
-                failed += 1
-                print(f"❌ Job {job.job_id} error: {str(e)}")
-    
-    await engine.dispose()
-    
+                    idle = True
+
+            if self.stop_reason is not None:
+                if waiter is not None:
+                    waiter.cancel()
+                    waiter = None
+                if not running:
+                    break
+                _, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                continue
+
+            if idle and waiter is None:
+                waiter = asyncio.create_task(self.wait_for_work(deadline - self.clock()))
+
+            waiting = running | {waiter} if waiter is not None else running
+            done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+            running -= done
+            if waiter in done:
+                # Notified or poll interval elapsed: look at the queue again
+                if waiter.result():
+                    self.wakeups += 1
+                waiter = None
+                idle = False
+
+        return {
+            "processed": self.processed,
+            "failed": self.failed,
+            "total": self.claimed,
+            "claims": self.claims,
+            "wakeups": self.wakeups,
+            "stopped": self.stop_reason
+        }
+
+
+async def process_queued_jobs(
+    job_type: str,
+    max_jobs: int = 5,
+    concurrency: Optional[int] = None,
+    time_budget: Optional[float] = None,
+    listen: bool = False
+):
+    """
+    Process queued jobs of a specific type.
+
+    With listen=True the runner stays up (for time_budget, forever by
+    default) and wakes on LISTEN/NOTIFY when new jobs are queued, polling
+    every JOB_POLL_INTERVAL in case a notification was missed.
+    """
+    worker_id = default_worker_id()
+    notifier = JobNotifier() if listen else None
+    last_reap = time.monotonic()
+
+    async def claim(limit: int) -> List[ClaimedJob]:
+        if notifier is not None:
+            notifier.clear(job_type)
+        async with worker_db.session() as db:
+            return await job_queue.claim(db, job_type, limit, worker_id)
+
+    async def wait_for_work(timeout: float) -> bool:
+        nonlocal last_reap
+        notified = await notifier.wait(job_type, timeout)
+        if not notified and time.monotonic() - last_reap >= settings.JOB_REAPER_INTERVAL:
+            # Long-lived runner: keep clearing expired leases while idle
+            last_reap = time.monotonic()
+            await reap_expired_jobs_async()
+        return notified
+
+    if time_budget is None:
+        time_budget = float("inf") if listen else settings.WORKER_RUNNER_TIME_BUDGET
+
+    runner = QueueRunner(
+        claim,
+        concurrency=concurrency or JobLimiter().limit_for(job_type),
+        batch_size=max_jobs,
+        time_budget=time_budget,
+        wait_for_work=wait_for_work if listen else None
+    )
+    try:
+        # Jobs left running by a dead worker go back in the queue first
+        await reap_expired_jobs_async()
+        if notifier is not None:
+            await notifier.listen()
+        summary = await runner.run()
+    finally:
+        db_stats = worker_db.stats()
+        if notifier is not None:
+            await notifier.close()
+        await worker_db.dispose()
+        await browser_pool.close()
+
     print(f"\n📊 Summary:")
-    print(f"  Processed: {processed}")
-    print(f"  Failed: {failed}")
-    print(f"  Total: {len(jobs)}")
-    
-    return {"processed": processed, "failed": failed, "total": len(jobs)}
+    print(f"  Processed: {summary['processed']}")
+    print(f"  Failed: {summary['failed']}")
+    print(f"  Total: {summary['total']} ({summary['claims']} claims, stopped: {summary['stopped']})")
+    if notifier is not None:
+        stats = notifier.stats()
+        print(f"  Dispatch: {stats['wakeups']} NOTIFY wake-ups, {stats['polls']} polls")
+    print(f"  DB checkout wait: avg {db_stats['avg_wait_ms']}ms, max {db_stats['max_wait_ms']}ms")
+
+    return summary
 
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: python -m app.workers.github_runner <job_type> [--max-jobs=N]")
-        print("Job types: fingerprint, discovery, selector_generation")
+        print("Usage: python -m app.workers.github_runner <job_type> [--max-jobs=N] [--concurrency=N] [--time-budget=SECONDS] [--listen]")
+        print("Job types: fingerprint, discover, selector_generation")
         sys.exit(1)
-    
+
     job_type = sys.argv[1]
     max_jobs = 5
-    
-    # Parse max-jobs argument
+    concurrency = None
+    time_budget = None
+    listen = False
+
     for arg in sys.argv[2:]:
         if arg.startswith("--max-jobs="):
             max_jobs = int(arg.split("=")[1])
-    
+        elif arg.startswith("--concurrency="):
+            concurrency = int(arg.split("=")[1])
+        elif arg.startswith("--time-budget="):
+            time_budget = float(arg.split("=")[1])
+        elif arg == "--listen":
+            listen = True
+        elif arg.isdigit():
+            max_jobs = int(arg)
+
     print(f"🚀 Starting GitHub Actions worker for: {job_type}")
-    print(f"   Max jobs per run: {max_jobs}")
+    print(f"   Jobs per claim: {max_jobs}")
+    if listen:
+        print("   Waiting for new jobs via LISTEN/NOTIFY")
     print()
-    
-    result = asyncio.run(process_queued_jobs(job_type, max_jobs))
-    
+
+    result = asyncio.run(process_queued_jobs(job_type, max_jobs, concurrency, time_budget, listen))
+
     # Exit with error code if all jobs failed
     if result["total"] > 0 and result["failed"] == result["total"]:
         sys.exit(1)
-
@@ -0,0 +1,71 @@
+"""Progress reporting from workers: events on the progress bus plus Job.progress"""
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import or_, update
+
+from app.models import Job
+from app.services.progress_bus import ProgressBus, progress_bus
+from app.workers.runtime import worker_db
+
+
+async def save_progress(job_id: str, progress: int) -> None:
+    """Persist Job.progress in its own short transaction"""
+    async with worker_db.session() as db:
+        await db.execute(
+            update(Job)
+            .where(Job.job_id == UUID(job_id), or_(Job.progress.is_(None), Job.progress < progress))
+            .values(progress=progress)
+        )
+        await db.commit()
+
+
+class ProgressReporter:
+    """
+    Report a job's phase and percentage as it runs.
+
+    Every call publishes an event for the job's and site's SSE streams;
+    increases in percentage are also written to Job.progress so polling
+    clients see it. Reporting never fails the job.
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        job_type: str,
+        site_id: Optional[str] = None,
+        bus: ProgressBus = progress_bus,
+        persist: bool = True
+    ):
+        self.job_id = job_id
+        self.job_type = job_type
+        self.site_id = site_id
+        self.bus = bus
+        self.persist = persist
+        self.progress = 0
+
+    async def __call__(
+        self,
+        phase: str,
+        progress: Optional[int] = None,
+        status: str = "running",
+        message: Optional[str] = None
+    ) -> None:
+        advanced = progress is not None and progress > self.progress
+        if advanced:
+            self.progress = progress
+        try:
+            await self.bus.publish({
+                "job_id": self.job_id,
+                "site_id": self.site_id,
+                "job_type": self.job_type,
+                "phase": phase,
+                "progress": self.progress,
+                "status": status,
+                "message": message
+            })
+            # Terminal updates are committed with the job's final status
+            if advanced and self.persist and status == "running":
+                await save_progress(self.job_id, self.progress)
+        except Exception as e:
+            print(f"⚠️  Progress report failed for job {self.job_id}: {e}")
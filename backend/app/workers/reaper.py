@@ -0,0 +1,50 @@
+"""Reaper worker - requeues or fails jobs whose worker lease expired"""
+from app.celery_app import celery_app
+from app.services.job_queue import ClaimedJob, job_queue
+from app.workers.runtime import run_async, worker_db
+
+
+async def reap_expired_jobs_async() -> dict:
+    """Reap expired leases in one transaction"""
+    async with worker_db.session() as db:
+        requeued, failed = await job_queue.reap(db)
+        await db.commit()
+
+    if requeued or failed:
+        print(f"🧹 Reaped expired jobs: {len(requeued)} requeued, {len(failed)} failed")
+    return {"requeued": requeued, "failed": failed}
+
+
+def _dispatch(job: ClaimedJob) -> None:
+    """Send a requeued job back to its Celery task (a no-op if a runner claims it first)"""
+    if job.job_type == "fingerprint":
+        from app.workers.fingerprinter import fingerprint_site
+        fingerprint_site.delay(job.site_id, job.job_id)
+    elif job.job_type == "discover":
+        from app.workers.discoverer import discover_site
+        discover_site.delay(job.site_id, job.job_id)
+    elif job.job_type == "selector_generation":
+        from app.workers.selector_generator import generate_selectors
+        payload = job.payload or {}
+        generate_selectors.delay(payload.get("blueprint_id"), job.job_id, payload.get("fields"))
+
+
+@celery_app.task(name="workers.reap_expired_jobs")
+def reap_expired_jobs():
+    """Celery beat task: clear jobs stuck in running after a worker died"""
+    result = run_async(reap_expired_jobs_async(), job_type="reaper")
+
+    dispatched = 0
+    for job in result["requeued"]:
+        try:
+            _dispatch(job)
+            dispatched += 1
+        except Exception as e:
+            # Still queued: github_runner will claim it
+            print(f"⚠️  Could not dispatch requeued job {job.job_id}: {e}")
+
+    return {
+        "requeued": len(result["requeued"]),
+        "dispatched": dispatched,
+        "failed": len(result["failed"])
+    }
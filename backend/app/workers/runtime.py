@@ -0,0 +1,485 @@
+"""Process-lifetime event loop, job concurrency limits and database pool for workers"""
+import asyncio
+import concurrent.futures
+import json
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, TypeVar
+
+from celery.signals import (
+    worker_process_init, worker_process_shutdown, worker_shutdown, worker_shutting_down
+)
+from prometheus_client import Histogram
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.database import connect_args, database_url
+from app.models import Job
+from app.services.job_queue import job_queue
+from app.services import response_cache  # noqa: F401  worker commits invalidate cached responses
+
+T = TypeVar("T")
+
+DB_CHECKOUT_WAIT = Histogram(
+    "worker_db_checkout_wait_seconds",
+    "Time worker tasks wait to check a connection out of the pool",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+
+
+class WorkerDatabase:
+    """
+    One async engine and session factory per worker process.
+
+    Created lazily on the worker's event loop and reused by every task, so
+    jobs no longer pay for a fresh pool (TCP, TLS and auth) each time.
+    Checkout waits are recorded per session for pool sizing.
+    """
+
+    def __init__(self):
+        self.engine: Optional[AsyncEngine] = None
+        self.session_maker: Optional[sessionmaker] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._recent_waits = deque(maxlen=1000)
+
+    def _ensure(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self.engine is not None and self._loop is loop:
+            return
+        if self.engine is not None:
+            # asyncpg connections belong to the loop that opened them
+            print("⚠️  Worker event loop changed, recreating database pool")
+
+        self.engine = create_async_engine(
+            database_url,
+            echo=settings.DEBUG,
+            pool_size=worker_pool_size(),
+            max_overflow=settings.WORKER_DB_MAX_OVERFLOW,
+            pool_timeout=settings.WORKER_DB_POOL_TIMEOUT,
+            pool_recycle=settings.WORKER_DB_POOL_RECYCLE,
+            pool_pre_ping=True,
+            connect_args=connect_args,
+        )
+        self.session_maker = sessionmaker(
+            self.engine, class_=AsyncSession, expire_on_commit=False
+        )
+        self._loop = loop
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncSession]:
+        """Session with its connection checked out up front (and timed)"""
+        self._ensure()
+        async with self.session_maker() as db:
+            started = time.perf_counter()
+            await db.connection()
+            self._record_wait(time.perf_counter() - started)
+            yield db
+
+    def _record_wait(self, wait: float) -> None:
+        self.checkouts += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self._recent_waits.append(wait)
+        DB_CHECKOUT_WAIT.observe(wait)
+
+    def stats(self) -> dict:
+        recent = sorted(self._recent_waits)
+        p95 = recent[int(len(recent) * 0.95) - 1] if recent else 0.0
+        pool = self.engine.pool if self.engine is not None else None
+        return {
+            "checkouts": self.checkouts,
+            "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 2) if self.checkouts else 0.0,
+            "p95_wait_ms": round(p95 * 1000, 2),
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+            "pool_size": pool.size() if pool is not None else 0,
+            "checked_out": pool.checkedout() if pool is not None else 0
+        }
+
+    def reset(self) -> None:
+        """Forget the pool without closing it (e.g. inherited across fork)"""
+        self.engine = None
+        self.session_maker = None
+        self._loop = None
+
+    async def dispose(self) -> None:
+        if self.engine is not None and self._loop is asyncio.get_running_loop():
+            await self.engine.dispose()
+        self.reset()
+
+
+def worker_pool_size() -> int:
+    """WORKER_DB_POOL_SIZE, or one connection per concurrent job plus heartbeat headroom"""
+    if settings.WORKER_DB_POOL_SIZE > 0:
+        return settings.WORKER_DB_POOL_SIZE
+    # Every in-flight job holds its session for the whole run, so lease
+    # renewals and progress writes need connections beyond those
+    return settings.WORKER_MAX_CONCURRENT_JOBS + max(2, settings.WORKER_MAX_CONCURRENT_JOBS // 4)
+
+
+# Global instance (one per worker process)
+worker_db = WorkerDatabase()
+
+
+class JobHandedBack(Exception):
+    """A job was cancelled by worker shutdown and put back in the queue"""
+
+    def __init__(self, job_id: Optional[str]):
+        super().__init__(f"Job {job_id} handed back on worker shutdown")
+        self.job_id = job_id
+
+
+class JobTimedOut(Exception):
+    """A job ran past its time limit and was cancelled"""
+
+    def __init__(self, job_id: Optional[str], limit: float):
+        super().__init__(f"Job {job_id} exceeded its {limit:g}s time limit")
+        self.job_id = job_id
+        self.limit = limit
+
+
+def _per_job_type(name: str, raw: str) -> Dict[str, float]:
+    try:
+        values = json.loads(raw or "{}")
+    except ValueError as e:
+        print(f"⚠️  {name} is not valid JSON: {e}")
+        return {}
+    return {job_type: float(value) for job_type, value in values.items() if float(value) > 0}
+
+
+def load_job_limits() -> Dict[str, int]:
+    """Per-job-type concurrency limits from WORKER_JOB_CONCURRENCY (JSON)"""
+    limits = _per_job_type("WORKER_JOB_CONCURRENCY", settings.WORKER_JOB_CONCURRENCY)
+    return {job_type: int(limit) for job_type, limit in limits.items()}
+
+
+def job_timeout(job_type: str) -> float:
+    """Seconds a job of this type may run (WORKER_JOB_TIMEOUTS, else WORKER_JOB_TIMEOUT)"""
+    timeouts = _per_job_type("WORKER_JOB_TIMEOUTS", settings.WORKER_JOB_TIMEOUTS)
+    return timeouts.get(job_type, settings.WORKER_JOB_TIMEOUT)
+
+
+class JobLimiter:
+    """Per-job-type concurrency slots on one event loop"""
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None, default_limit: Optional[int] = None):
+        self.limits = load_job_limits() if limits is None else limits
+        self.default_limit = default_limit or settings.WORKER_MAX_CONCURRENT_JOBS
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.active: Dict[str, int] = {}
+
+    def limit_for(self, job_type: str) -> int:
+        return self.limits.get(job_type, self.default_limit)
+
+    @asynccontextmanager
+    async def slot(self, job_type: str) -> AsyncIterator[None]:
+        semaphore = self._semaphores.get(job_type)
+        if semaphore is None:
+            semaphore = self._semaphores[job_type] = asyncio.Semaphore(self.limit_for(job_type))
+        async with semaphore:
+            self.active[job_type] = self.active.get(job_type, 0) + 1
+            try:
+                yield
+            finally:
+                self.active[job_type] -= 1
+
+
+async def requeue_job(job_id: str) -> None:
+    """Put this worker's running job back to queued; the task retry claims it again"""
+    async with worker_db.session() as db:
+        await db.execute(
+            update(Job)
+            .where(*job_queue.held_by(job_id))
+            # A hand-back is not the job's fault: don't count the attempt
+            .values(
+                status="queued",
+                started_at=None,
+                lease_expires_at=None,
+                attempt_count=Job.attempt_count - 1
+            )
+        )
+        await db.commit()
+
+
+async def fail_timed_out_job(job_id: str, limit: float) -> None:
+    """Fail a running job that overran its time limit (no retry: it would hang again)"""
+    async with worker_db.session() as db:
+        await db.execute(
+            update(Job)
+            .where(*job_queue.held_by(job_id))
+            .values(
+                status="failed",
+                completed_at=datetime.utcnow(),
+                lease_expires_at=None,
+                error_message=f"Job exceeded its {limit:g}s time limit"
+            )
+        )
+        await db.commit()
+
+
+async def run_with_timeout(
+    coro: Awaitable[T],
+    job_type: str,
+    job_id: Optional[str],
+    on_timeout: Callable[[str, float], Awaitable[None]] = fail_timed_out_job,
+    limit: Optional[float] = None
+) -> T:
+    """
+    Await a job coroutine under its job type's time limit.
+
+    A hung job would otherwise keep heartbeating forever, so its lease
+    never expires and the reaper never reclaims it. On timeout the job is
+    cancelled, failed in the database and JobTimedOut is raised.
+    """
+    limit = job_timeout(job_type) if limit is None else limit
+    try:
+        return await asyncio.wait_for(coro, limit)
+    except asyncio.TimeoutError:
+        print(f"⏰ Job {job_id} ({job_type}) exceeded its {limit:g}s time limit")
+        if job_id:
+            await on_timeout(job_id, limit)
+        raise JobTimedOut(job_id, limit)
+
+
+async def renew_lease(job_id: str) -> bool:
+    """Heartbeat a running job; False once it is no longer running"""
+    async with worker_db.session() as db:
+        alive = await job_queue.heartbeat(db, job_id)
+        await db.commit()
+    return alive
+
+
+@asynccontextmanager
+async def job_lease(
+    job_id: Optional[str],
+    renew: Callable[[str], Awaitable[bool]] = renew_lease,
+    interval: Optional[float] = None
+) -> AsyncIterator[None]:
+    """Keep renewing the job's lease in the background while it runs"""
+    if not job_id:
+        yield
+        return
+
+    interval = settings.JOB_HEARTBEAT_INTERVAL if interval is None else interval
+
+    async def beat() -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not await renew(job_id):
+                    print(f"⚠️  Job {job_id} is no longer running, stopping heartbeat")
+                    return
+            except Exception as e:
+                # Keep beating: the lease outlasts a few missed heartbeats
+                print(f"⚠️  Heartbeat failed for job {job_id}: {e}")
+
+    heartbeat = asyncio.create_task(beat())
+    try:
+        yield
+    finally:
+        heartbeat.cancel()
+        await asyncio.gather(heartbeat, return_exceptions=True)
+
+
+class AsyncWorkerRuntime:
+    """
+    One long-lived event loop per worker process, running many jobs at once.
+
+    The loop runs in a background thread. Celery task threads (--pool=threads)
+    submit their job coroutine and block until it finishes, so a process
+    runs up to WORKER_MAX_CONCURRENT_JOBS jobs concurrently, with
+    WORKER_JOB_CONCURRENCY capping each job type. Connection pools and the
+    browser pool live on this loop for the life of the process.
+
+    On shutdown, new submissions are refused, in-flight jobs get
+    WORKER_SHUTDOWN_GRACE seconds to finish, and the rest are cancelled and
+    handed back (re-queued) rather than lost. While a job runs, its lease is
+    renewed every JOB_HEARTBEAT_INTERVAL so the reaper leaves it alone, up
+    to its WORKER_JOB_TIMEOUT(S) limit: Celery's time limits do not apply
+    to the thread pool, so the runtime enforces them itself.
+
+    Heartbeats only fire while the loop is free, so jobs must not run
+    blocking work on it: HTML parsing, signature scans, selector evaluation
+    and snapshot reads/writes go through asyncio.to_thread.
+    """
+
+    def __init__(
+        self,
+        limiter: Optional[JobLimiter] = None,
+        shutdown_grace: Optional[float] = None,
+        on_handback: Callable[[str], Awaitable[None]] = requeue_job,
+        on_heartbeat: Callable[[str], Awaitable[bool]] = renew_lease,
+        on_timeout: Callable[[str, float], Awaitable[None]] = fail_timed_out_job
+    ):
+        self._limiter = limiter
+        self.shutdown_grace = settings.WORKER_SHUTDOWN_GRACE if shutdown_grace is None else shutdown_grace
+        self.on_handback = on_handback
+        self.on_heartbeat = on_heartbeat
+        self.on_timeout = on_timeout
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._inflight: Dict[asyncio.Task, Optional[str]] = {}
+        self._draining = False
+
+    @property
+    def limiter(self) -> JobLimiter:
+        if self._limiter is None:
+            self._limiter = JobLimiter()
+        return self._limiter
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self.running:
+                return
+            self._draining = False
+            self.loop = asyncio.new_event_loop()
+            started = threading.Event()
+
+            def run_loop() -> None:
+                asyncio.set_event_loop(self.loop)
+                self.loop.call_soon(started.set)
+                self.loop.run_forever()
+
+            self._thread = threading.Thread(target=run_loop, name="worker-event-loop", daemon=True)
+            self._thread.start()
+            started.wait()
+
+    def submit(
+        self,
+        coro: Awaitable[T],
+        job_type: str = "default",
+        job_id: Optional[str] = None
+    ) -> "concurrent.futures.Future[T]":
+        """Schedule a job coroutine on the loop; safe from any thread"""
+        if self._draining:
+            coro.close()
+            raise JobHandedBack(job_id)
+        self.start()
+        return asyncio.run_coroutine_threadsafe(
+            self._run_job(coro, job_type, job_id), self.loop
+        )
+
+    def run(self, coro: Awaitable[T], job_type: str = "default", job_id: Optional[str] = None) -> T:
+        """Submit a job and block the calling thread until it finishes"""
+        return self.submit(coro, job_type, job_id).result()
+
+    async def _run_job(self, coro: Awaitable[T], job_type: str, job_id: Optional[str]) -> T:
+        task = asyncio.current_task()
+        self._inflight[task] = job_id
+        try:
+            async with self.limiter.slot(job_type):
+                if self._draining:
+                    # Got a slot only after shutdown began: don't start it
+                    raise asyncio.CancelledError()
+                async with job_lease(job_id, self.on_heartbeat):
+                    return await run_with_timeout(coro, job_type, job_id, self.on_timeout)
+        except asyncio.CancelledError:
+            if not self._draining:
+                raise
+            if job_id:
+                await self.on_handback(job_id)
+            raise JobHandedBack(job_id)
+        finally:
+            del self._inflight[task]
+            if asyncio.iscoroutine(coro):
+                coro.close()
+
+    async def _drain(self, grace: float) -> None:
+        tasks = list(self._inflight)
+        if tasks:
+            print(f"⏳ Waiting up to {grace}s for {len(tasks)} in-flight job(s)")
+            _, pending = await asyncio.wait(tasks, timeout=grace)
+            for task in pending:
+                task.cancel()
+            if pending:
+                print(f"↩️  Handing back {len(pending)} unfinished job(s)")
+                await asyncio.gather(*pending, return_exceptions=True)
+        await _close_resources()
+
+    def shutdown(self, grace: Optional[float] = None) -> None:
+        """Finish or hand back in-flight jobs, then stop the loop"""
+        with self._start_lock:
+            if not self.running:
+                return
+            self._draining = True
+            grace = self.shutdown_grace if grace is None else grace
+            asyncio.run_coroutine_threadsafe(self._drain(grace), self.loop).result()
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join()
+            self.loop.close()
+            self._thread = None
+            self.loop = None
+
+    def reset(self) -> None:
+        """Forget the loop thread inherited across fork (threads don't survive it)"""
+        self.loop = None
+        self._thread = None
+        self._inflight = {}
+        self._draining = False
+        self._limiter = None
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._inflight),
+            "active_by_type": dict(self.limiter.active),
+            "draining": self._draining
+        }
+
+
+async def _close_resources() -> None:
+    from app.services.browser_pool import browser_pool
+
+    stats = worker_db.stats()
+    print(
+        f"📊 Worker DB pool: {stats['checkouts']} checkouts, "
+        f"avg wait {stats['avg_wait_ms']}ms, p95 {stats['p95_wait_ms']}ms, "
+        f"max {stats['max_wait_ms']}ms"
+    )
+    await worker_db.dispose()
+    await browser_pool.close()
+
+
+# Global instance (one per worker process)
+runtime = AsyncWorkerRuntime()
+
+
+def run_async(coro: Awaitable[T], job_type: str = "default", job_id: Optional[str] = None) -> T:
+    """Run a task coroutine on the process event loop (replaces asyncio.run)"""
+    return runtime.run(coro, job_type, job_id)
+
+
+def shutdown() -> None:
+    """Release process-lifetime resources and stop the loop"""
+    runtime.shutdown()
+
+
+@worker_process_init.connect
+def _on_worker_process_init(**kwargs) -> None:
+    # A forked child must not reuse the parent's loop thread or pool
+    runtime.reset()
+    worker_db.reset()
+
+
+@worker_shutting_down.connect
+def _on_worker_shutting_down(**kwargs) -> None:
+    shutdown()
+
+
+@worker_shutdown.connect
+@worker_process_shutdown.connect
+def _on_worker_shutdown(**kwargs) -> None:
+    shutdown()
@@ -1,24 +1,22 @@
 """Selector generator worker - generates extraction selectors using LLM"""
-import asyncio
 from uuid import UUID, uuid4
 from datetime import datetime
-import httpx
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
 
 from app.celery_app import celery_app
-from app.config import settings
 from app.models import Blueprint, Selector, Job
-from app.services.llm_service import llm_service
+from app.services.fetch_session import FetchSession
+from app.services.llm_service import LLMUsage, llm_service
+from app.services.snapshot_store import snapshot_store
+from app.services.analytics_service import analytics_service
+from app.services.job_queue import job_queue
+from app.workers.progress import ProgressReporter
+from app.workers.runtime import JobHandedBack, run_async, worker_db
 
 
-async def _generate_selectors_async(blueprint_id: str, job_id: str, fields: list):
+async def _generate_selectors_async(blueprint_id: str, job_id: str, fields: list, claimed: bool = False):
     """Async selector generation logic"""
-    engine = create_async_engine(settings.DATABASE_URL)
-    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-    
-    async with async_session() as db:
+    async with worker_db.session() as db:
         # Get blueprint
         blueprint_stmt = select(Blueprint).where(Blueprint.blueprint_id == UUID(blueprint_id))
         result = await db.execute(blueprint_stmt)
@@ -27,6 +25,11 @@ async def _generate_selectors_async(blueprint_id: str, job_id: str, fields: list
         if not blueprint:
             return {"error": "Blueprint not found"}
         
+        # Claim it unless a queue runner already did; whoever else holds it runs it
+        if not claimed and not await job_queue.claim_job(db, job_id):
+            print(f"⏭️  Job {job_id} is no longer queued, skipping")
+            return {"skipped": True, "reason": "Job is no longer queued"}
+        
         # Get job
         job_stmt = select(Job).where(Job.job_id == UUID(job_id))
         result = await db.execute(job_stmt)
@@ -35,43 +38,50 @@ async def _generate_selectors_async(blueprint_id: str, job_id: str, fields: list
         if not job:
             return {"error": "Job not found"}
         
-        # Update job
-        job.status = "running"
-        job.started_at = datetime.utcnow()
-        await db.commit()
+        report = ProgressReporter(job_id, "selector_generation", str(blueprint.site_id))
+        await report("started", 0)
+        llm_usage = LLMUsage()
         
         try:
-            # Fetch site HTML (in real app, cache this)
+            # Fetch site HTML
             from app.models import Site
             site_stmt = select(Site).where(Site.site_id == blueprint.site_id)
             result = await db.execute(site_stmt)
             site = result.scalar_one_or_none()
             
             url = f"https://{site.domain}"
-            async with httpx.AsyncClient(timeout=15.0, follow_redirects=True) as client:
-                response = await client.get(url, headers={"User-Agent": "Mozilla/5.0"})
+            # Usually already snapshotted by the fingerprint/discovery stages
+            async with FetchSession(
+                headers={"User-Agent": "Mozilla/5.0"},
+                timeout=15.0,
+                snapshots=snapshot_store
+            ) as session:
+                response = await session.get(url)
                 html = response.text[:5000]  # Use first 5K chars for selector gen
             
             # Generate selectors for each field
             selectors_created = []
-            for field_name in fields:
-                selector_result = await llm_service.generate_selectors(html, field_name)
-                
-                if selector_result.get("success"):
-                    # Parse LLM response and create selector
-                    selector = Selector(
-                        selector_id=uuid4(),
-                        blueprint_id=UUID(blueprint_id),
-                        field_name=field_name,
-                        css_selector=f".{field_name}",  # Simplified; parse from LLM in production
-                        confidence=0.8,
-                        generation_method="llm",
-                        test_count=0,
-                        test_failures=0,
-                        notes=f"Generated by LLM for field: {field_name}"
-                    )
-                    db.add(selector)
-                    selectors_created.append(field_name)
+            await report("fetched", 10)
+            with llm_service.track_usage(llm_usage):
+                for index, field_name in enumerate(fields, 1):
+                    selector_result = await llm_service.generate_selectors(html, field_name)
+                    
+                    if selector_result.get("success"):
+                        # Parse LLM response and create selector
+                        selector = Selector(
+                            selector_id=uuid4(),
+                            blueprint_id=UUID(blueprint_id),
+                            field_name=field_name,
+                            css_selector=f".{field_name}",  # Simplified; parse from LLM in production
+                            confidence=0.8,
+                            generation_method="llm",
+                            test_count=0,
+                            test_failures=0,
+                            notes=f"Generated by LLM for field: {field_name}"
+                        )
+                        db.add(selector)
+                        selectors_created.append(field_name)
+                    await report(f"field:{field_name}", 10 + 85 * index // len(fields))
             
             # Update blueprint with selectors
             blueprint.selectors_data = {
@@ -82,14 +92,21 @@ async def _generate_selectors_async(blueprint_id: str, job_id: str, fields: list
             
             # Update job
             job.status = "success"
-            job.ended_at = datetime.utcnow()
+            job.progress = 100
+            job.completed_at = datetime.utcnow()
+            job.cost_usd = llm_usage.cost_usd
+            job_queue.record_method(job, "llm")
             job.result = {
                 "blueprint_id": blueprint_id,
                 "selectors_generated": len(selectors_created),
-                "fields": selectors_created
+                "fields_requested": len(fields),
+                "fields": selectors_created,
+                "llm_calls": llm_usage.calls
             }
             
+            await analytics_service.record(db, job)
             await db.commit()
+            await report("saved", 100, status="success")
             
             return {
                 "success": True,
@@ -100,14 +117,14 @@ async def _generate_selectors_async(blueprint_id: str, job_id: str, fields: list
             
         except Exception as e:
             job.status = "failed"
-            job.ended_at = datetime.utcnow()
+            job.completed_at = datetime.utcnow()
             job.error_message = str(e)
+            job.cost_usd = llm_usage.cost_usd
+            await analytics_service.record(db, job)
             await db.commit()
+            await report("failed", status="failed", message=str(e))
             
             return {"success": False, "error": str(e)}
-        
-        finally:
-            await engine.dispose()
 
 
 @celery_app.task(name="workers.generate_selectors", bind=True)
@@ -117,8 +134,15 @@ def generate_selectors(self, blueprint_id: str, job_id: str, fields: list = None
         fields = ["title", "price", "description", "image"]
     
     try:
-        result = asyncio.run(_generate_selectors_async(blueprint_id, job_id, fields))
+        result = run_async(
+            _generate_selectors_async(blueprint_id, job_id, fields),
+            job_type="selector_generation",
+            job_id=job_id
+        )
         return result
+    except JobHandedBack:
+        # Requeued: the retry claims it again unless a queue runner did first
+        raise self.retry(countdown=5)
     except Exception as e:
         return {"success": False, "error": str(e)}
 
@@ -0,0 +1,31 @@
+"""page validators for conditional re-fetching
+
+Revision ID: 0002_page_validators
+Revises: 0001_initial
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0002_page_validators'
+down_revision = '0001_initial'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('page_validators',
+        sa.Column('url', sa.Text(), primary_key=True),
+        sa.Column('host', sa.String(length=255), nullable=False, index=True),
+        sa.Column('etag', sa.String(length=500)),
+        sa.Column('last_modified', sa.String(length=100)),
+        sa.Column('content_hash', sa.String(length=64)),
+        sa.Column('content_type', sa.String(length=255)),
+        sa.Column('body', sa.LargeBinary()),
+        sa.Column('fetched_at', sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('page_validators')
@@ -0,0 +1,29 @@
+"""job claim order index
+
+Revision ID: 0003_job_claim_index
+Revises: 0002_page_validators
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0003_job_claim_index'
+down_revision = '0002_page_validators'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Runners claim queued jobs in (priority DESC, created_at ASC) order
+    op.execute("UPDATE jobs SET priority = 0 WHERE priority IS NULL")
+    op.alter_column('jobs', 'priority', server_default='0', nullable=False)
+    # DATABASE.sql already creates this index
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_jobs_priority ON jobs (priority DESC, created_at ASC)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_jobs_priority")
+    op.alter_column('jobs', 'priority', server_default=None, nullable=True)
@@ -0,0 +1,35 @@
+"""job leases for the stuck-job reaper
+
+Revision ID: 0004_job_leases
+Revises: 0003_job_claim_index
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0004_job_leases'
+down_revision = '0003_job_claim_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('lease_expires_at', sa.DateTime()))
+    op.execute("UPDATE jobs SET attempt_count = 0 WHERE attempt_count IS NULL")
+    op.execute("UPDATE jobs SET max_retries = 3 WHERE max_retries IS NULL")
+    op.alter_column('jobs', 'attempt_count', server_default='0', nullable=False)
+    op.alter_column('jobs', 'max_retries', server_default='3', nullable=False)
+    # Jobs already stuck in running have no lease: let the reaper see them
+    op.execute("UPDATE jobs SET lease_expires_at = NOW() WHERE status = 'running'")
+    op.create_index(
+        'idx_jobs_lease_expires', 'jobs', ['lease_expires_at'],
+        postgresql_where=sa.text("status = 'running'")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_jobs_lease_expires', table_name='jobs')
+    op.alter_column('jobs', 'max_retries', server_default=None, nullable=True)
+    op.alter_column('jobs', 'attempt_count', server_default=None, nullable=True)
+    op.drop_column('jobs', 'lease_expires_at')
@@ -0,0 +1,36 @@
+"""notify idle runners when a job is queued
+
+Revision ID: 0005_job_notify
+Revises: 0004_job_leases
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0005_job_notify'
+down_revision = '0004_job_leases'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Payload is the job type so runners only wake for work they can claim
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_job_queued() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('jobs_queued', NEW.job_type);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER jobs_notify_queued
+        AFTER INSERT OR UPDATE OF status ON jobs
+        FOR EACH ROW WHEN (NEW.status = 'queued')
+        EXECUTE FUNCTION notify_job_queued()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS jobs_notify_queued ON jobs")
+    op.execute("DROP FUNCTION IF EXISTS notify_job_queued()")
@@ -0,0 +1,23 @@
+"""record which discovery phases a blueprint covers
+
+Revision ID: 0006_blueprint_phases
+Revises: 0005_job_notify
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0006_blueprint_phases'
+down_revision = '0005_job_notify'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # NULL for blueprints saved before phases were tracked (all complete)
+    op.add_column('blueprints', sa.Column('phases_data', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('blueprints', 'phases_data')
@@ -0,0 +1,43 @@
+"""one active job per site and job type
+
+Revision ID: 0007_job_coalescing
+Revises: 0006_blueprint_phases
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0007_job_coalescing'
+down_revision = '0006_blueprint_phases'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing duplicates would block the index: keep the running (else the
+    # oldest) active job per site and type and cancel the rest
+    op.execute("""
+        UPDATE jobs SET status = 'cancelled',
+                        error_message = 'Cancelled as a duplicate of an active job'
+        WHERE job_id IN (
+            SELECT job_id FROM (
+                SELECT job_id, ROW_NUMBER() OVER (
+                    PARTITION BY site_id, job_type
+                    ORDER BY (status = 'running') DESC, created_at ASC
+                ) AS position
+                FROM jobs
+                WHERE status IN ('queued', 'running') AND site_id IS NOT NULL
+            ) ranked
+            WHERE position > 1
+        )
+    """)
+    op.create_index(
+        'uq_jobs_active_site_type', 'jobs', ['site_id', 'job_type'],
+        unique=True,
+        postgresql_where=sa.text("status IN ('queued', 'running')")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_jobs_active_site_type', table_name='jobs')
@@ -0,0 +1,33 @@
+"""job completion, progress and update timestamps the Job model uses
+
+Revision ID: 0007a_job_model_columns
+Revises: 0007_job_coalescing
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0007a_job_model_columns'
+down_revision = '0007_job_coalescing'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('progress', sa.Integer(), server_default='0'))
+    op.add_column('jobs', sa.Column('completed_at', sa.DateTime()))
+    op.add_column('jobs', sa.Column('updated_at', sa.DateTime()))
+    # The initial schema recorded finishes in ended_at
+    op.execute("UPDATE jobs SET completed_at = ended_at WHERE completed_at IS NULL")
+    op.execute("""
+        UPDATE jobs SET updated_at = COALESCE(completed_at, started_at, created_at, NOW())
+        WHERE updated_at IS NULL
+    """)
+    op.alter_column('jobs', 'updated_at', server_default=sa.text('NOW()'), nullable=False)
+
+
+def downgrade() -> None:
+    op.drop_column('jobs', 'updated_at')
+    op.drop_column('jobs', 'completed_at')
+    op.drop_column('jobs', 'progress')
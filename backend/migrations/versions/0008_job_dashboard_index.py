@@ -0,0 +1,25 @@
+"""covering index for dashboard aggregates over recent jobs
+
+Revision ID: 0008_job_dashboard_index
+Revises: 0007a_job_model_columns
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0008_job_dashboard_index'
+down_revision = '0007a_job_model_columns'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # INCLUDE lets the window aggregates run as index-only scans
+    op.create_index(
+        'idx_jobs_created_status', 'jobs', ['created_at'],
+        postgresql_include=['status', 'started_at', 'completed_at']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_jobs_created_status', table_name='jobs')
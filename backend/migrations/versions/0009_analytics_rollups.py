@@ -0,0 +1,98 @@
+"""daily analytics rollups per site, method and job type
+
+Revision ID: 0009_analytics_rollups
+Revises: 0008_job_dashboard_index
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0009_analytics_rollups'
+down_revision = '0008_job_dashboard_index'
+branch_labels = None
+depends_on = None
+
+COUNTERS = (
+    ('job_count', sa.Integer(), '0'),
+    ('success_count', sa.Integer(), '0'),
+    ('failure_count', sa.Integer(), '0'),
+    ('duration_sum_seconds', sa.Float(), '0'),
+    ('duration_count', sa.Integer(), '0'),
+    ('selectors_tested', sa.Integer(), '0'),
+    ('selectors_failed', sa.Integer(), '0'),
+)
+
+
+def upgrade() -> None:
+    op.execute("UPDATE analytics_metrics SET date = COALESCE(date, created_at, NOW()) WHERE date IS NULL")
+    op.alter_column(
+        'analytics_metrics', 'date',
+        type_=sa.Date(), postgresql_using='date::date', nullable=False
+    )
+    op.add_column('analytics_metrics', sa.Column('job_type', sa.String(length=100)))
+    for name, type_, default in COUNTERS:
+        op.add_column(
+            'analytics_metrics',
+            sa.Column(name, type_, server_default=default, nullable=False)
+        )
+    op.add_column('analytics_metrics', sa.Column('updated_at', sa.DateTime()))
+
+    op.create_index(
+        'uq_metrics_rollup', 'analytics_metrics',
+        ['date', 'site_id', 'method', 'job_type'], unique=True
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS idx_metrics_site_date ON analytics_metrics (site_id, date DESC)")
+
+    # Roll up the existing job history so dashboards start complete
+    op.execute("""
+        INSERT INTO analytics_metrics (
+            metric_id, site_id, date, method, job_type,
+            job_count, success_count, failure_count, duration_sum_seconds, duration_count,
+            num_categories_found, num_endpoints_found, items_extracted,
+            selectors_tested, selectors_failed, selector_failure_rate, fetch_cost_usd,
+            created_at, updated_at
+        )
+        SELECT gen_random_uuid(), site_id, day, method, job_type,
+               jobs, successes, failures, duration_sum, duration_count,
+               categories, endpoints, items,
+               tested, failed_selectors,
+               failed_selectors::float / NULLIF(tested, 0), cost,
+               NOW(), NOW()
+        FROM (
+            SELECT site_id,
+                   COALESCE(completed_at, updated_at)::date AS day,
+                   COALESCE(method, 'auto') AS method,
+                   job_type,
+                   COUNT(*) AS jobs,
+                   COUNT(*) FILTER (WHERE status = 'success') AS successes,
+                   COUNT(*) FILTER (WHERE status = 'failed') AS failures,
+                   COALESCE(SUM(EXTRACT(EPOCH FROM completed_at - started_at))
+                       FILTER (WHERE status = 'success'), 0) AS duration_sum,
+                   COUNT(completed_at - started_at) FILTER (WHERE status = 'success') AS duration_count,
+                   SUM(COALESCE((result->>'categories_found')::int, 0)) AS categories,
+                   SUM(COALESCE((result->>'endpoints_found')::int, 0)) AS endpoints,
+                   SUM(COALESCE((result->>'products_found')::int, 0)) AS items,
+                   SUM(COALESCE((result->>'fields_requested')::int, 0)) AS tested,
+                   SUM(COALESCE((result->>'fields_requested')::int, 0)
+                       - COALESCE((result->>'selectors_generated')::int,
+                                  COALESCE((result->>'fields_requested')::int, 0))) AS failed_selectors,
+                   SUM(COALESCE((result->>'cost_usd')::float, 0)) AS cost
+            FROM jobs
+            WHERE status IN ('success', 'failed') AND site_id IS NOT NULL
+            GROUP BY 1, 2, 3, 4
+        ) finished
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM analytics_metrics WHERE job_type IS NOT NULL")
+    op.drop_index('uq_metrics_rollup', table_name='analytics_metrics')
+    op.drop_column('analytics_metrics', 'updated_at')
+    for name, _, _ in reversed(COUNTERS):
+        op.drop_column('analytics_metrics', name)
+    op.drop_column('analytics_metrics', 'job_type')
+    op.alter_column(
+        'analytics_metrics', 'date',
+        type_=sa.DateTime(), postgresql_using='date::timestamp', nullable=True
+    )
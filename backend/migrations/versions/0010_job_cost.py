@@ -0,0 +1,25 @@
+"""LLM cost per job
+
+Revision ID: 0010_job_cost
+Revises: 0009_analytics_rollups
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0010_job_cost'
+down_revision = '0009_analytics_rollups'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'jobs',
+        sa.Column('cost_usd', sa.Float(), server_default='0', nullable=False)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('jobs', 'cost_usd')
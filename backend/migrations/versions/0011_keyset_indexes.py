@@ -0,0 +1,33 @@
+"""indexes for keyset pagination of jobs and sites
+
+Revision ID: 0011_keyset_indexes
+Revises: 0010_job_cost
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0011_keyset_indexes'
+down_revision = '0010_job_cost'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Listings walk these from the cursor onward instead of skipping OFFSET rows
+    op.create_index('idx_jobs_keyset', 'jobs', [sa.text('created_at DESC'), sa.text('job_id DESC')])
+    op.create_index(
+        'idx_jobs_status_keyset', 'jobs', ['status', sa.text('created_at DESC'), sa.text('job_id DESC')]
+    )
+    op.create_index('idx_sites_keyset', 'sites', [sa.text('created_at DESC'), sa.text('site_id DESC')])
+    op.create_index(
+        'idx_sites_status_keyset', 'sites', ['status', sa.text('created_at DESC'), sa.text('site_id DESC')]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_sites_status_keyset', table_name='sites')
+    op.drop_index('idx_sites_keyset', table_name='sites')
+    op.drop_index('idx_jobs_status_keyset', table_name='jobs')
+    op.drop_index('idx_jobs_keyset', table_name='jobs')
@@ -0,0 +1,155 @@
+"""Benchmark: dashboard metrics from daily rollups vs. loading every row
+
+Usage (from backend/, against a Postgres you can write to):
+    python scripts/bench_dashboard.py [--jobs=1000000] [--sites=200000] [--repeat=5] [--keep]
+
+Seeds synthetic sites and jobs into a scratch schema (bench_dashboard) of
+the database in DATABASE_URL and builds their analytics_metrics rollups,
+then times AnalyticsService.dashboard_metrics against the previous
+approach, which selected every Site and every Job in the window and
+counted statuses in Python. The schema is dropped afterwards unless
+--keep is given (reruns then skip seeding).
+"""
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select, text  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.database import Base  # noqa: E402
+from app.models import AnalyticsMetric, Job, Site  # noqa: E402
+from app.services.analytics_service import analytics_service  # noqa: E402
+
+SCHEMA = "bench_dashboard"
+
+
+async def seed(engine, sites: int, jobs: int) -> None:
+    async with engine.begin() as conn:
+        existing = await conn.scalar(text("SELECT count(*) FROM jobs"))
+        if existing == jobs:
+            print(f"♻️  Reusing {jobs:,} seeded jobs")
+            return
+        await conn.execute(text("TRUNCATE analytics_metrics, jobs, sites CASCADE"))
+
+        started = time.perf_counter()
+        # Sites spread over a year, with the status mix of a busy deployment
+        await conn.execute(text("""
+            INSERT INTO sites (site_id, domain, status, business_value_score,
+                               blueprint_version, created_at, updated_at)
+            SELECT md5('site-' || n)::uuid, 'site-' || n || '.example', (ARRAY[
+                       'pending', 'fingerprinted', 'discovered', 'ready', 'review', 'failed'
+                   ])[1 + n % 6], 0.5, n % 2, NOW() - (n % 365) * INTERVAL '1 day', NOW()
+            FROM generate_series(1, :sites) AS n
+        """), {"sites": sites})
+        # Jobs over 90 days; most finished, a few still active (without a
+        # site, so the one-active-job-per-site index is not in the way)
+        await conn.execute(text("""
+            INSERT INTO jobs (job_id, site_id, job_type, method, status, priority,
+                              attempt_count, max_retries, progress, result,
+                              started_at, completed_at, created_at, updated_at)
+            SELECT gen_random_uuid(),
+                   CASE WHEN status IN ('queued', 'running') THEN NULL
+                        ELSE md5('site-' || (1 + n % :sites))::uuid END,
+                   (ARRAY['fingerprint', 'discover'])[1 + n % 2], 'auto', status, 0, 1, 3, 100,
+                   json_build_object('categories_found', n % 40, 'endpoints_found', n % 5),
+                   created, created + (n % 300) * INTERVAL '1 second', created, created
+            FROM (
+                SELECT n, NOW() - (n % (90 * 24 * 60)) * INTERVAL '1 minute' AS created,
+                       (ARRAY[
+                           'success', 'success', 'success', 'success', 'success',
+                           'success', 'failed', 'cancelled', 'queued', 'running'
+                       ])[1 + n % 10] AS status
+                FROM generate_series(1, :jobs) AS n
+            ) seeded
+        """), {"jobs": jobs, "sites": sites})
+        print(f"🌱 Seeded {sites:,} sites and {jobs:,} jobs in {time.perf_counter() - started:.1f}s")
+
+        started = time.perf_counter()
+        await analytics_service.backfill(AsyncSession(bind=conn))
+        print(f"📊 Built rollups in {time.perf_counter() - started:.1f}s")
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        # Sets the visibility map, so index-only scans apply as in production
+        await conn.execute(text("VACUUM ANALYZE sites"))
+        await conn.execute(text("VACUUM ANALYZE jobs"))
+        await conn.execute(text("VACUUM ANALYZE analytics_metrics"))
+
+
+async def legacy_dashboard(db: AsyncSession, days: int) -> None:
+    """Dashboard metrics as the endpoint computed them before"""
+    since = datetime.utcnow() - timedelta(days=days)
+    all_sites = (await db.execute(select(Site))).scalars().all()
+    len([s for s in all_sites if s.created_at > since])
+    len([s for s in all_sites if s.status == "ready"])
+    jobs = (await db.execute(select(Job).where(Job.created_at > since))).scalars().all()
+    len([j for j in jobs if j.status == "success"])
+    durations = [
+        (j.completed_at - j.started_at).total_seconds()
+        for j in jobs if j.status == "success" and j.started_at and j.completed_at
+    ]
+    sum(durations) / max(len(durations), 1)
+
+
+async def rollup_dashboard(db: AsyncSession, days: int) -> None:
+    await analytics_service.dashboard_metrics(db, days=days)
+
+
+async def timeit(engine, func, days: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            started = time.perf_counter()
+            await func(db, days)
+            best = min(best, time.perf_counter() - started)
+    return best
+
+
+async def main() -> None:
+    jobs, sites, repeat, keep = 1_000_000, 200_000, 5, False
+    for arg in sys.argv[1:]:
+        if arg.startswith("--jobs="):
+            jobs = int(arg.split("=", 1)[1])
+        elif arg.startswith("--sites="):
+            sites = int(arg.split("=", 1)[1])
+        elif arg.startswith("--repeat="):
+            repeat = int(arg.split("=", 1)[1])
+        elif arg == "--keep":
+            keep = True
+
+    admin = create_async_engine(settings.DATABASE_URL)
+    async with admin.begin() as conn:
+        await conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {SCHEMA}"))
+
+    engine = create_async_engine(
+        settings.DATABASE_URL,
+        connect_args={"server_settings": {"search_path": SCHEMA}}
+    )
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(lambda sync_conn: Base.metadata.create_all(
+                sync_conn, tables=[Site.__table__, Job.__table__, AnalyticsMetric.__table__]
+            ))
+        await seed(engine, sites, jobs)
+
+        print(f"{'window':>7} {'legacy (ms)':>12} {'rollups (ms)':>13} {'speedup':>8}")
+        for days in (1, 7, 30, 90):
+            # The legacy path loads every row; once is enough
+            legacy = await timeit(engine, legacy_dashboard, days, 1)
+            rollups = await timeit(engine, rollup_dashboard, days, repeat)
+            print(f"{days:>6}d {legacy * 1000:>12.1f} {rollups * 1000:>13.1f} {legacy / rollups:>7.1f}x")
+    finally:
+        await engine.dispose()
+        if not keep:
+            async with admin.begin() as conn:
+                await conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+        await admin.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,202 @@
+"""Tests for daily analytics rollups"""
+import uuid
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models import Job
+from app.services.analytics_service import AnalyticsService
+
+
+def _sql(stmt):
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+StateRow = namedtuple(
+    "StateRow",
+    "total_sites new_sites ready_sites review_sites failed_sites total_blueprints active_jobs"
+)
+TotalsRow = namedtuple(
+    "TotalsRow",
+    "total_jobs successful_jobs failed_jobs avg_duration total_categories total_endpoints total_cost_usd"
+)
+MethodRow = namedtuple(
+    "MethodRow",
+    "method job_type total_jobs success_count avg_time_seconds p50_seconds p90_seconds p99_seconds "
+    "avg_categories_found total_cost_usd"
+)
+
+
+class _RowSession:
+    def __init__(self, *rows):
+        self.rows = list(rows)
+        self.statements = []
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        row = self.rows.pop(0)
+
+        class _Result:
+            def one(self):
+                return row
+
+            def all(self):
+                return row
+        return _Result()
+
+
+def _job(**overrides):
+    started = datetime(2026, 3, 1, 23, 59, 0)
+    fields = dict(
+        site_id=uuid.uuid4(), job_type="discover", method="auto", status="success",
+        started_at=started, completed_at=started + timedelta(seconds=90),
+        result={"categories_found": 12, "endpoints_found": 3}
+    )
+    fields.update(overrides)
+    return Job(**fields)
+
+
+def test_rollup_values_for_successful_job():
+    """Test a finished job becomes one row's worth of counters on its finish day"""
+    values = AnalyticsService.rollup_values(_job())
+
+    assert values["date"] == date(2026, 3, 2)
+    assert values["job_count"] == 1 and values["success_count"] == 1
+    assert values["duration_sum_seconds"] == 90 and values["duration_count"] == 1
+    assert values["num_categories_found"] == 12
+    assert values["num_endpoints_found"] == 3
+
+
+def test_rollup_values_counts_failed_selectors():
+    """Test selector jobs record requested and missing fields"""
+    job = _job(job_type="generate_selectors", result={"fields_requested": 5, "selectors_generated": 3})
+    values = AnalyticsService.rollup_values(job)
+
+    assert values["selectors_tested"] == 5
+    assert values["selectors_failed"] == 2
+
+
+def test_rollup_values_skips_unfinished_or_siteless_jobs():
+    """Test only finished jobs with a site are rolled up"""
+    assert AnalyticsService.rollup_values(_job(status="running")) is None
+    assert AnalyticsService.rollup_values(_job(status="cancelled")) is None
+    assert AnalyticsService.rollup_values(_job(site_id=None)) is None
+
+    failed = AnalyticsService.rollup_values(_job(status="failed", result=None))
+    assert failed["failure_count"] == 1
+    assert failed["duration_count"] == 0
+
+
+def test_rollup_values_carries_llm_cost():
+    """Test the job's LLM spend goes into the rollup cost"""
+    values = AnalyticsService.rollup_values(_job(cost_usd=0.042))
+
+    assert values["fetch_cost_usd"] == 0.042
+
+
+def test_rollup_upsert_adds_to_existing_row():
+    """Test the upsert targets the rollup key and sums counters"""
+    values = AnalyticsService.rollup_values(_job())
+    sql = _sql(AnalyticsService().rollup_upsert(values, datetime(2026, 3, 2)))
+
+    assert "ON CONFLICT (date, site_id, method, job_type) DO UPDATE SET" in sql
+    assert "job_count = (coalesce(analytics_metrics.job_count, %(coalesce_1)s) + excluded.job_count)" in sql
+    assert "selector_failure_rate = CASE WHEN" in sql
+
+
+def test_state_counts_is_one_filtered_aggregate():
+    """Test live state uses FILTER clauses and a subquery, not row loads"""
+    sql = _sql(AnalyticsService.state_counts(datetime(2026, 1, 1)))
+
+    assert "count(*) FILTER (WHERE sites.created_at > %(created_at_1)s) AS new_sites" in sql
+    assert "(SELECT count(*) AS count_1 \nFROM jobs \nWHERE jobs.status IN" in sql
+    assert "sites.site_id" not in sql
+
+
+def test_rollup_totals_reads_rollups_for_the_range():
+    """Test job totals come from analytics_metrics within the day range"""
+    sql = _sql(AnalyticsService.rollup_totals(date(2026, 1, 1), date(2026, 1, 31)))
+
+    assert "FROM analytics_metrics" in sql
+    assert "FROM jobs" not in sql
+    assert "analytics_metrics.date >= %(date_1)s" in sql
+    assert "analytics_metrics.date <= %(date_2)s" in sql
+    assert "WHERE analytics_metrics.date" not in _sql(AnalyticsService.rollup_totals())
+
+
+@pytest.mark.asyncio
+async def test_dashboard_metrics_combines_both_queries():
+    """Test the state and rollup rows become one metrics dict"""
+    db = _RowSession(StateRow(10, 2, 4, 1, 1, 6, 1), TotalsRow(8, 6, 1, 42.5, 30, 4, 0.0))
+    metrics = await AnalyticsService().dashboard_metrics(db, days=7)
+
+    assert len(db.statements) == 2
+    assert metrics["total_sites"] == 10
+    assert metrics["total_blueprints"] == 6
+    assert metrics["active_jobs"] == 1
+    assert metrics["avg_duration"] == 42.5
+    assert metrics["success_rate"] == 0.75
+
+
+@pytest.mark.asyncio
+async def test_dashboard_window_starts_on_the_utc_day():
+    """Test the day window is counted from UTC, like the rollup dates"""
+    db = _RowSession(StateRow(0, 0, 0, 0, 0, 0, 0), TotalsRow(0, 0, 0, None, None, None, None))
+    await AnalyticsService().dashboard_metrics(db, days=7)
+
+    since = datetime.utcnow().date() - timedelta(days=6)
+    assert db.statements[0].compile().params["created_at_1"] == datetime.combine(since, datetime.min.time())
+    assert db.statements[1].compile().params["date_1"] == since
+
+
+@pytest.mark.asyncio
+async def test_dashboard_metrics_without_jobs():
+    """Test empty windows report no rate or duration instead of zero"""
+    db = _RowSession(StateRow(0, 0, 0, 0, 0, 0, 0), TotalsRow(0, 0, 0, None, None, None, None))
+    metrics = await AnalyticsService().dashboard_metrics(db)
+
+    assert metrics["success_rate"] is None
+    assert metrics["avg_duration"] is None
+
+
+def test_method_breakdown_is_one_grouped_query():
+    """Test method stats come from one query with SQL percentiles"""
+    sql = _sql(AnalyticsService.method_breakdown(datetime(2026, 1, 1)))
+
+    assert sql.count("\nFROM jobs") == 1
+    assert sql.count("percentile_cont(") == 3
+    assert "WITHIN GROUP (ORDER BY CASE WHEN (jobs.status = %(status_2)s)" in sql
+    assert "sum(jobs.cost_usd)" in sql
+    assert "GROUP BY jobs.method, jobs.job_type" in sql
+
+
+@pytest.mark.asyncio
+async def test_method_performance_recommends_cheapest_success():
+    """Test per-method rates and costs, and the cheapest method per job type"""
+    db = _RowSession([
+        MethodRow("static", "discover", 40, 30, 20.0, 18.0, 35.0, 60.0, 12.0, 0.0),
+        MethodRow("browser", "discover", 20, 19, 50.0, 45.0, 80.0, 110.0, 15.0, 0.0),
+        MethodRow("llm", "generate_selectors", 10, 5, 8.0, 7.0, 12.0, 14.0, None, 0.5),
+    ])
+    result = await AnalyticsService().method_performance(db, days=30)
+    static, browser, llm = result["method_performance"]
+
+    assert result["window_days"] == 30
+    assert static["failure_count"] == 10
+    assert static["success_rate"] == 0.75
+    assert static["p90_seconds"] == 35.0
+    assert llm["avg_cost_usd"] == 0.05
+    assert llm["cost_per_success_usd"] == 0.1
+    assert any(r.startswith("discover: browser") for r in result["recommendations"])
+    assert any("generate_selectors via llm" in r for r in result["recommendations"])
+
+
+@pytest.mark.asyncio
+async def test_method_performance_without_jobs():
+    """Test an empty window says so instead of recommending"""
+    result = await AnalyticsService().method_performance(_RowSession([]), days=7)
+
+    assert result["method_performance"] == []
+    assert result["recommendations"] == ["No finished jobs in the last 7 days"]
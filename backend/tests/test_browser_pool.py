@@ -0,0 +1,89 @@
+"""Tests for the Playwright browser pool (with a fake Playwright driver)"""
+import pytest
+
+import app.services.browser_pool as browser_pool_module
+from app.services.browser_pool import BrowserPool
+
+
+class FakeContext:
+    async def close(self):
+        pass
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.closed = False
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **options):
+        return FakeContext()
+
+    async def close(self):
+        self.closed = True
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.chromium = self
+        self.launched = []
+
+    async def launch(self, **options):
+        browser = FakeBrowser()
+        self.launched.append(browser)
+        return browser
+
+    async def start(self):
+        return self
+
+    async def stop(self):
+        pass
+
+
+@pytest.fixture
+def fake_playwright(monkeypatch):
+    driver = FakePlaywright()
+    monkeypatch.setattr(browser_pool_module, "PLAYWRIGHT_AVAILABLE", True)
+    monkeypatch.setattr(browser_pool_module, "async_playwright", lambda: driver)
+    return driver
+
+
+@pytest.mark.asyncio
+async def test_contexts_reuse_pooled_browsers(fake_playwright):
+    """Test leases do not launch a browser per discovery"""
+    pool = BrowserPool(size=2, max_pages=2, recycle_after=100)
+    for _ in range(10):
+        async with pool.context() as context:
+            assert isinstance(context, FakeContext)
+
+    assert len(fake_playwright.launched) == 2
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_browser_recycled_after_limit(fake_playwright):
+    """Test a browser is replaced once it has served recycle_after contexts"""
+    pool = BrowserPool(size=1, max_pages=1, recycle_after=3)
+    for _ in range(3):
+        async with pool.context():
+            pass
+
+    first = fake_playwright.launched[0]
+    assert first.closed
+    assert len(fake_playwright.launched) == 2
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_health_check_restarts_crashed_browser(fake_playwright):
+    """Test crashed browsers are relaunched by the health check"""
+    pool = BrowserPool(size=2, max_pages=1, recycle_after=100)
+    await pool.start()
+
+    fake_playwright.launched[0].connected = False
+    assert await pool.health_check() == 1
+    assert len(fake_playwright.launched) == 3
+    assert pool.stats()["restarts"] == 1
+    await pool.close()
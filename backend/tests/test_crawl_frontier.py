@@ -0,0 +1,119 @@
+"""Tests for the discovery crawl frontier"""
+import re
+import threading
+import pytest
+import httpx
+
+from app.services.crawl_frontier import CrawlFrontier
+from app.services.fetch_session import FetchSession
+
+# /      -> /a, /b
+# /a     -> /a/1, /a/2
+# /a/1   -> /a/1/x
+# /a/1/x -> /deep
+SITE = {
+    "/a": ["/a/1", "/a/2"],
+    "/b": [],
+    "/a/1": ["/a/1/x"],
+    "/a/2": [],
+    "/a/1/x": ["/deep"],
+}
+
+
+def _extract(url, html):
+    return [{"url": f"https://shop.test{href}"} for href in re.findall(r'href="([^"]+)"', html)]
+
+
+def _session(fetched):
+    async def handler(request):
+        fetched.append(request.url.path)
+        hrefs = "".join(f'<a href="{h}"></a>' for h in SITE.get(request.url.path, []))
+        return httpx.Response(200, html=f"<html>{hrefs}</html>")
+    return FetchSession(transport=httpx.MockTransport(handler))
+
+
+def _root_links():
+    return [{"url": "https://shop.test/a"}, {"url": "https://shop.test/b"}]
+
+
+@pytest.mark.asyncio
+async def test_crawl_respects_max_depth():
+    """Test links beyond max depth are neither recorded nor fetched"""
+    fetched = []
+    async with _session(fetched) as session:
+        frontier = CrawlFrontier(session, _extract, max_depth=3)
+        result = await frontier.crawl("https://shop.test/", _root_links())
+
+    depths = {link["url"]: link["depth"] for link in result["links"]}
+    assert depths["https://shop.test/a"] == 1
+    assert depths["https://shop.test/a/1"] == 2
+    assert depths["https://shop.test/a/1/x"] == 3
+    assert "https://shop.test/deep" not in depths
+    # Depth-3 pages are recorded but not expanded
+    assert "/a/1/x" not in fetched
+    assert result["stop_reason"] == "exhausted"
+
+
+@pytest.mark.asyncio
+async def test_links_are_extracted_off_the_event_loop():
+    """Test page parsing runs in a worker thread, not on the shared loop"""
+    threads = set()
+
+    def extract(url, html):
+        threads.add(threading.get_ident())
+        return _extract(url, html)
+
+    async with _session([]) as session:
+        await CrawlFrontier(session, extract).crawl("https://shop.test/", _root_links())
+
+    assert threads and threading.get_ident() not in threads
+
+
+@pytest.mark.asyncio
+async def test_crawl_stops_on_page_budget():
+    """Test the crawl never fetches more pages than max_pages"""
+    fetched = []
+    async with _session(fetched) as session:
+        frontier = CrawlFrontier(session, _extract, max_pages=3, concurrency=4)
+        result = await frontier.crawl("https://shop.test/", _root_links())
+
+    # The root page counts toward the budget
+    assert len(fetched) == 2
+    assert result["pages_crawled"] == 3
+    assert result["stop_reason"] == "max_pages"
+
+
+@pytest.mark.asyncio
+async def test_crawl_skips_disallowed_pages():
+    """Test the fetch gate blocks pages before they are downloaded"""
+    fetched = []
+
+    async def allow_fetch(url, html=None):
+        return not url.endswith("/b")
+
+    async with _session(fetched) as session:
+        frontier = CrawlFrontier(session, _extract, allow_fetch=allow_fetch)
+        await frontier.crawl("https://shop.test/", _root_links())
+
+    assert "/b" not in fetched
+    assert "/a" in fetched
+
+
+@pytest.mark.asyncio
+async def test_failed_fetches_do_not_use_the_page_budget():
+    """Test a page whose fetch raises gives its budget slot back"""
+    fetched = []
+
+    async def handler(request):
+        if request.url.path == "/b":
+            raise httpx.ConnectError("connection refused")
+        fetched.append(request.url.path)
+        hrefs = "".join(f'<a href="{h}"></a>' for h in SITE.get(request.url.path, []))
+        return httpx.Response(200, html=f"<html>{hrefs}</html>")
+
+    async with FetchSession(transport=httpx.MockTransport(handler)) as session:
+        frontier = CrawlFrontier(session, _extract, max_pages=4, concurrency=1)
+        result = await frontier.crawl("https://shop.test/", _root_links())
+
+    assert fetched == ["/a", "/a/1", "/a/2"]
+    assert result["pages_crawled"] == 4
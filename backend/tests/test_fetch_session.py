@@ -0,0 +1,107 @@
+"""Tests for the per-run fetch session"""
+import asyncio
+import pytest
+import httpx
+
+from app.services.fetch_session import FetchSession
+from app.services.revalidation import RevalidationCache
+
+
+def _transport(calls):
+    async def handler(request):
+        calls.append(str(request.url))
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, text=f"<html>{request.url.path}</html>")
+    return httpx.MockTransport(handler)
+
+
+@pytest.mark.asyncio
+async def test_same_url_downloaded_once():
+    """Test repeated fetches are served from the run cache"""
+    calls = []
+    async with FetchSession(transport=_transport(calls)) as session:
+        first = await session.get("https://example.com/")
+        second = await session.get("https://example.com/")
+
+        assert first.text == second.text
+        assert calls == ["https://example.com/"]
+        assert session.stats()["cache_hits"] == 1
+        assert session.stats()["cache_misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_fetches_share_download():
+    """Test concurrent requests for one URL share a single download"""
+    calls = []
+    async with FetchSession(transport=_transport(calls)) as session:
+        responses = await asyncio.gather(
+            *[session.get("https://example.com/a") for _ in range(5)]
+        )
+
+        assert len(calls) == 1
+        assert all(r.text == "<html>/a</html>" for r in responses)
+        assert session.stats()["cache_hits"] == 4
+
+
+@pytest.mark.asyncio
+async def test_cancelled_fetcher_does_not_cancel_waiters():
+    """Test waiters take over a download whose fetching task was cancelled"""
+    calls = []
+    async with FetchSession(transport=_transport(calls)) as session:
+        fetcher = asyncio.create_task(session.get("https://example.com/a"))
+        await asyncio.sleep(0.005)  # mid-download
+        waiters = [asyncio.create_task(session.get("https://example.com/a")) for _ in range(3)]
+        await asyncio.sleep(0)
+        fetcher.cancel()
+
+        responses = await asyncio.gather(*waiters)
+
+        assert fetcher.cancelled()
+        assert all(r.text == "<html>/a</html>" for r in responses)
+        assert len(calls) == 2
+        assert session.stats()["cache_hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_before_request_only_on_miss():
+    """Test the rate-limit hook is skipped for cache hits"""
+    calls = []
+    hooked = []
+
+    async def hook(url):
+        hooked.append(url)
+
+    async with FetchSession(transport=_transport(calls), before_request=hook) as session:
+        await session.get("https://example.com/a")
+        await session.get("https://example.com/a")
+        await session.get("https://example.com/b")
+
+    assert hooked == ["https://example.com/a", "https://example.com/b"]
+
+
+@pytest.mark.asyncio
+async def test_revalidation_replays_body_on_304():
+    """Test a second run sends validators and reuses the stored body on 304"""
+    sent = []
+
+    async def handler(request):
+        sent.append(request.headers.get("if-none-match"))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304, headers={"etag": '"v1"'})
+        return httpx.Response(200, html="<html>catalog</html>", headers={"etag": '"v1"'})
+
+    revalidation = RevalidationCache()
+    async with FetchSession(transport=httpx.MockTransport(handler), revalidation=revalidation) as session:
+        await session.get("https://example.com/a")
+    assert [p.url for p in revalidation.changed_pages()] == ["https://example.com/a"]
+
+    rerun = RevalidationCache(dict(revalidation.pages))
+    async with FetchSession(transport=httpx.MockTransport(handler), revalidation=rerun) as session:
+        response = await session.get("https://example.com/a")
+
+        assert sent == [None, '"v1"']
+        assert response.status_code == 200
+        assert response.text == "<html>catalog</html>"
+        assert response.extensions["revalidated"] is True
+        assert session.stats()["revalidation_hit_rate"] == 1.0
+    assert rerun.changed_pages() == []
@@ -0,0 +1,140 @@
+"""Tests for LISTEN/NOTIFY job dispatch"""
+import asyncio
+import time
+import uuid
+
+import pytest
+
+from app.services.job_notifier import CHANNEL, JobNotifier
+from app.services.job_queue import ClaimedJob
+from app.workers.github_runner import QueueRunner
+
+
+class _FakeConnection:
+    def __init__(self):
+        self.listeners = {}
+        self.on_terminate = None
+        self.closed = False
+
+    async def add_listener(self, channel, callback):
+        self.listeners[channel] = callback
+
+    def add_termination_listener(self, callback):
+        self.on_terminate = callback
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+    def notify(self, payload):
+        self.listeners[CHANNEL](self, 1234, CHANNEL, payload)
+
+
+def _notifier(conn, poll_interval=5):
+    async def connect():
+        return conn
+
+    return JobNotifier(connect=connect, poll_interval=poll_interval)
+
+
+@pytest.mark.asyncio
+async def test_notify_wakes_waiter_for_its_job_type():
+    """Test a NOTIFY wakes the waiter well before the poll interval"""
+    conn = _FakeConnection()
+    notifier = _notifier(conn)
+    assert await notifier.listen()
+    notifier.clear("fingerprint")
+
+    loop = asyncio.get_running_loop()
+    loop.call_later(0.01, conn.notify, "discover")
+    loop.call_later(0.02, conn.notify, "fingerprint")
+
+    started = time.monotonic()
+    assert await notifier.wait("fingerprint")
+    assert time.monotonic() - started < 1
+    assert notifier.stats()["wakeups"] == 1
+    assert notifier.stats()["notifications"] == 2
+
+
+@pytest.mark.asyncio
+async def test_notify_between_clear_and_wait_is_not_lost():
+    """Test a job queued while claiming still wakes the next wait"""
+    conn = _FakeConnection()
+    notifier = _notifier(conn)
+    await notifier.listen()
+
+    notifier.clear("fingerprint")
+    conn.notify("fingerprint")  # arrives while the claim is in flight
+    assert await notifier.wait("fingerprint", timeout=0.01)
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_polling_without_listen_connection():
+    """Test an unreachable LISTEN connection degrades to polling"""
+    async def connect():
+        raise OSError("connection refused")
+
+    notifier = JobNotifier(connect=connect, poll_interval=0.02)
+    assert not await notifier.wait("fingerprint")
+    assert not notifier.listening
+    assert notifier.stats()["polls"] == 1
+    assert notifier.stats()["connect_failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_lost_connection_reconnects_and_looks_once():
+    """Test a dropped connection is reopened and the queue re-checked"""
+    first, second = _FakeConnection(), _FakeConnection()
+    conns = [first, second]
+
+    async def connect():
+        return conns.pop(0)
+
+    notifier = JobNotifier(connect=connect, poll_interval=5)
+    await notifier.listen()
+    notifier.clear("fingerprint")
+
+    first.closed = True
+    first.on_terminate(first)
+    assert not notifier.listening
+
+    # Reconnecting sets every event: notifications may have been missed
+    assert await notifier.wait("fingerprint", timeout=0.05)
+    assert notifier.listening
+    assert CHANNEL in second.listeners
+
+
+@pytest.mark.asyncio
+async def test_idle_runner_claims_again_after_wakeup():
+    """Test a listening runner idles on an empty queue and resumes on a wake-up"""
+    queue = []
+    wake = asyncio.Event()
+
+    async def claim(limit):
+        claimed, queue[:] = queue[:limit], queue[limit:]
+        return claimed
+
+    async def wait_for_work(timeout):
+        try:
+            await asyncio.wait_for(wake.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        wake.clear()
+        return True
+
+    async def run_job(job):
+        return {"success": True}
+
+    runner = QueueRunner(claim, run_job, time_budget=0.2, wait_for_work=wait_for_work)
+    task = asyncio.create_task(runner.run())
+
+    await asyncio.sleep(0.02)
+    queue.append(ClaimedJob(str(uuid.uuid4()), None, "fingerprint", None))
+    wake.set()
+
+    summary = await task
+    assert summary["processed"] == 1
+    assert summary["wakeups"] == 1
+    assert summary["stopped"] == "time_budget"
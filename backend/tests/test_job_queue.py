@@ -0,0 +1,336 @@
+"""Tests for atomic job claiming, leases and the queue runner"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql
+
+from app.models import Job
+from app.services.job_queue import ClaimedJob, JobQueue
+from app.workers.github_runner import QueueRunner
+from app.workers.runtime import job_lease
+
+
+def _jobs(count):
+    return [ClaimedJob(str(uuid.uuid4()), str(uuid.uuid4()), "fingerprint", None) for _ in range(count)]
+
+
+class _FakeQueue:
+    def __init__(self, jobs):
+        self.jobs = list(jobs)
+        self.limits = []
+
+    async def claim(self, limit):
+        self.limits.append(limit)
+        claimed, self.jobs = self.jobs[:limit], self.jobs[limit:]
+        return claimed
+
+
+class _RecordingSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+        self.committed = False
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        rows = self.rows
+
+        class _Result:
+            def all(self):
+                return rows
+        return _Result()
+
+    async def commit(self):
+        self.committed = True
+
+    async def rollback(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_claim_locks_in_priority_order():
+    """Test claiming uses SKIP LOCKED in (priority DESC, created_at ASC) order"""
+    job_id = uuid.uuid4()
+
+    class Row:
+        pass
+    row = Row()
+    row.job_id, row.site_id, row.job_type, row.payload = job_id, None, "fingerprint", {"a": 1}
+
+    db = _RecordingSession([row])
+    claimed = await JobQueue().claim(db, "fingerprint", 3, worker_id="runner-1")
+
+    select_sql = str(db.statements[0].compile(dialect=postgresql.dialect()))
+    assert "FOR UPDATE SKIP LOCKED" in select_sql
+    assert "ORDER BY jobs.priority DESC, jobs.created_at ASC" in select_sql
+
+    update_sql = db.statements[1].compile(dialect=postgresql.dialect())
+    assert "UPDATE jobs" in str(update_sql)
+    assert update_sql.params["status"] == "running"
+    assert update_sql.params["worker_id"] == "runner-1"
+    assert db.committed
+    assert claimed == [ClaimedJob(str(job_id), None, "fingerprint", {"a": 1})]
+
+
+@pytest.mark.asyncio
+async def test_runner_drains_queue_with_bounded_concurrency():
+    """Test the runner keeps claiming until empty and never exceeds its concurrency"""
+    queue = _FakeQueue(_jobs(23))
+    active = {"now": 0, "peak": 0}
+
+    async def run_job(job):
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        await asyncio.sleep(0.001)
+        active["now"] -= 1
+        return {"success": True}
+
+    summary = await QueueRunner(queue.claim, run_job, concurrency=4, batch_size=3).run()
+
+    assert summary["processed"] == 23
+    assert summary["total"] == 23
+    assert summary["stopped"] == "queue_empty"
+    assert active["peak"] <= 4
+    assert max(queue.limits) <= 3
+
+
+@pytest.mark.asyncio
+async def test_runner_stops_claiming_when_budget_spent():
+    """Test no jobs are claimed after the time budget, but claimed jobs finish"""
+    queue = _FakeQueue(_jobs(10))
+    now = {"t": 0.0}
+
+    async def run_job(job):
+        now["t"] += 10
+        return {"success": job.job_id != queue_ids[0]}
+
+    queue_ids = [job.job_id for job in queue.jobs]
+    summary = await QueueRunner(
+        queue.claim, run_job, concurrency=2, batch_size=2, time_budget=25, clock=lambda: now["t"]
+    ).run()
+
+    assert summary["stopped"] == "time_budget"
+    assert summary["total"] < 10
+    assert summary["processed"] + summary["failed"] == summary["total"]
+    assert summary["failed"] == 1
+    assert len(queue.jobs) == 10 - summary["total"]
+
+
+@pytest.mark.asyncio
+async def test_runner_counts_crashed_jobs_as_failed():
+    """Test an exception in one job does not stop the others"""
+    queue = _FakeQueue(_jobs(3))
+    crashing = queue.jobs[1].job_id
+
+    async def run_job(job):
+        if job.job_id == crashing:
+            raise RuntimeError("boom")
+        return {"success": True}
+
+    summary = await QueueRunner(queue.claim, run_job, concurrency=3).run()
+    assert summary == {
+        "processed": 2, "failed": 1, "total": 3, "claims": 2, "wakeups": 0, "stopped": "queue_empty"
+    }
+
+
+class _FirstRowSession(_RecordingSession):
+    """Returns the given row (or None) from result.first()"""
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        row = self.rows
+
+        class _Result:
+            def first(self):
+                return row
+        return _Result()
+
+
+@pytest.mark.asyncio
+async def test_claim_job_only_takes_queued_jobs():
+    """Test a task claims its job only while queued, so duplicates skip it"""
+    job_id = str(uuid.uuid4())
+    db = _FirstRowSession((uuid.UUID(job_id),))
+
+    assert await JobQueue(lease_seconds=60).claim_job(db, job_id, worker_id="celery-1")
+    stmt = db.statements[0].compile(dialect=postgresql.dialect())
+    assert "WHERE jobs.job_id = %(job_id_1)s::UUID AND jobs.status = %(status_1)s" in str(stmt)
+    assert "RETURNING jobs.job_id" in str(stmt)
+    assert stmt.params["status_1"] == "queued"
+    assert stmt.params["status"] == "running"
+    assert stmt.params["worker_id"] == "celery-1"
+    assert db.committed
+
+    assert not await JobQueue().claim_job(_FirstRowSession(None), job_id)
+
+
+def test_held_by_matches_only_this_workers_running_job():
+    """Test heartbeats, hand-backs and timeouts never touch a job another worker holds"""
+    stmt = update(Job).where(*JobQueue.held_by(str(uuid.uuid4()), "celery-1")).values(progress=1)
+    compiled = stmt.compile(dialect=postgresql.dialect())
+
+    assert "jobs.status = %(status_1)s AND jobs.worker_id = %(worker_id_1)s" in str(compiled)
+    assert compiled.params["worker_id_1"] == "celery-1"
+
+
+class _ScalarSession:
+    """Returns the given objects (or None) for successive execute() calls"""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+        self.commits = 0
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        value = self.results.pop(0)
+
+        class _Result:
+            def scalar_one_or_none(self):
+                return value
+        return _Result()
+
+    async def commit(self):
+        self.commits += 1
+
+
+@pytest.mark.asyncio
+async def test_enqueue_inserts_unless_an_active_job_exists():
+    """Test the insert targets the partial unique index on active jobs"""
+    site_id = uuid.uuid4()
+    inserted = Job(job_id=uuid.uuid4(), site_id=site_id, job_type="discover", status="queued")
+    db = _ScalarSession(inserted)
+
+    job, created = await JobQueue().enqueue(db, site_id, "discover", method="manual")
+
+    sql = str(db.statements[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (site_id, job_type) WHERE status IN ('queued', 'running') DO NOTHING" in sql
+    assert "RETURNING" in sql
+    assert (job, created, db.commits) == (inserted, True, 1)
+
+
+@pytest.mark.asyncio
+async def test_enqueue_attaches_to_the_active_job():
+    """Test a duplicate returns the active job and can only raise its priority"""
+    site_id = uuid.uuid4()
+    active = Job(job_id=uuid.uuid4(), site_id=site_id, job_type="discover", status="queued", priority=0)
+    db = _ScalarSession(None, active)
+
+    job, created = await JobQueue().enqueue(db, site_id, "discover", priority=2)
+    assert (job, created, job.priority) == (active, False, 2)
+
+    running = Job(job_id=uuid.uuid4(), site_id=site_id, job_type="discover", status="running", priority=0)
+    job, created = await JobQueue().enqueue(_ScalarSession(None, running), site_id, "discover", priority=5)
+    assert (job, created, job.priority) == (running, False, 0)
+
+
+@pytest.mark.asyncio
+async def test_enqueue_retries_when_the_active_job_just_finished():
+    """Test a conflict whose job completed before the lookup inserts again"""
+    site_id = uuid.uuid4()
+    inserted = Job(job_id=uuid.uuid4(), site_id=site_id, job_type="discover", status="queued")
+    db = _ScalarSession(None, None, inserted)
+
+    job, created = await JobQueue().enqueue(db, site_id, "discover")
+    assert (job, created, len(db.statements)) == (inserted, True, 3)
+
+
+def test_active_job_index_is_unique_and_partial():
+    """Test the model declares the index the enqueue conflict target infers"""
+    from sqlalchemy.schema import CreateIndex
+
+    index = next(i for i in Job.__table__.indexes if i.name == "uq_jobs_active_site_type")
+    assert str(CreateIndex(index).compile(dialect=postgresql.dialect())) == (
+        "CREATE UNIQUE INDEX uq_jobs_active_site_type ON jobs (site_id, job_type) "
+        "WHERE status IN ('queued', 'running')"
+    )
+
+
+@pytest.mark.asyncio
+async def test_reap_requeues_or_fails_expired_leases():
+    """Test the reaper splits expired jobs on attempt_count vs max_retries"""
+    class Row:
+        job_id, site_id, job_type, payload = uuid.uuid4(), None, "discover", None
+
+    db = _RecordingSession([Row()])
+    now = datetime(2026, 1, 1)
+    requeued, failed = await JobQueue().reap(db, now=now)
+
+    requeue_sql, fail_sql = (
+        str(stmt.compile(dialect=postgresql.dialect())) for stmt in db.statements
+    )
+    for sql in (requeue_sql, fail_sql):
+        assert "jobs.status = %(status_1)s" in sql
+        assert "jobs.lease_expires_at < %(lease_expires_at_1)s" in sql
+    assert "jobs.attempt_count < jobs.max_retries" in requeue_sql
+    assert "jobs.attempt_count >= jobs.max_retries" in fail_sql
+    assert [job.job_type for job in requeued] == ["discover"]
+    assert failed == [str(Row.job_id)]
+
+
+@pytest.mark.asyncio
+async def test_job_lease_heartbeats_until_job_finishes():
+    """Test the lease is renewed while the job runs and stops afterwards"""
+    beats = []
+
+    async def renew(job_id):
+        beats.append(job_id)
+        return True
+
+    async def three_beats():
+        while len(beats) < 3:
+            await asyncio.sleep(0.005)
+
+    async with job_lease("job-1", renew, interval=0.01):
+        await asyncio.wait_for(three_beats(), timeout=2)
+    count = len(beats)
+    await asyncio.sleep(0.03)
+
+    assert count >= 3
+    assert len(beats) == count
+    assert set(beats) == {"job-1"}
+
+
+@pytest.mark.asyncio
+async def test_job_lease_stops_when_job_no_longer_running():
+    """Test heartbeats stop once the job was reaped or finished elsewhere"""
+    beats = []
+
+    async def renew(job_id):
+        beats.append(job_id)
+        return False
+
+    async with job_lease("job-1", renew, interval=0.01):
+        await asyncio.sleep(0.05)
+    assert len(beats) == 1
+
+
+@pytest.mark.asyncio
+async def test_task_skips_a_job_it_could_not_claim(monkeypatch):
+    """Test a duplicate Celery delivery returns without running the job"""
+    from contextlib import asynccontextmanager
+    from types import SimpleNamespace
+
+    from app.models import Site
+    from app.workers import fingerprinter
+
+    db = _ScalarSession(Site(site_id=uuid.uuid4(), domain="example.com"))
+
+    @asynccontextmanager
+    async def session():
+        yield db
+
+    async def claim_job(db, job_id, worker_id=None):
+        return False
+
+    monkeypatch.setattr(fingerprinter, "worker_db", SimpleNamespace(session=session))
+    monkeypatch.setattr(fingerprinter.job_queue, "claim_job", claim_job)
+
+    result = await fingerprinter._fingerprint_site_async(str(uuid.uuid4()), str(uuid.uuid4()))
+
+    assert result["skipped"] is True
+    assert len(db.statements) == 1  # the site lookup; the job is never loaded
+    assert db.commits == 0
@@ -22,7 +22,7 @@ async def test_list_jobs(client):
 @pytest.mark.asyncio
 async def test_list_jobs_filtered(client):
     """Test listing jobs with filters"""
-    response = await client.get("/api/v1/jobs?status=running&limit=5")
+    response = await client.get("/api/v1/jobs?status=running&limit=5&count=exact")
     assert response.status_code == 200
     data = response.json()
     assert data["total"] >= 0
@@ -0,0 +1,32 @@
+"""Tests for LLM usage and cost tracking"""
+from types import SimpleNamespace
+
+from app.config import settings
+from app.services.llm_service import LLMService, LLMUsage
+
+
+def _message(input_tokens, output_tokens):
+    return SimpleNamespace(usage=SimpleNamespace(input_tokens=input_tokens, output_tokens=output_tokens))
+
+
+def test_track_usage_prices_tokens():
+    """Test calls inside the block add tokens and cost to the job's usage"""
+    service = LLMService()
+    with service.track_usage() as usage:
+        service._record_usage(_message(1_000_000, 0))
+        service._record_usage(_message(0, 1_000_000))
+
+    assert usage.calls == 2
+    assert usage.input_tokens == 1_000_000
+    assert usage.cost_usd == settings.LLM_INPUT_COST_PER_MTOK + settings.LLM_OUTPUT_COST_PER_MTOK
+
+
+def test_usage_outside_a_block_is_not_recorded():
+    """Test calls are only counted for the job tracking them"""
+    service = LLMService()
+    usage = LLMUsage()
+    with service.track_usage(usage):
+        service._record_usage(_message(10, 10))
+    service._record_usage(_message(10, 10))
+
+    assert usage.calls == 1
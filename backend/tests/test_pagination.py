@@ -0,0 +1,98 @@
+"""Tests for keyset pagination and listing counts"""
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.models import Site
+from app.services.pagination import (
+    InvalidCursor, count_rows, decode_cursor, encode_cursor, keyset, page, sort_spec
+)
+
+KEYS = (Site.created_at, Site.site_id)
+SORT = sort_spec(KEYS)
+
+
+def _sql(stmt):
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_cursor_round_trip():
+    """Test a cursor decodes back to typed sort key values"""
+    created, site_id = datetime(2026, 3, 1, 12, 30, 5, 123456), uuid.uuid4()
+    cursor = encode_cursor([created, site_id], SORT)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, KEYS, SORT) == [created, site_id]
+
+
+@pytest.mark.parametrize("cursor", [
+    "not-base64!",
+    encode_cursor(["2026-03-01T00:00:00"], SORT),
+    encode_cursor(["x", "y"], SORT),
+])
+def test_invalid_cursor_is_rejected(cursor):
+    """Test garbage, short and mistyped cursors raise InvalidCursor"""
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, KEYS, SORT)
+
+
+def test_cursor_from_another_sort_is_rejected():
+    """Test a cursor only pages the sort order it was issued for"""
+    values = [datetime(2026, 3, 1), uuid.uuid4()]
+    updated = (Site.updated_at, Site.site_id)
+
+    assert sort_spec(KEYS, descending=False) != SORT
+    with pytest.raises(InvalidCursor, match="different sort order"):
+        keyset(select(Site), KEYS, encode_cursor(values, SORT), 50, descending=False)
+    with pytest.raises(InvalidCursor, match="different sort order"):
+        keyset(select(Site), updated, encode_cursor(values, SORT), 50)
+
+
+def test_keyset_compares_row_values():
+    """Test later pages seek past the cursor instead of using OFFSET"""
+    cursor = encode_cursor([datetime(2026, 3, 1), uuid.uuid4()], SORT)
+    sql = _sql(keyset(select(Site).where(Site.status == "ready"), KEYS, cursor, 50))
+
+    assert "(sites.created_at, sites.site_id) < (" in sql
+    assert "ORDER BY sites.created_at DESC, sites.site_id DESC" in sql
+    assert "LIMIT %(param_3)s" in sql
+    assert "OFFSET" not in sql
+
+    first = _sql(keyset(select(Site), KEYS, None, 50, descending=False))
+    assert "WHERE" not in first
+    assert "ORDER BY sites.created_at ASC, sites.site_id ASC" in first
+
+
+def test_offset_is_honoured_without_a_cursor():
+    """Test offset callers still get the page they asked for, but not with a cursor"""
+    sql = _sql(keyset(select(Site), KEYS, None, 50, offset=100))
+    assert "LIMIT %(param_1)s OFFSET %(param_2)s" in sql
+
+    cursor = encode_cursor([datetime(2026, 3, 1), uuid.uuid4()], SORT)
+    with pytest.raises(InvalidCursor):
+        keyset(select(Site), KEYS, cursor, 50, offset=100)
+
+
+def test_page_sets_cursor_only_when_more_rows_exist():
+    """Test the extra fetched row becomes the next cursor, not a result"""
+    rows = [SimpleNamespace(created_at=datetime(2026, 3, n), site_id=uuid.uuid4()) for n in (3, 2, 1)]
+
+    items, next_cursor = page(rows, KEYS, 2)
+    assert items == rows[:2]
+    assert decode_cursor(next_cursor, KEYS, SORT) == [rows[1].created_at, rows[1].site_id]
+
+    _, ascending_cursor = page(rows, KEYS, 2, descending=False)
+    with pytest.raises(InvalidCursor):
+        decode_cursor(ascending_cursor, KEYS, SORT)
+
+    assert page(rows, KEYS, 3) == (rows, None)
+
+
+@pytest.mark.asyncio
+async def test_count_none_skips_the_database():
+    """Test listings without a count request run no count query"""
+    assert await count_rows(None, select(Site), "none", "sites", ("sites",)) == (None, False)
@@ -0,0 +1,67 @@
+"""Tests for the parse-once document cache"""
+import threading
+
+import pytest
+
+from app.services.parsed_document import DocumentCache
+
+PAGE = (
+    '<html><body><nav><a href="/shop">Shop</a></nav>'
+    '<div id="app"><a href="/p/1"> Item </a></div>'
+    '<script></script><script></script></body></html>'
+)
+
+
+def test_document_precomputes_analyzer_facts():
+    """Test body text, scripts, SPA roots and anchors are extracted at parse time"""
+    document = DocumentCache().get(PAGE)
+
+    assert document.body_text_length == len("ShopItem")
+    assert document.script_count == 2
+    assert document.has_spa_root is True
+    assert [(a.href, a.text, a.parent) for a in document.anchors] == [
+        ("/shop", "Shop", "nav"),
+        ("/p/1", "Item", "div"),
+    ]
+
+
+def test_cache_parses_each_content_once():
+    """Test identical HTML is served from the cache by content hash"""
+    cache = DocumentCache()
+    first = cache.get(PAGE)
+    second = cache.get(str(PAGE))
+
+    assert first is second
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_evicts_least_recently_used():
+    """Test the cache stays within its entry bound"""
+    cache = DocumentCache(max_entries=2)
+    a = cache.get("<p>a</p>")
+    cache.get("<p>b</p>")
+    cache.get("<p>a</p>")
+    cache.get("<p>c</p>")
+
+    assert cache.stats()["documents"] == 2
+    assert cache.get("<p>a</p>") is a
+    assert cache.stats()["misses"] == 3
+
+
+@pytest.mark.asyncio
+async def test_async_parse_runs_off_the_event_loop():
+    """Test async callers parse in a worker thread and share the cache"""
+    cache = DocumentCache()
+    threads = []
+    get = cache.get
+
+    def recording_get(html):
+        threads.append(threading.get_ident())
+        return get(html)
+
+    cache.get = recording_get
+    document = await cache.parse(PAGE)
+
+    assert threads and threads[0] != threading.get_ident()
+    assert get(PAGE) is document
@@ -0,0 +1,129 @@
+"""Tests for the discovery phase scheduler"""
+import asyncio
+import time
+import pytest
+
+from app.services.phase_scheduler import PhaseGraph
+
+
+@pytest.mark.asyncio
+async def test_independent_phases_overlap():
+    """Test phases sharing only a dependency run side by side"""
+    async def root():
+        return 1
+
+    async def slow(root):
+        await asyncio.sleep(0.1)
+        return root + 1
+
+    graph = PhaseGraph().add("root", root)
+    graph.add("a", slow, depends_on=["root"])
+    graph.add("b", slow, depends_on=["root"])
+
+    started = time.perf_counter()
+    results, timings = await graph.run()
+    elapsed = time.perf_counter() - started
+
+    assert results == {"root": 1, "a": 2, "b": 2}
+    assert elapsed < 0.18
+    assert set(timings) == {"root", "a", "b"}
+
+
+@pytest.mark.asyncio
+async def test_failure_cancels_remaining_phases():
+    """Test a failing phase cancels the others and propagates"""
+    finished = []
+
+    async def boom():
+        raise RuntimeError("blocked")
+
+    async def slow():
+        await asyncio.sleep(1)
+        finished.append("slow")
+
+    graph = PhaseGraph().add("boom", boom).add("slow", slow)
+
+    with pytest.raises(RuntimeError, match="blocked"):
+        await graph.run()
+    assert finished == []
+
+
+def test_cycle_is_rejected():
+    """Test dependency cycles are reported"""
+    async def phase(**_):
+        return None
+
+    graph = PhaseGraph().add("a", phase, depends_on=["b"]).add("b", phase, depends_on=["a"])
+    with pytest.raises(ValueError):
+        graph.order()
+
+
+@pytest.mark.asyncio
+async def test_on_phase_done_reports_completion_order():
+    """Test the hook sees each finished phase with a running count"""
+    seen = []
+
+    async def phase(**_):
+        return None
+
+    async def on_phase_done(name, completed, total):
+        seen.append((name, completed, total))
+
+    graph = PhaseGraph().add("root", phase)
+    graph.add("child", phase, depends_on=["root"])
+    await graph.run(on_phase_done)
+
+    assert seen == [("root", 1, 2), ("child", 2, 2)]
+
+
+@pytest.mark.asyncio
+async def test_deadline_cancels_overrunning_phase_and_skips_dependents():
+    """Test an overrun keeps finished phases and independent ones running"""
+    cancelled = []
+
+    async def fast(**_):
+        return "ok"
+
+    async def hang(**_):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    graph = PhaseGraph().add("root", fast)
+    graph.add("slow", hang, depends_on=["root"])
+    graph.add("after_slow", fast, depends_on=["slow"])
+    graph.add("side", fast, depends_on=["root"])
+
+    results, _ = await graph.run(deadline=time.monotonic() + 0.2)
+
+    assert results == {"root": "ok", "side": "ok"}
+    assert graph.status == {"root": "done", "slow": "timeout", "after_slow": "skipped", "side": "done"}
+    assert cancelled == [True]
+
+
+@pytest.mark.asyncio
+async def test_budget_is_split_along_the_heaviest_chain():
+    """Test a phase's deadline is its weighted share of the time left"""
+    from app.services.phase_scheduler import phase_deadline
+
+    budgets = {}
+
+    async def record(name):
+        budgets[name] = phase_deadline() - time.monotonic()
+
+    async def first():
+        await record("first")
+
+    async def second(first):
+        await record("second")
+
+    graph = PhaseGraph().add("first", first, weight=3.0)
+    graph.add("second", second, depends_on=["first"], weight=1.0)
+    assert graph.path_weights() == {"first": 4.0, "second": 1.0}
+
+    await graph.run(deadline=time.monotonic() + 1.0)
+    assert 0.7 < budgets["first"] <= 0.75
+    # The second phase inherits what the first left unused
+    assert budgets["second"] > 0.9
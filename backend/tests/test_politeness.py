@@ -0,0 +1,70 @@
+"""Tests for the per-host politeness scheduler"""
+import asyncio
+import time
+import pytest
+import httpx
+
+from app.services.politeness import PolitenessScheduler
+from app.services.robots_cache import RobotsCache
+
+
+async def _timed_acquires(scheduler, urls):
+    started = time.monotonic()
+    stamps = []
+
+    async def one(url):
+        await scheduler.acquire(url)
+        stamps.append((url, time.monotonic() - started))
+
+    await asyncio.gather(*[one(url) for url in urls])
+    return stamps
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_to_one_host_are_spaced():
+    """Test coroutines racing on the same host get distinct slots"""
+    scheduler = PolitenessScheduler(default_delay=0.05)
+    slots = []
+    reserve = scheduler.reserve
+
+    def recording_reserve(url, delay):
+        # Wake-up times jitter with the loop; the reserved slots must not
+        wait = reserve(url, delay)
+        slots.append(time.monotonic() + wait)
+        return wait
+
+    scheduler.reserve = recording_reserve
+    await _timed_acquires(scheduler, ["https://a.test/p"] * 3)
+
+    slots.sort()
+    assert slots[1] - slots[0] >= 0.045
+    assert slots[2] - slots[1] >= 0.045
+    assert scheduler.stats()["delayed"] == 2
+
+
+@pytest.mark.asyncio
+async def test_hosts_do_not_wait_on_each_other():
+    """Test a busy host never delays requests to other hosts"""
+    scheduler = PolitenessScheduler(default_delay=0.2)
+    urls = ["https://a.test/1", "https://a.test/2"] + [f"https://h{i}.test/" for i in range(20)]
+    stamps = dict(await _timed_acquires(scheduler, urls))
+
+    assert all(stamps[f"https://h{i}.test/"] < 0.05 for i in range(20))
+    assert stamps["https://a.test/2"] >= 0.19
+
+
+@pytest.mark.asyncio
+async def test_crawl_delay_overrides_default():
+    """Test a larger robots.txt Crawl-delay widens the host's spacing"""
+    robots = RobotsCache(
+        "TestBot/1.0",
+        redis_url="",
+        transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, text="User-agent: *\nCrawl-delay: 3\n")
+        ),
+    )
+    scheduler = PolitenessScheduler(default_delay=0.5, robots=robots)
+
+    assert await scheduler.delay_for("https://slow.test/") == 3.0
+    assert scheduler.reserve("https://slow.test/a", 3.0) == 0
+    assert scheduler.reserve("https://slow.test/b", 3.0) == pytest.approx(3.0, abs=0.05)
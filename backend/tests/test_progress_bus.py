@@ -0,0 +1,130 @@
+"""Tests for job progress events and their SSE streams"""
+import asyncio
+import json
+
+import pytest
+
+from app.services.progress_bus import ProgressBus, job_channel, site_channel, sse_stream
+from app.workers.progress import ProgressReporter
+
+
+def _events(chunks):
+    """Parse SSE chunks into (event, data) pairs, skipping comments"""
+    parsed = []
+    for chunk in chunks:
+        if chunk.startswith("event: "):
+            name, data = chunk.strip().split("\n")
+            parsed.append((name[len("event: "):], json.loads(data[len("data: "):])))
+    return parsed
+
+
+async def _never_disconnected():
+    return False
+
+
+@pytest.mark.asyncio
+async def test_local_publish_reaches_job_and_site_subscribers():
+    """Test one event is delivered on both the job and the site channel"""
+    bus = ProgressBus(redis_url="")
+    async with bus.subscribe(job_channel("j1")) as job_queue, bus.subscribe(site_channel("s1")) as site_queue:
+        await bus.publish({"job_id": "j1", "site_id": "s1", "phase": "crawl", "progress": 40})
+        job_event = job_queue.get_nowait()
+        site_event = site_queue.get_nowait()
+
+    assert job_event["phase"] == site_event["phase"] == "crawl"
+    assert "ts" in job_event
+    assert bus.stats()["channels"] == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_drops_oldest_events():
+    """Test a full queue discards old events instead of blocking"""
+    bus = ProgressBus(redis_url="")
+    bus.QUEUE_SIZE = 2
+    async with bus.subscribe(job_channel("j1")) as queue:
+        for progress in (10, 20, 30):
+            await bus.publish({"job_id": "j1", "progress": progress})
+        kept = [queue.get_nowait()["progress"] for _ in range(queue.qsize())]
+
+    assert kept == [20, 30]
+    assert bus.stats()["dropped"] == 1
+
+
+@pytest.mark.asyncio
+async def test_job_stream_ends_on_terminal_event():
+    """Test a job stream sends the snapshot, progress and stops at success"""
+    bus = ProgressBus(redis_url="")
+    reporter = ProgressReporter("j1", "discover", "s1", bus=bus, persist=False)
+
+    async def refresh():
+        return {"status": "running"}
+
+    async def consume():
+        return [
+            chunk async for chunk in sse_stream(
+                job_channel("j1"), {"status": "running", "progress": 0}, refresh,
+                _never_disconnected, bus=bus, keepalive=5, max_seconds=5
+            )
+        ]
+
+    task = asyncio.create_task(consume())
+    while not bus.stats()["subscribers"]:
+        await asyncio.sleep(0)
+    await reporter("crawl", 50)
+    await reporter("saved", 100, status="success")
+    chunks = await asyncio.wait_for(task, timeout=2)
+
+    assert chunks[0].startswith("retry: ")
+    events = _events(chunks)
+    assert [name for name, _ in events] == ["snapshot", "progress", "progress"]
+    assert [data["progress"] for _, data in events[1:]] == [50, 100]
+    assert events[-1][1]["status"] == "success"
+
+
+@pytest.mark.asyncio
+async def test_quiet_stream_refreshes_from_database_state():
+    """Test a missed terminal event is picked up by the periodic refresh"""
+    bus = ProgressBus(redis_url="")
+    states = iter([{"status": "running", "progress": 0}, {"status": "failed", "progress": 30}])
+
+    async def refresh():
+        return next(states)
+
+    chunks = [
+        chunk async for chunk in sse_stream(
+            job_channel("j1"), {"status": "running", "progress": 0}, refresh,
+            _never_disconnected, bus=bus, keepalive=0.01, max_seconds=5
+        )
+    ]
+
+    assert ": keepalive\n\n" in chunks
+    assert _events(chunks)[-1] == ("snapshot", {"status": "failed", "progress": 30})
+
+
+@pytest.mark.asyncio
+async def test_terminal_snapshot_closes_immediately():
+    """Test streaming a finished job returns just its snapshot"""
+    bus = ProgressBus(redis_url="")
+
+    async def refresh():
+        raise AssertionError("should not refresh")
+
+    chunks = [
+        chunk async for chunk in sse_stream(
+            job_channel("j1"), {"status": "success", "progress": 100}, refresh,
+            _never_disconnected, bus=bus, keepalive=1, max_seconds=5
+        )
+    ]
+    assert _events(chunks) == [("snapshot", {"status": "success", "progress": 100})]
+
+
+@pytest.mark.asyncio
+async def test_reporter_never_raises():
+    """Test a failing bus does not fail the job"""
+    class BrokenBus:
+        async def publish(self, event):
+            raise ConnectionError("down")
+
+    reporter = ProgressReporter("j1", "discover", bus=BrokenBus(), persist=False)
+    await reporter("crawl", 40)
+    assert reporter.progress == 40
@@ -0,0 +1,180 @@
+"""Tests for the two-tier response cache and its write-driven invalidation"""
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import inspect, update
+from sqlalchemy.orm import Session
+
+from app.models import Job, PlatformTemplate, Site
+from app.services import response_cache as cache_module
+from app.services.response_cache import CACHE_LOOKUPS, ResponseCache, table_tags
+
+
+def _cache(**kwargs):
+    kwargs.setdefault("redis_url", "")
+    return ResponseCache(**kwargs)
+
+
+def _counting_loader(value="v", delay=0.0):
+    calls = []
+
+    async def load():
+        calls.append(1)
+        if delay:
+            await asyncio.sleep(delay)
+        return value
+    return load, calls
+
+
+@pytest.mark.asyncio
+async def test_second_lookup_is_a_local_hit():
+    """Test a cached key is served without calling the loader again"""
+    cache = _cache()
+    load, calls = _counting_loader({"total": 3})
+    hits = CACHE_LOOKUPS.labels("hitcheck", "hit")
+    before = hits._value.get()
+
+    assert await cache.get_or_load("hitcheck:a", load, tags=("sites",)) == {"total": 3}
+    assert await cache.get_or_load("hitcheck:a", load, tags=("sites",)) == {"total": 3}
+    assert len(calls) == 1
+    assert hits._value.get() == before + 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load():
+    """Test single-flight: simultaneous misses for a key run one loader"""
+    cache = _cache()
+    load, calls = _counting_loader(delay=0.05)
+
+    results = await asyncio.gather(*(cache.get_or_load("k:1", load, tags=()) for _ in range(5)))
+
+    assert results == ["v"] * 5
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_load_is_not_cached():
+    """Test loader errors reach every waiter and leave nothing cached"""
+    cache = _cache()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise LookupError("not found")
+
+    results = await asyncio.gather(
+        *(cache.get_or_load("k:1", fail, tags=()) for _ in range(3)), return_exceptions=True
+    )
+    assert all(isinstance(r, LookupError) for r in results)
+    assert cache.stats()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_and_lru_is_bounded():
+    """Test TTL expiry and eviction of the least recently used entry"""
+    cache = _cache(ttl=0.05, max_entries=2)
+    load, calls = _counting_loader()
+
+    await cache.get_or_load("k:1", load, tags=())
+    await cache.get_or_load("k:2", load, tags=())
+    await cache.get_or_load("k:1", load, tags=())  # k:2 is now least recent
+    await cache.get_or_load("k:3", load, tags=())
+    assert set(cache._entries) == {"k:1", "k:3"}
+
+    await asyncio.sleep(0.06)
+    await cache.get_or_load("k:1", load, tags=())
+    assert len(calls) == 4
+
+
+@pytest.mark.asyncio
+async def test_invalidate_drops_only_tagged_entries():
+    """Test a tag invalidation removes its entries and keeps the rest"""
+    cache = _cache()
+    load, calls = _counting_loader()
+    site = str(uuid.uuid4())
+
+    await cache.get_or_load(f"blueprint-latest:{site}", load, tags=("blueprints", f"site:{site}"))
+    await cache.get_or_load("templates:all", load, tags=("templates",))
+    await cache.invalidate(f"site:{site}")
+
+    assert set(cache._entries) == {"templates:all"}
+    await cache.get_or_load(f"blueprint-latest:{site}", load, tags=("blueprints", f"site:{site}"))
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_load_overlapping_a_write_is_not_cached():
+    """Test a value read before a concurrent write commits is not kept"""
+    cache = _cache()
+    load, calls = _counting_loader(delay=0.05)
+
+    pending = asyncio.create_task(cache.get_or_load("dashboard:7", load, tags=("dashboard",)))
+    await asyncio.sleep(0.01)
+    cache.invalidate_soon(["dashboard"])
+    assert await pending == "v"
+
+    assert cache.stats()["entries"] == 0
+
+
+def test_write_tags_per_table():
+    """Test row writes map to precise tags, bulk writes to table-wide ones"""
+    site = Site(site_id=uuid.uuid4(), domain="example.com")
+
+    assert table_tags("sites", site) == {"sites", "dashboard", f"site:{site.site_id}"}
+    assert table_tags("sites") == {"sites", "dashboard", "blueprints"}
+    assert table_tags("blueprints") == {"blueprints"}
+    assert table_tags("platform_templates") == {"templates"}
+    assert table_tags("page_validators") == set()
+
+
+def test_flush_collects_tags_until_commit(monkeypatch):
+    """Test pending rows are tagged on flush and invalidated after commit"""
+    invalidated = []
+    monkeypatch.setattr(cache_module.response_cache, "invalidate_soon", invalidated.append)
+    session = Session()
+    session.add(PlatformTemplate(platform_name="shopify"))
+
+    cache_module._collect_flushed(session, None)
+    cache_module._invalidate_committed(session)
+
+    assert invalidated == [{"templates"}]
+    cache_module._invalidate_committed(session)
+    assert len(invalidated) == 1
+
+
+def test_job_updates_invalidate_only_on_status_change():
+    """Test heartbeats and progress writes leave the dashboard cached"""
+    def execute(statement):
+        state = SimpleNamespace(
+            is_insert=False, is_update=True, is_delete=False,
+            bind_mapper=inspect(Job), statement=statement, session=SimpleNamespace(info={})
+        )
+        cache_module._collect_statement(state)
+        return state.session.info.get(cache_module._SESSION_TAGS, set())
+
+    assert execute(update(Job).values(progress=50)) == set()
+    assert execute(update(Job).values(status="failed")) == {"jobs", "dashboard"}
+
+
+@pytest.mark.asyncio
+async def test_backfill_invalidates_dashboards_on_commit(monkeypatch):
+    """Test raw SQL rollup rebuilds still drop cached dashboards"""
+    from app.services.analytics_service import AnalyticsService
+
+    class _TextSession:
+        def __init__(self):
+            self.info = {}
+
+        async def execute(self, statement, params=None):
+            pass
+
+    invalidated = []
+    monkeypatch.setattr(cache_module.response_cache, "invalidate_soon", invalidated.append)
+    db = _TextSession()
+
+    await AnalyticsService().backfill(db)
+    assert invalidated == []
+    cache_module._invalidate_committed(db)
+
+    assert invalidated == [{"dashboard"}]
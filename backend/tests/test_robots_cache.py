@@ -0,0 +1,79 @@
+"""Tests for the robots.txt cache"""
+import asyncio
+import pytest
+import httpx
+
+from app.services.robots_cache import RobotsCache
+
+UA = "TestBot/1.0"
+ROBOTS = "User-agent: *\nDisallow: /private\nCrawl-delay: 5\nSitemap: https://shop.test/sitemap.xml\n"
+
+
+def _cache(handler, **kwargs):
+    kwargs.setdefault("redis_url", "")
+    return RobotsCache(UA, transport=httpx.MockTransport(handler), **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_fetch():
+    """Test coroutines checking the same host download robots.txt once"""
+    calls = []
+
+    async def handler(request):
+        calls.append(request.url.host)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, text=ROBOTS)
+
+    cache = _cache(handler)
+    results = await asyncio.gather(*[cache.get(f"https://shop.test/p/{i}") for i in range(10)])
+
+    assert calls == ["shop.test"]
+    assert all(rules is results[0] for rules in results)
+    assert cache.stats()["coalesced"] == 9
+
+
+@pytest.mark.asyncio
+async def test_rules_keep_crawl_delay_and_sitemaps():
+    """Test Crawl-delay and Sitemap directives are parsed alongside the rules"""
+    cache = _cache(lambda request: httpx.Response(200, text=ROBOTS))
+    rules = await cache.get("https://shop.test/")
+
+    assert rules.crawl_delay == 5.0
+    assert rules.sitemaps == ["https://shop.test/sitemap.xml"]
+    assert rules.can_fetch(UA, "https://shop.test/products") is True
+    assert rules.can_fetch(UA, "https://shop.test/private/x") is False
+
+
+@pytest.mark.asyncio
+async def test_failed_fetch_is_negatively_cached():
+    """Test an unreachable robots.txt allows crawling and is cached briefly"""
+    calls = []
+
+    def handler(request):
+        calls.append(1)
+        raise httpx.ConnectError("down")
+
+    cache = _cache(handler, ttl=3600, negative_ttl=0.05)
+    rules = await cache.get("https://down.test/")
+    await cache.get("https://down.test/again")
+
+    assert rules.status == "unreachable"
+    assert rules.can_fetch(UA, "https://down.test/any") is True
+    assert len(calls) == 1
+
+    await asyncio.sleep(0.06)
+    await cache.get("https://down.test/")
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_memory_tier_is_lru_bounded():
+    """Test the in-memory cache evicts the least recently used host"""
+    cache = _cache(lambda request: httpx.Response(404), max_entries=2)
+    for host in ["a.test", "b.test", "a.test", "c.test"]:
+        await cache.get(f"https://{host}/")
+
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["fetches"] == 3
+    await cache.get("https://a.test/")
+    assert cache.stats()["fetches"] == 3
@@ -0,0 +1,57 @@
+"""Tests for the compiled selector-candidate engine"""
+from bs4 import BeautifulSoup
+
+from app.services.selector_engine import SelectorEngine, required_keys, template_candidates
+
+PAGE = BeautifulSoup(
+    '<html><body><h1 class="title">Mug</h1>'
+    '<div class="price-box"><span class="price" data-price="9">$9</span></div>'
+    '<p class="description">Blue</p></body></html>',
+    'lxml'
+)
+
+
+def test_engine_reports_matching_candidates_per_field():
+    """Test every field gets its matching candidates in declared order"""
+    engine = SelectorEngine({
+        "name": ["h1.product-title", "h1.title"],
+        "price": ["[data-price]", ".price", ".current-price"],
+        "image": ["img.product-image"],
+    })
+    assert engine.evaluate(PAGE) == {
+        "name": ["h1.title"],
+        "price": ["[data-price]", ".price"],
+        "image": [],
+    }
+
+
+def test_engine_extension_dedupes_and_skips_invalid_selectors():
+    """Test extra candidates are appended once and bad selectors are dropped"""
+    engine = SelectorEngine({"price": [".price"]}).extended(
+        {"price": [".price", ".price-box span", "[[bad"]},
+        {"description": [".description"]},
+    )
+    assert len(engine) == 3
+    assert engine.evaluate(PAGE) == {
+        "price": [".price", ".price-box span"],
+        "description": [".description"],
+    }
+
+
+def test_template_candidates_map_onto_fields():
+    """Test platform template product selectors become field candidates"""
+    assert template_candidates({
+        "product_title": ".product-title, h2",
+        "product_price": ".price",
+        "product_link": "a[href*='/products/']",
+    }) == {"name": [".product-title, h2"], "price": [".price"]}
+
+
+def test_required_keys_index_subject_element():
+    """Test candidates are indexed by a token their subject element must carry"""
+    assert required_keys(".product-img img") == [("tag", "img")]
+    assert required_keys('h1[itemprop="name"], #title') == [("attr", "itemprop"), ("id", "title")]
+    assert required_keys("div > span.p:first-child") == [("class", "p")]
+    # Nothing required on the element itself: tried everywhere
+    assert required_keys(":not(.x)") is None
+    assert SelectorEngine({"x": ["p:not(.title)"]}).evaluate(PAGE) == {"x": ["p:not(.title)"]}
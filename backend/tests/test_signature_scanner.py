@@ -0,0 +1,53 @@
+"""Tests for the signature scanner and fingerprint detectors"""
+import pytest
+
+from app.services.fingerprint_service import fingerprint_service
+from app.services.signature_scanner import SignatureScanner
+
+
+def test_scanner_reports_every_key():
+    """Test all matching keys are returned from one scan call"""
+    scanner = SignatureScanner({
+        "a": [("alpha", False)],
+        "b": [("beta", True)],
+        "c": [("gamma", False)],
+    })
+    assert scanner.scan("xx alpha yy BETA") == {"a", "b"}
+
+
+def test_scanner_respects_case_per_signature():
+    """Test case sensitivity is scoped to each signature"""
+    scanner = SignatureScanner({
+        "cms": [("WordPress", False)],
+        "cf": [("cloudflare", True)],
+    })
+    assert scanner.scan("wordpress CloudFlare") == {"cf"}
+
+
+def test_scanner_finds_overlapping_signatures():
+    """Test a signature hidden inside another match is still found"""
+    scanner = SignatureScanner({
+        "assets": [("/_next/", False)],
+        "next": [("next", True)],
+    })
+    assert scanner.scan('<script src="/_next/app.js">') == {"assets", "next"}
+
+
+@pytest.mark.asyncio
+async def test_fingerprint_analysis():
+    """Test detectors read from one scanner result"""
+    html = (
+        '<html><body><div id="root"></div>'
+        '<script src="https://cdn.shopify.com/s/app.js"></script>'
+        '<script src="/_next/static/main.js"></script>'
+        '<link href="/wp-content/themes/x.css">'
+        '<div class="g-recaptcha"></div></body></html>'
+    )
+    result = await fingerprint_service.analyze(html, {"cf-ray": "abc"})
+
+    assert result["platform"] == "Shopify"
+    assert result["cms"] == "WordPress"
+    assert result["javascript_frameworks"] == ["Next.js"]
+    assert result["anti_bot"]["services"] == ["cloudflare", "recaptcha"]
+    assert result["requires_js"] is True
+    assert result["complexity_score"] == pytest.approx(0.7)
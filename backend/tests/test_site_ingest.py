@@ -0,0 +1,143 @@
+"""Tests for bulk site ingestion"""
+import uuid
+
+import pytest
+
+from app.services.site_ingest import (
+    SiteIngestor, iter_lines, normalize_domain, parse_csv, parse_ndjson
+)
+
+
+async def _chunks(*parts):
+    for part in parts:
+        yield part
+
+
+async def _collect(aiter):
+    return [item async for item in aiter]
+
+
+class _FakeSession:
+    def __init__(self):
+        self.commits = 0
+
+    async def commit(self):
+        self.commits += 1
+
+
+class _FakeIngestor(SiteIngestor):
+    """Emulates ON CONFLICT (domain) DO NOTHING against an existing set"""
+
+    def __init__(self, existing, **kwargs):
+        super().__init__(**kwargs)
+        self.domains = set(existing)
+        self.site_batches = []
+        self.job_batches = []
+
+    async def _insert_sites(self, db, batch, now):
+        self.site_batches.append(len(batch))
+        created = []
+        for row in batch:
+            if row.domain not in self.domains:
+                self.domains.add(row.domain)
+                created.append(uuid.uuid4())
+        return created
+
+    async def _insert_jobs(self, db, jobs, now):
+        self.job_batches.append(len(jobs))
+
+
+def test_normalize_domain():
+    """Test URLs and mixed case reduce to a bare hostname"""
+    assert normalize_domain(" Example.COM ") == "example.com"
+    assert normalize_domain("https://shop.example.com:8443/path?q=1") == "shop.example.com"
+    assert normalize_domain("example.com.") == "example.com"
+    assert normalize_domain("not a domain") is None
+    assert normalize_domain("-bad-.com") is None
+    assert normalize_domain("localhost") is None
+
+
+@pytest.mark.asyncio
+async def test_iter_lines_handles_split_chunks():
+    """Test lines and multi-byte characters split across chunks"""
+    data = "a.com\r\nbücher.de\nlast.com".encode()
+    split = data.index("ü".encode()) + 1
+    lines = await _collect(iter_lines(_chunks(data[:3], data[3:split], data[split:])))
+    assert lines == ["a.com", "bücher.de", "last.com"]
+
+
+@pytest.mark.asyncio
+async def test_parse_ndjson_rows_and_errors():
+    """Test NDJSON objects, bare strings and invalid lines"""
+    lines = _chunks(
+        '{"domain": "a.com", "business_value_score": 0.9, "notes": "vip"}',
+        '"b.com"',
+        "",
+        "{broken",
+        '{"domain": "c.com", "business_value_score": 3}',
+        "[1, 2]"
+    )
+    rows = await _collect(parse_ndjson(lines))
+
+    assert (rows[0].domain, rows[0].business_value_score, rows[0].notes) == ("a.com", 0.9, "vip")
+    assert rows[1].domain == "b.com"
+    assert [(row.line, row.error) for row in rows[2:]] == [
+        (4, "invalid JSON"),
+        (5, "business_value_score must be between 0 and 1"),
+        (6, "expected a JSON object")
+    ]
+
+
+@pytest.mark.asyncio
+async def test_parse_csv_with_and_without_header():
+    """Test a header row picks the domain column, otherwise column one"""
+    with_header = await _collect(parse_csv(_chunks("notes,Domain", "hi,a.com", ",b.com")))
+    assert [(row.domain, row.notes) for row in with_header] == [("a.com", "hi"), ("b.com", None)]
+
+    bare = await _collect(parse_csv(_chunks("a.com", "b.com", "???")))
+    assert [row.domain for row in bare[:2]] == ["a.com", "b.com"]
+    assert bare[2].error.startswith("invalid domain")
+
+
+@pytest.mark.asyncio
+async def test_ingest_batches_and_summary():
+    """Test batching, duplicate accounting and chunked dispatch"""
+    dispatched = []
+    ingestor = _FakeIngestor(
+        existing={"old-1.com", "old-2.com"},
+        batch_size=4,
+        dispatch=lambda jobs: dispatched.append(len(jobs)) or len(jobs)
+    )
+    domains = [f"site-{i}.com" for i in range(9)] + ["old-1.com", "OLD-2.com", "site-0.com", "bad"]
+    rows = parse_ndjson(_chunks(*[f'"{domain}"' for domain in domains]))
+
+    db = _FakeSession()
+    summary = (await ingestor.ingest(db, rows)).to_dict()
+
+    assert summary["received"] == 13
+    assert summary["created"] == 9
+    assert summary["duplicates"] == 3
+    assert summary["invalid"] == 1
+    assert summary["jobs_queued"] == summary["jobs_dispatched"] == 9
+    assert summary["batches"] == 3 == db.commits
+    assert ingestor.site_batches == [4, 4, 3]
+    assert sum(ingestor.job_batches) == 9
+    assert dispatched == ingestor.job_batches
+
+
+@pytest.mark.asyncio
+async def test_ingest_keeps_jobs_queued_when_celery_is_down():
+    """Test a failing broker stops dispatch but not ingestion"""
+    calls = []
+
+    def dispatch(jobs):
+        calls.append(len(jobs))
+        raise ConnectionError("broker unreachable")
+
+    ingestor = _FakeIngestor(existing=set(), batch_size=2, dispatch=dispatch)
+    rows = parse_ndjson(_chunks(*[f'"s{i}.com"' for i in range(5)]))
+    summary = await ingestor.ingest(_FakeSession(), rows)
+
+    assert summary.created == summary.jobs_queued == 5
+    assert summary.jobs_dispatched == 0
+    assert calls == [2]
@@ -0,0 +1,122 @@
+"""Tests for the content-addressed page snapshot store"""
+import glob
+import os
+import time
+
+import httpx
+import pytest
+
+from app.services.fetch_session import FetchSession
+from app.services.snapshot_store import ZSTD_AVAILABLE, SnapshotStore
+
+
+def _store(tmp_path, **kwargs):
+    kwargs.setdefault("max_age", 900)
+    kwargs.setdefault("retention", 3600)
+    kwargs.setdefault("compression", "gzip")
+    return SnapshotStore(root=str(tmp_path / "snapshots"), **kwargs)
+
+
+def _objects(tmp_path):
+    return glob.glob(str(tmp_path / "snapshots" / "objects" / "*" / "*"))
+
+
+@pytest.mark.parametrize("compression", ["gzip", "zstd"])
+def test_put_and_read_roundtrip(tmp_path, compression):
+    """Test bodies come back byte-identical through the mmap'd object"""
+    if compression == "zstd" and not ZSTD_AVAILABLE:
+        pytest.skip("zstandard not installed")
+    store = _store(tmp_path, compression=compression)
+    body = b"<html>" + b"<div class='product'>x</div>" * 2000 + b"</html>"
+
+    stored = store.put("https://a.com/", body, content_type="text/html")
+    assert stored.codec == compression
+    assert os.path.getsize(_objects(tmp_path)[0]) < len(body) / 10
+
+    snapshot = store.latest("https://a.com/")
+    assert snapshot == stored
+    assert store.read(snapshot) == body
+
+
+def test_identical_content_is_stored_once(tmp_path):
+    """Test the same page under two URLs shares one object"""
+    store = _store(tmp_path)
+    store.put("https://a.com/", b"same page")
+    store.put("https://www.a.com/", b"same page")
+
+    assert len(_objects(tmp_path)) == 1
+    assert store.stats()["snapshot_deduplicated"] == 1
+    assert store.latest("https://www.a.com/").content_hash == store.latest("https://a.com/").content_hash
+
+
+def test_unchanged_page_refreshes_fetch_time(tmp_path):
+    """Test refetching identical content updates the row instead of adding one"""
+    store = _store(tmp_path)
+    store.put("https://a.com/", b"v1", fetched_at=100)
+    store.put("https://a.com/", b"v1", fetched_at=200)
+    store.put("https://a.com/", b"v2", fetched_at=300)
+
+    rows = store._index().execute("SELECT fetched_at FROM snapshots ORDER BY fetched_at").fetchall()
+    assert rows == [(200,), (300,)]
+
+
+def test_latest_respects_max_age(tmp_path):
+    """Test stale snapshots miss unless any age is accepted (offline runs)"""
+    store = _store(tmp_path, max_age=60)
+    store.put("https://a.com/", b"old", fetched_at=time.time() - 3600)
+
+    assert store.latest("https://a.com/") is None
+    assert store.latest("https://a.com/", max_age=0) is None
+    assert store.read(store.latest("https://a.com/", max_age=-1)) == b"old"
+    assert store.latest("https://b.com/", max_age=-1) is None
+
+
+def test_prune_keeps_objects_still_referenced(tmp_path):
+    """Test pruning drops expired rows and only unreferenced objects"""
+    store = _store(tmp_path, retention=60)
+    now = time.time()
+    store.put("https://old.com/", b"shared", fetched_at=now - 3600)
+    store.put("https://new.com/", b"shared", fetched_at=now)
+    store.put("https://gone.com/", b"only old", fetched_at=now - 3600)
+
+    assert store.prune() == 1
+    assert len(_objects(tmp_path)) == 1
+    assert store.latest("https://old.com/", max_age=-1) is None
+    assert store.read(store.latest("https://new.com/")) == b"shared"
+
+
+@pytest.mark.asyncio
+async def test_fetch_session_reads_through_the_store(tmp_path):
+    """Test a later session is served from the snapshot without a request"""
+    store = _store(tmp_path)
+    requests = []
+
+    def handler(request):
+        requests.append(str(request.url))
+        return httpx.Response(200, html="<html>home</html>")
+
+    transport = httpx.MockTransport(handler)
+    async with FetchSession(transport=transport, snapshots=store) as first:
+        fresh = await first.get("https://a.com/")
+    async with FetchSession(transport=transport, snapshots=store) as second:
+        replayed = await second.get("https://a.com/")
+
+    assert requests == ["https://a.com/"]
+    assert not fresh.extensions.get("snapshot")
+    assert replayed.extensions["snapshot"] is True
+    assert replayed.text == "<html>home</html>"
+    assert replayed.headers["content-type"].startswith("text/html")
+    assert second.stats()["snapshot_hits"] == 1
+    assert second.stats()["cache_misses"] == 0
+
+
+@pytest.mark.asyncio
+async def test_fetch_session_does_not_store_errors(tmp_path):
+    """Test non-200 responses are never snapshotted"""
+    store = _store(tmp_path)
+    transport = httpx.MockTransport(lambda request: httpx.Response(503))
+
+    async with FetchSession(transport=transport, snapshots=store) as session:
+        await session.get("https://a.com/")
+
+    assert _objects(tmp_path) == []
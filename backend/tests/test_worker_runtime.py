@@ -0,0 +1,151 @@
+"""Tests for the process-lifetime worker runtime"""
+import asyncio
+import threading
+
+import pytest
+
+from app.config import settings
+from app.workers.runtime import (
+    AsyncWorkerRuntime, JobHandedBack, JobLimiter, JobTimedOut, WorkerDatabase, job_timeout,
+    worker_pool_size
+)
+
+
+def _runtime(limits=None, handed_back=None, timed_out=None):
+    async def on_handback(job_id):
+        handed_back.append(job_id)
+
+    async def on_timeout(job_id, limit):
+        timed_out.append((job_id, limit))
+
+    return AsyncWorkerRuntime(
+        limiter=JobLimiter(limits or {}, default_limit=8),
+        shutdown_grace=5,
+        on_handback=on_handback,
+        on_timeout=on_timeout
+    )
+
+
+def test_jobs_share_one_long_lived_loop():
+    """Test consecutive jobs run on the same background event loop"""
+    runtime = _runtime(handed_back=[])
+
+    async def current_loop():
+        return asyncio.get_running_loop()
+
+    try:
+        first = runtime.run(current_loop())
+        second = runtime.run(current_loop())
+        assert first is second
+        assert first is not None and not first.is_closed()
+    finally:
+        runtime.shutdown()
+
+
+def test_job_type_concurrency_limit():
+    """Test jobs of one type never exceed their configured limit"""
+    runtime = _runtime(limits={"discover": 2}, handed_back=[])
+    active = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    async def job():
+        with lock:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+        await asyncio.sleep(0.02)
+        with lock:
+            active["now"] -= 1
+
+    try:
+        futures = [runtime.submit(job(), job_type="discover") for _ in range(6)]
+        for future in futures:
+            future.result(timeout=5)
+        assert active["peak"] == 2
+    finally:
+        runtime.shutdown()
+
+
+def test_shutdown_hands_back_unfinished_jobs():
+    """Test shutdown waits for the grace period, then re-queues what is left"""
+    handed_back = []
+    runtime = _runtime(handed_back=handed_back)
+
+    started = threading.Semaphore(0)
+
+    async def job(seconds):
+        started.release()
+        await asyncio.sleep(seconds)
+        return "done"
+
+    quick_future = runtime.submit(job(0.05), job_type="fingerprint", job_id="job-1")
+    slow_future = runtime.submit(job(30), job_type="discover", job_id="job-2")
+    assert started.acquire(timeout=5) and started.acquire(timeout=5)
+    runtime.shutdown(grace=0.2)
+
+    assert quick_future.result() == "done"
+    with pytest.raises(JobHandedBack):
+        slow_future.result()
+    assert handed_back == ["job-2"]
+
+    # Draining runtimes refuse new work
+    runtime._draining = True
+    with pytest.raises(JobHandedBack):
+        runtime.submit(job(0), job_id="job-3")
+
+
+def test_hung_job_is_cancelled_and_failed(monkeypatch):
+    """Test a job past its type's time limit is cancelled and reported once"""
+    monkeypatch.setattr(settings, "WORKER_JOB_TIMEOUTS", '{"discover": 0.05}')
+    timed_out = []
+    runtime = _runtime(handed_back=[], timed_out=timed_out)
+    cancelled = threading.Event()
+
+    async def hang():
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    try:
+        with pytest.raises(JobTimedOut):
+            runtime.run(hang(), job_type="discover", job_id="job-1")
+        assert cancelled.is_set()
+        assert timed_out == [("job-1", 0.05)]
+        assert runtime.stats()["in_flight"] == 0
+    finally:
+        runtime.shutdown()
+
+
+def test_job_timeouts_fall_back_to_the_default(monkeypatch):
+    """Test per-type overrides, invalid JSON and the default limit"""
+    monkeypatch.setattr(settings, "WORKER_JOB_TIMEOUT", 300.0)
+    monkeypatch.setattr(settings, "WORKER_JOB_TIMEOUTS", '{"fingerprint": 60}')
+    assert job_timeout("fingerprint") == 60
+    assert job_timeout("discover") == 300
+
+    monkeypatch.setattr(settings, "WORKER_JOB_TIMEOUTS", "{not json")
+    assert job_timeout("fingerprint") == 300
+
+
+def test_pool_is_sized_from_job_concurrency(monkeypatch):
+    """Test the default pool leaves connections for heartbeats beyond one per job"""
+    monkeypatch.setattr(settings, "WORKER_DB_POOL_SIZE", 0)
+    monkeypatch.setattr(settings, "WORKER_MAX_CONCURRENT_JOBS", 16)
+    assert worker_pool_size() == 20
+
+    monkeypatch.setattr(settings, "WORKER_DB_POOL_SIZE", 12)
+    assert worker_pool_size() == 12
+
+
+def test_checkout_wait_stats():
+    """Test checkout waits are summarised for pool sizing"""
+    db = WorkerDatabase()
+    for wait in [0.001] * 19 + [0.5]:
+        db._record_wait(wait)
+
+    stats = db.stats()
+    assert stats["checkouts"] == 20
+    assert stats["max_wait_ms"] == 500.0
+    assert stats["p95_wait_ms"] == 1.0
+    assert stats["pool_size"] == 0
@@ -40,16 +40,18 @@ const Analytics = () => {
               <thead>
                 <tr>
                   <th>Method</th>
+                  <th>Job Type</th>
                   <th>Total Jobs</th>
                   <th>Success Rate</th>
-                  <th>Avg Time (s)</th>
+                  <th>p50 / p90 / p99 (s)</th>
                   <th>Avg Cost ($)</th>
                 </tr>
               </thead>
               <tbody>
                 {performance?.method_performance?.map((method: any) => (
-                  <tr key={method.method}>
+                  <tr key={`${method.method}-${method.job_type}`}>
                     <td style={{ fontWeight: 'bold' }}>{method.method}</td>
+                    <td>{method.job_type}</td>
                     <td>{method.total_jobs}</td>
                     <td>
                       <span style={{
@@ -59,8 +61,11 @@ const Analytics = () => {
                         {(method.success_rate * 100).toFixed(1)}%
                       </span>
                     </td>
-                    <td>{method.avg_time_seconds.toFixed(1)}</td>
-                    <td>${method.avg_cost_usd.toFixed(2)}</td>
+                    <td>
+                      {[method.p50_seconds, method.p90_seconds, method.p99_seconds]
+                        .map((p: number | null) => (p ?? 0).toFixed(1)).join(' / ')}
+                    </td>
+                    <td>${method.avg_cost_usd.toFixed(4)}</td>
                   </tr>
                 ))}
               </tbody>
@@ -111,16 +116,17 @@ const Analytics = () => {
             <div className="card-title">Method Details</div>
             <div className="grid grid-cols-2">
               {performance?.method_performance?.map((method: any) => (
-                <div key={method.method} style={{ padding: '1rem', borderRight: '1px solid #e5e7eb' }}>
+                <div key={`${method.method}-${method.job_type}`} style={{ padding: '1rem', borderRight: '1px solid #e5e7eb' }}>
                   <h3 style={{ fontWeight: 'bold', marginBottom: '0.5rem', textTransform: 'capitalize' }}>
-                    {method.method} Method
+                    {method.method} Method ({method.job_type})
                   </h3>
                   <div style={{ fontSize: '0.875rem', color: '#6b7280' }}>
                     <div>Total Jobs: <strong>{method.total_jobs}</strong></div>
                     <div>Successful: <strong>{method.success_count}</strong></div>
                     <div>Success Rate: <strong>{(method.success_rate * 100).toFixed(1)}%</strong></div>
-                    <div>Avg Duration: <strong>{method.avg_time_seconds.toFixed(1)}s</strong></div>
-                    <div>Cost per Job: <strong>${method.avg_cost_usd.toFixed(2)}</strong></div>
+                    <div>Avg Duration: <strong>{(method.avg_time_seconds ?? 0).toFixed(1)}s</strong></div>
+                    <div>p99 Duration: <strong>{(method.p99_seconds ?? 0).toFixed(1)}s</strong></div>
+                    <div>Cost per Job: <strong>${method.avg_cost_usd.toFixed(4)}</strong></div>
                   </div>
                 </div>
               ))}
@@ -18,6 +18,7 @@ const Sites = () => {
       const params = new URLSearchParams();
       if (filter.status) params.append('status', filter.status);
       if (filter.platform) params.append('platform', filter.platform);
+      params.append('count', 'estimate');
       
       const response = await axios.get(`/sites?${params}`);
       setSites(response.data.sites);